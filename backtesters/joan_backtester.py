@@ -2,6 +2,10 @@ import pandas as pd
 from backtesting import Backtest, Strategy
 import pandas_ta as ta
 import multiprocessing
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.strategy_helpers import bounded_history
 multiprocessing.set_start_method('fork')
 
 # ==========================================
@@ -34,7 +38,7 @@ class JoanBacktest(Strategy):
 
     def init(self):
         self.trend_line = self.I(generic_trend_indicator, close=self.data.Close, length=self.trend_length)
-        self.entry_prices = [1]
+        self.entry_prices = bounded_history(1)
 
     def next(self):
         signal = self.trend_line
@@ -4,6 +4,10 @@ import pandas_ta as ta
 import numpy as np
 import math
 from datetime import datetime
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.strategy_helpers import DrawdownTracker, bounded_history
 
 # ==========================================
 # [SANITIZED] PROPRIETARY MACRO TIMELINES
@@ -40,10 +44,11 @@ class RobespierreBacktest(Strategy):
         self.trend_line = self.I(generic_trend_indicator, close=self.data.Close, length=self.length)
         self.buy_signal = False
         self.sell_signal = False
-        self.equity_curve = [self.equity]
-        self.entry_prices = [0]
+        self.equity_curve = bounded_history(self.equity)
+        self.entry_prices = bounded_history(0)
         self.current_size = self.base_size
         self.uptrend = False
+        self.drawdown = DrawdownTracker()
 
     def next(self):
         signal = self.trend_line
@@ -51,6 +56,7 @@ class RobespierreBacktest(Strategy):
             return
         
         current_price = self.data.Close[-1]
+        highest_high, lowest_low = self.drawdown.update(self.data.High, self.data.Low)
         signal_cur = signal[-1]
         signal_prev = signal[-2]
         signal_prev2 = signal[-3]
@@ -62,14 +68,6 @@ class RobespierreBacktest(Strategy):
         # --- L1 ENTRY ---
         if self.buy_signal and not self.position.is_long and not self.uptrend:
             self.uptrend = True
-            high_series = pd.Series(self.data.High)
-            low_series = pd.Series(self.data.Low)
-            
-            highest_high = high_series.max()
-            highest_index = high_series.idxmax()
-            slice_start = max(0, highest_index - 3)
-            lowest_low = low_series.iloc[slice_start:].min()
-            
             self.entry_prices.append(current_price)
             self.equity_curve.append(self.equity)
             
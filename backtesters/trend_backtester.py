@@ -2,6 +2,10 @@ import pandas as pd
 from backtesting import Backtest, Strategy
 import pandas_ta as ta
 from datetime import datetime
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.strategy_helpers import DrawdownTracker, macro_regime, bounded_history
 
 # ==========================================
 # [SANITIZED] PROPRIETARY MACRO TIMELINES
@@ -37,12 +41,16 @@ class TrendBacktest(Strategy):
 
     def init(self):
         self.trend_line = self.I(generic_trend_indicator, close=pd.Series(self.data.Close), length=self.trend_length)
-        self.equity_curve = [self.equity]
-        self.entry_prices = [1]
+        self.equity_curve = bounded_history(self.equity)
+        self.entry_prices = bounded_history(1)
         self.current_size = self.base_size
+        self.drawdown = DrawdownTracker()
+        self.macro_on = macro_regime(self.data.index, MACRO_EVENT_DATE)
 
     def next(self):
         current_price = self.data.Close[-1]
+        highest_high, lowest_low = self.drawdown.update(self.data.High, self.data.Low)
+        active_tp = self.macro_boost_tp if self.macro_on[len(self.data) - 1] else self.base_tp
         
         # Generic trend logic simulating directional +1 / -1 signals
         signal_cur = 1 if current_price > self.trend_line[-1] else -1
@@ -50,14 +58,6 @@ class TrendBacktest(Strategy):
 
         # --- BULL SIGNAL ---
         if signal_cur > 0 > signal_prev and not self.position.is_long:
-            high_series = pd.Series(self.data.High)
-            low_series = pd.Series(self.data.Low)
-
-            highest_high = high_series.max()
-            highest_idx = high_series.argmax()
-            slice_start = max(0, highest_idx - 3)
-            lowest_low = low_series.iloc[slice_start:].min()
-
             self.entry_prices.append(current_price)
             self.equity_curve.append(self.equity)
 
@@ -69,28 +69,11 @@ class TrendBacktest(Strategy):
             else:
                 self.current_size = self.base_size
 
-            # Demonstrate macro-driven structure (Event adaptation)
-            current_time = self.data.index[-1]
-            macro_event = pd.Timestamp(MACRO_EVENT_DATE)
-
-            if macro_event > current_time:
-                active_tp = self.base_tp
-            else:
-                active_tp = self.macro_boost_tp
-
             self.buy(sl=current_price * self.sl_pct, tp=current_price * active_tp, size=self.current_size)
             print(f"Size: {self.current_size}")
 
         # --- L2 RE-ENTRY ---
         elif signal_cur > 0 and self.entry_prices[-1] * 1.2 > current_price > self.entry_prices[-1] * 1.05 and not self.position.is_long:
-            current_time = pd.Timestamp(str(self.data.index[-1]))
-            macro_event = pd.Timestamp(MACRO_EVENT_DATE)
-            
-            if macro_event > current_time:
-                active_tp = self.base_tp
-            else:
-                active_tp = self.macro_boost_tp
-                
             self.buy(sl=self.entry_prices[-1] * self.reentry_sl, tp=self.entry_prices[-1] * active_tp, size=self.current_size)
             print(f"Size: {self.current_size}")
 
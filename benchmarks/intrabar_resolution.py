@@ -0,0 +1,55 @@
+import time
+import numpy as np
+import pandas as pd
+from genofinlib.vector_backtest import IntrabarData
+from genofinlib.vector_strategies import run_strategy
+
+# ==========================================
+# TWO-RESOLUTION SL/TP (4h SIGNALS, 1m FILLS ON AMBIGUOUS BARS)
+# ==========================================
+# Synthetic 1m random walk resampled to 4h the way the backtesters do. Tight SL/TP make
+# bars touching both levels common, which is where the coarse engine has to guess.
+DAYS = 500
+REPEATS = 5
+SL, TP = 0.985, 1.015
+KWARGS = dict(cash=100_000_000, commission=.0005, margin=1 / 10,
+              sl_pct=SL, base_tp=TP, macro_boost_tp=TP, l2_trigger=1.3)
+
+
+def synthetic_1m(days=DAYS, seed=1):
+    rng = np.random.default_rng(seed)
+    minutes = days * 1440
+    close = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.0015, minutes)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.0005, minutes)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.0005, minutes)))
+    index = pd.date_range('2021-01-01', periods=minutes, freq='1min')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index)
+
+
+def timed(fn):
+    best = np.inf
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+fine = synthetic_1m()
+coarse = fine.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+
+t0 = time.perf_counter()
+intrabar = IntrabarData(fine)
+index_time = time.perf_counter() - t0
+
+guessed, coarse_time = timed(lambda: run_strategy('trend', coarse, **KWARGS))
+resolved, fine_time = timed(lambda: run_strategy('trend', coarse, intrabar=intrabar, **KWARGS))
+
+tp_hits = lambda r: int(np.isclose(r.exit_price, coarse['Close'].to_numpy()[r.entry_bar - 1] * TP).sum())
+print(f"1m bars: {len(fine)} | 4h bars: {len(coarse)} | index build: {index_time * 1000:.1f}ms")
+print(f"SL-first guess : {len(guessed.size):4d} trades, {tp_hits(guessed):4d} TP exits, "
+      f"return {guessed.equity[-1] / KWARGS['cash'] - 1:+.2%} | {coarse_time * 1000:.2f}ms")
+print(f"1m resolution  : {len(resolved.size):4d} trades, {tp_hits(resolved):4d} TP exits, "
+      f"return {resolved.equity[-1] / KWARGS['cash'] - 1:+.2%} | {fine_time * 1000:.2f}ms "
+      f"({resolved.resolved} bars replayed on 1m)")
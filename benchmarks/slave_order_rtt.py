@@ -0,0 +1,45 @@
+import time
+import statistics
+import trader.config_test as cfg
+from genofinlib.slave_manager import OkxClient
+from genofinlib.slave_ws import OkxWsTransport
+
+# ==========================================
+# REST vs WS ORDER ROUND-TRIP (OKX DEMO)
+# ==========================================
+# Every order is sized below minSz so the venue rejects it after full validation:
+# we measure the real order path end to end without ever opening a position.
+SAMPLES = 30
+INST_ID = f"{cfg.symbol_name.upper()}-USDT-SWAP"
+REJECTED_SZ = "0.0000001"
+
+
+def measure(send):
+    rtts = []
+    for _ in range(SAMPLES):
+        t0 = time.perf_counter()
+        try:
+            send()
+        except Exception:
+            pass  # the rejection is the expected answer
+        rtts.append((time.perf_counter() - t0) * 1000)
+        time.sleep(0.1)
+    return rtts
+
+
+def summary(name, rtts):
+    rtts = sorted(rtts)
+    print(f"{name:<6} p50: {statistics.median(rtts):7.1f}ms | p90: {rtts[int(len(rtts) * 0.9)]:7.1f}ms | "
+          f"min: {rtts[0]:7.1f}ms")
+
+
+rest = OkxClient(cfg.okx_test_key, cfg.okx_test_secret, cfg.okx_test_pass, is_testnet=True)
+ws = OkxWsTransport(cfg.okx_test_key, cfg.okx_test_secret, cfg.okx_test_pass, rest.clock,
+                    is_testnet=True).connect()
+if not ws.ready.wait(10):
+    raise SystemExit("OKX WS login failed")
+
+rest.get_last_price(INST_ID)  # warm the REST keep-alive connection like the live refresher does
+
+summary("REST", measure(lambda: rest.create_market_order(INST_ID, "buy", REJECTED_SZ)))
+summary("WS", measure(lambda: ws.create_market_order(INST_ID, "buy", REJECTED_SZ)))
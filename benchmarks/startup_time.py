@@ -0,0 +1,57 @@
+import sys
+import time
+import statistics
+import subprocess
+
+# ==========================================
+# COLD START: IMPORTS + FIRST EVALUATED BAR
+# ==========================================
+# Each sample runs in a fresh interpreter so module caches never flatter the numbers.
+# Network setup (markets, klines, WS login) runs side by side at startup and is bounded
+# by one RTT, so it is left out: this measures what the process itself costs.
+SAMPLES = 7
+MAX_BARS = 1500
+
+IMPORT_LIB = """
+import time
+t0 = time.perf_counter()
+from genofinlib import runtime, ws_manager, order_manager, helpers, slave_manager, order_registry, reconciler
+from genofinlib.slack_bot import info_message
+print(time.perf_counter() - t0)
+"""
+
+FIRST_BAR = f"""
+import time
+t0 = time.perf_counter()
+from genofinlib import runtime, ws_manager, order_manager, helpers, slave_manager, order_registry, reconciler
+import pandas as pd
+bars = [[i * 60000, 100.0 + i % 7, 101.0 + i % 7, 99.0 + i % 7, 100.5 + i % 7, 10.0 + i % 3]
+        for i in range({MAX_BARS})]
+df = pd.DataFrame(bars, columns=["timestamp", "open", "high", "low", "close", "volume"])
+df['sma_fast'] = df['close'].rolling(window=10).mean()
+df['sma_slow'] = df['close'].rolling(window=50).mean()
+df['vol_sma'] = df['volume'].rolling(window=20).mean()
+lowest_low = df['low'][df['high'].idxmax() - 3:].min()
+signal = 1 if df['sma_fast'].iloc[-2] > df['sma_slow'].iloc[-2] else -1
+print(time.perf_counter() - t0)
+"""
+
+
+def measure(code):
+    samples = []
+    for _ in range(SAMPLES):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return samples
+
+
+def summary(name, samples):
+    samples = sorted(samples)
+    print(f"{name:<24} p50: {statistics.median(samples):7.1f}ms | min: {samples[0]:7.1f}ms | "
+          f"max: {samples[-1]:7.1f}ms")
+
+
+t0 = time.perf_counter()
+summary("genofinlib imports", measure(IMPORT_LIB))
+summary("imports + first bar", measure(FIRST_BAR))
+print(f"Total benchmark time: {time.perf_counter() - t0:.1f}s")
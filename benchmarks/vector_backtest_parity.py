@@ -0,0 +1,170 @@
+import time
+import numpy as np
+import pandas as pd
+from backtesting import Backtest, Strategy
+from genofinlib.vector_strategies import run_strategy, sma, MACRO_EVENT_DATE
+
+# ==========================================
+# VECTOR ENGINE vs backtesting.py (PARITY + SPEED)
+# ==========================================
+# Synthetic 4h random walk so the check runs anywhere; the reference strategies below are
+# the optimizer/backtester classes with pandas_ta.sma swapped for the identical pandas rolling mean.
+BARS = 12_000
+REPEATS = 5
+BT_KWARGS = dict(cash=100_000_000, commission=.0005, margin=1 / 10)
+CHECKED = ['# Trades', 'Equity Final [$]', 'Return [%]', 'Max. Drawdown [%]', 'Win Rate [%]',
+           'Expectancy [%]', 'Profit Factor', 'Avg. Trade [%]', 'Exposure Time [%]', 'SQN', 'Sharpe Ratio']
+
+
+def synthetic_ohlc(bars=BARS, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 10_000 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, bars)))
+    open_ = np.concatenate(([close[0]], close[:-1])) * np.exp(rng.normal(0, 0.002, bars))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, bars)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, bars)))
+    index = pd.date_range('2019-04-02', periods=bars, freq='4h')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index)
+
+
+class TrendRef(Strategy):
+    length = 10
+    base_tp = 1.40
+    macro_boost_tp = 1.70
+    sl_pct = 0.97
+    reentry_sl = 0.98
+    l2_trigger = 1.03
+    base_size = 0.2
+    max_size = 0.4
+    drawdown_limit = 0.80
+
+    def init(self):
+        self.trend_line = self.I(sma, self.data.Close, self.length)
+        self.entry_prices = [1]
+        self.current_size = self.base_size
+
+    def next(self):
+        current_price = self.data.Close[-1]
+        signal_cur = 1 if current_price > self.trend_line[-1] else -1
+        signal_prev = 1 if self.data.Close[-2] > self.trend_line[-2] else -1
+        active_tp = self.base_tp if pd.Timestamp(MACRO_EVENT_DATE) > self.data.index[-1] else self.macro_boost_tp
+
+        if signal_cur > 0 > signal_prev and not self.position.is_long:
+            high_series = pd.Series(self.data.High)
+            highest_high = high_series.max()
+            lowest_low = pd.Series(self.data.Low).iloc[max(0, high_series.idxmax() - 3):].min()
+            self.entry_prices.append(current_price)
+            if highest_high * self.drawdown_limit > lowest_low:
+                self.current_size = min(self.max_size, self.current_size + 0.05)
+            else:
+                self.current_size = self.base_size
+            self.buy(sl=current_price * self.sl_pct, tp=current_price * active_tp, size=self.current_size)
+        elif (signal_cur > 0 and self.entry_prices[-1] * 1.2 > current_price > self.entry_prices[-1] * self.l2_trigger
+              and not self.position.is_long):
+            self.buy(sl=self.entry_prices[-1] * self.reentry_sl, tp=self.entry_prices[-1] * active_tp,
+                     size=self.current_size)
+        elif signal_cur < 0 < signal_prev and not self.position.is_short:
+            self.position.close()
+
+
+class RobespierreRef(Strategy):
+    length = 11
+    base_tp = 1.50
+    sl_pct = 0.97
+    reentry_sl = 0.98
+    l2_trigger = 1.035
+    base_size = 0.1
+    max_size = 0.3
+
+    def init(self):
+        self.trend_line = self.I(sma, self.data.Close, self.length)
+        self.entry_prices = [0]
+        self.current_size = self.base_size
+        self.uptrend = False
+
+    def next(self):
+        signal = self.trend_line
+        current_price = self.data.Close[-1]
+        buy_signal = signal[-1] > signal[-2] and signal[-2] <= signal[-3]
+        sell_signal = signal[-1] < signal[-2] and signal[-2] >= signal[-3]
+
+        if buy_signal and not self.position.is_long and not self.uptrend:
+            self.uptrend = True
+            high_series = pd.Series(self.data.High)
+            highest_high = high_series.max()
+            lowest_low = pd.Series(self.data.Low).iloc[max(0, high_series.idxmax() - 3):].min()
+            self.entry_prices.append(current_price)
+            if highest_high * 0.80 > lowest_low:
+                self.current_size = min(self.max_size, self.current_size + 0.05)
+            else:
+                self.current_size = self.base_size
+            self.buy(sl=current_price * self.sl_pct, tp=current_price * self.base_tp, size=self.current_size)
+        elif (self.entry_prices[-1] * 1.2 > current_price > self.entry_prices[-1] * self.l2_trigger
+              and not self.position.is_long and self.uptrend):
+            self.buy(sl=self.entry_prices[-1] * self.reentry_sl, tp=self.entry_prices[-1] * self.base_tp,
+                     size=self.current_size)
+        elif sell_signal and not self.position.is_short:
+            self.uptrend = False
+            self.position.close()
+
+
+class JoanRef(Strategy):
+    trend_length = 7
+    sl_tier1 = 1.02
+    sl_tier2 = 1.05
+    tp_base = 0.90
+    base_size = 0.3
+
+    def init(self):
+        self.trend_line = self.I(sma, self.data.Close, self.trend_length)
+
+    def next(self):
+        current_price = self.data.Close[-1]
+        signal_cur = 1 if current_price > self.trend_line[-1] else -1
+        signal_prev = 1 if self.data.Close[-2] > self.trend_line[-2] else -1
+        if signal_cur > 0 > signal_prev and not self.position.is_long:
+            self.position.close()
+        elif signal_cur < 0 < signal_prev and not self.position.is_short:
+            self.sell(sl=current_price * self.sl_tier1, tp=current_price * self.tp_base, size=self.base_size / 2)
+            self.sell(sl=current_price * self.sl_tier2, tp=current_price * self.tp_base, size=self.base_size / 2)
+
+
+class AlphaMacroRef(Strategy):
+    trend_length = 20
+    base_size = 0.1
+
+    def init(self):
+        self.trend_line = self.I(sma, self.data.Close, self.trend_length)
+
+    def next(self):
+        signal = self.trend_line
+        if signal[-1] > signal[-2] and signal[-2] <= signal[-3] and not self.position.is_long:
+            self.buy(size=self.base_size)
+        elif signal[-1] < signal[-2] and signal[-2] >= signal[-3] and not self.position.is_short:
+            self.position.close()
+
+
+CASES = [("trend", TrendRef), ("robespierre", RobespierreRef), ("joan", JoanRef), ("alpha_macro", AlphaMacroRef)]
+
+
+def timed(fn):
+    best = np.inf
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+ohlc = synthetic_ohlc()
+for name, ref in CASES:
+    bt = Backtest(ohlc, ref, exclusive_orders=True, **BT_KWARGS)
+    t0 = time.perf_counter()
+    expected = bt.run()
+    bt_time = time.perf_counter() - t0
+    result, vec_time = timed(lambda: run_strategy(name, ohlc, **BT_KWARGS))
+    got = result.stats()
+
+    mismatches = [k for k in CHECKED if not np.isclose(got[k], expected[k], rtol=1e-9, equal_nan=True)]
+    status = "OK" if not mismatches else f"MISMATCH {[(k, got[k], expected[k]) for k in mismatches]}"
+    print(f"{name:<12} trades: {expected['# Trades']:4d} | backtesting.py: {bt_time * 1000:8.1f}ms | "
+          f"vector: {vec_time * 1000:6.2f}ms | x{bt_time / vec_time:6.0f} | {status}")
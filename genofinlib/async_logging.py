@@ -0,0 +1,92 @@
+import sys
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+MAX_PENDING = 10000  # records buffered for the writer before new ones are dropped
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks: the record is formatted on the caller's thread
+    (message and traceback text are fixed at the moment of the call) and handed to
+    the writer thread. If the writer falls MAX_PENDING records behind, new records
+    are counted and dropped instead of stalling the trading loop.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DropReportingListener(QueueListener):
+    """Writer thread: emits a warning line whenever records had to be dropped"""
+
+    def __init__(self, log_queue, source, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.source = source
+        self.reported = 0
+
+    def handle(self, record):
+        dropped = self.source.dropped
+        if dropped != self.reported:
+            note = logging.makeLogRecord({"levelno": logging.WARNING, "levelname": "WARNING",
+                                          "msg": f"Logging backlog: {dropped - self.reported} records dropped"})
+            self.reported = dropped
+            super().handle(note)
+        super().handle(record)
+
+
+def setup_async_logging(level=logging.INFO, stream=None, fmt=LOG_FORMAT):
+    """
+    Routes the root logger through a bounded queue to a single writer thread, so slow
+    stdout / disk I/O never adds latency to the caller. Returns the running listener
+    (stopped and flushed automatically at interpreter exit).
+    """
+    log_queue = queue.Queue(MAX_PENDING)
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(logging.Formatter(fmt))
+
+    handler = DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+        old.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = DropReportingListener(log_queue, handler, writer)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class ChangeLogger:
+    """
+    Logs a block of values only when one of the watched values differs from the
+    previous call. Context values (prices, indicator levels) ride along in the line
+    but never trigger it on their own, so a loop running twice a second stays quiet
+    until something actually changes.
+    """
+
+    def __init__(self, title, logger=None):
+        self.title = title
+        self.logger = logger or logging.getLogger()
+        self.last = None
+
+    def update(self, watched, context=None):
+        """Returns True when the block was logged"""
+        if watched == self.last:
+            return False
+        self.last = dict(watched)
+        fields = {**(context or {}), **watched}
+        self.logger.info("%s | %s", self.title, " | ".join(f"{k}: {v}" for k, v in fields.items()))
+        return True
@@ -1,8 +1,16 @@
-import pandas as pd
-import pandas_ta as ta
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:  # pandas loads on the trader's side thread; only the annotations need it here
+    import pandas as pd
 
-def calculate_rsi_candles(df: pd.DataFrame, length: int = 6):
+
+def _ta():
+    """pandas_ta takes ~1s to import, so it is only loaded when an indicator is first computed"""
+    import pandas_ta
+    return pandas_ta
+
+
+def calculate_rsi_candles(df: "pd.DataFrame", length: int = 6):
     """
     [SANITIZED] 
     Proprietary RSI projection and Wilder's Smoothing logic removed.
@@ -11,7 +19,7 @@ def calculate_rsi_candles(df: pd.DataFrame, length: int = 6):
     df_copy = df.copy()
     
     # Standard RSI fallback
-    standard_rsi = ta.rsi(df_copy['close'], length=length)
+    standard_rsi = _ta().rsi(df_copy['close'], length=length)
     
     # Fill required columns with basic standard RSI to prevent downstream structural breaks
     df_copy['rsi_open'] = standard_rsi
@@ -29,11 +37,11 @@ def normalized_atr(df, length):
     Replaced with standard Average True Range calculation.
     """
     # Standard fallback ATR
-    return ta.atr(df['high'], df['low'], df['close'], length=length)
+    return _ta().atr(df['high'], df['low'], df['close'], length=length)
 
 
 def supertrend(close, high, low, length, multiplier):
     """
     Standard Supertrend wrapper using pandas_ta.
     """
-    return ta.supertrend(high=high, low=low, close=close, length=length, multiplier=multiplier)
+    return _ta().supertrend(high=high, low=low, close=close, length=length, multiplier=multiplier)
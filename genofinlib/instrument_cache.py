@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import logging
+import threading
+
+
+# ==========================================
+# CACHE SETTINGS
+# ==========================================
+CACHE_DIR = os.environ.get("GENOFIN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "genofin"))
+CACHE_FILE = "instruments.json"
+DEFAULT_TTL = 6 * 3600  # stepSize / tickSize / ctVal practically never change intraday
+
+
+class InstrumentCache:
+    """
+    On-disk cache for static instrument metadata (filters, contract sizes, lot sizes).
+    Fresh entries are served from memory, stale entries are still served immediately
+    while a background thread refreshes them, and only a missing entry blocks on the network.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = path or os.path.join(CACHE_DIR, CACHE_FILE)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # one file writer at a time, independent of readers
+        self.refreshing = set()
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f"Instrument cache unreadable, starting empty: {e}")
+            return {}
+
+    def _write(self):
+        """
+        Writes a snapshot of the entries. Called without self.lock, which is held only for the
+        copy, so readers on the order path never wait on disk; taking the snapshot under
+        write_lock keeps the newest state the last one written.
+        """
+        try:
+            with self.write_lock:
+                with self.lock:
+                    entries = dict(self.entries)
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)  # atomic, so other processes never read half a file
+        except Exception as e:
+            logging.warning(f"Instrument cache write failed: {e}")
+
+    def _store(self, key, data):
+        with self.lock:
+            self.entries[key] = {"ts": time.time(), "data": data}
+        self._write()
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception as e:
+            logging.warning(f"Instrument refresh failed for {key}: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get(self, key, loader):
+        """Returns the cached value for `key`, calling `loader()` only when nothing is cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if time.time() - entry["ts"] > self.ttl and key not in self.refreshing:
+                    self.refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                return entry["data"]
+
+        data = loader()
+        self._store(key, data)
+        return data
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+        self._write()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_instrument_cache():
+    """Process-wide cache shared by the master OrderManager and every slave client"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InstrumentCache()
+        return _cache
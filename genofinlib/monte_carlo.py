@@ -0,0 +1,140 @@
+import os
+import multiprocessing
+import numpy as np
+
+# ==========================================
+# MONTE CARLO OVER A TRADE LIST
+# ==========================================
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+CHUNK_ELEMENTS = 2_000_000  # simulations x trades per matrix (5 float64 matrices of ~16 MB)
+METHODS = ("bootstrap", "permutation")
+SEGMENT_FIELDS = ("return", "trough", "high", "drawdown")
+
+
+def _equity_segments(entry_bar, equity):
+    """
+    Splits the equity curve at every entry: segment k runs from the bar before trade k's
+    fill to the bar before trade k+1's (the last one to the end), so the segments chain
+    back into the whole curve. Per segment, relative to its starting equity: end return,
+    lowest and highest mark-to-market equity, and the drawdown from its own running high.
+    """
+    equity = np.asarray(equity, dtype=float)
+    bounds = np.append(np.maximum(np.asarray(entry_bar, dtype=int) - 1, 0), len(equity) - 1)
+    out = np.zeros((len(bounds) - 1, len(SEGMENT_FIELDS)))
+    for k, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        path = equity[lo:hi + 1] / equity[lo]
+        out[k] = (path[-1] - 1, path.min() - 1, path.max() - 1,
+                  1 - (path / np.maximum.accumulate(path)).min())
+    return out
+
+
+def trade_returns(trades, cash, equity=None):
+    """
+    (position returns, equity segments) of a trade list: stats._trades, VectorResult.trades()
+    or anything with EntryBar/ReturnPct/PnL columns. Segments are (trades x SEGMENT_FIELDS).
+
+    With the run's equity curve (stats._equity_curve['Equity'], VectorResult.equity) the
+    segments carry each trade's worst in-trade excursion, so the drawdown is marked to
+    market on every bar like backtesting.py's. Without it only the closed-trade PnL is known
+    (one position at a time assumed) and the drawdown is a closed-trade drawdown.
+    """
+    order = np.argsort(np.asarray(trades["EntryBar"]), kind="stable")
+    position = np.asarray(trades["ReturnPct"], dtype=float)[order]
+    if equity is not None:
+        return position, _equity_segments(np.asarray(trades["EntryBar"])[order], equity)
+    pnl = np.asarray(trades["PnL"], dtype=float)[order]
+    equity_before = cash + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    r = pnl / equity_before
+    return position, np.column_stack((r, np.minimum(r, 0), np.maximum(r, 0), np.maximum(-r, 0)))
+
+
+def _metrics(position, segments, drawdown_label="Max. Drawdown [%]"):
+    """
+    Per-row metrics of (simulations x trades) matrices, in backtesting.py's units.
+    `segments` is (simulations x trades x SEGMENT_FIELDS). Within a segment that starts at
+    path value P under the running peak H, the deepest point is the larger of
+    1 - P * (1 + trough) / H and the segment's own drawdown, so the chained path's max
+    drawdown is exact without replaying the bars.
+    """
+    r, trough, high, own = (segments[..., i] for i in range(len(SEGMENT_FIELDS)))
+    path = np.cumprod(1 + r, axis=1)
+    start = np.concatenate((np.ones((len(path), 1)), path[:, :-1]), axis=1)
+    peak_after = np.maximum(np.maximum.accumulate(start * (1 + high), axis=1), 1.0)  # the cash is a peak too
+    peak_before = np.concatenate((np.ones((len(path), 1)), peak_after[:, :-1]), axis=1)
+    drawdown = np.maximum(1 - start * (1 + trough) / peak_before, own).max(axis=1)
+    wins = np.where(position > 0, position, 0).sum(axis=1)
+    losses = -np.where(position < 0, position, 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_factor = wins / losses
+    return {
+        "Return [%]": (path[:, -1] - 1) * 100,
+        drawdown_label: -np.maximum(drawdown, 0) * 100,
+        "Expectancy [%]": position.mean(axis=1) * 100,
+        "Win Rate [%]": (position > 0).mean(axis=1) * 100,
+        "Profit Factor": profit_factor,
+    }
+
+
+def _simulate_chunk(job):
+    position, segments, sims, method, seed, drawdown_label = job
+    rng = np.random.default_rng(seed)
+    n = len(position)
+    if method == "bootstrap":
+        # the same draw for both keeps each trade's position return and equity segment together
+        picks = rng.integers(0, n, size=(sims, n))
+    else:
+        picks = rng.random((sims, n)).argsort(axis=1)
+    return _metrics(position[picks], segments[picks], drawdown_label)
+
+
+def resample(position, segments, n_sims=10_000, method="bootstrap", processes=1, seed=0,
+             drawdown_label="Max. Drawdown [%]"):
+    """
+    Metric samples of n_sims resampled trade sequences, computed as whole matrices.
+    bootstrap draws trades with replacement (sampling error of every metric);
+    permutation reshuffles the same trades (path risk: drawdown and compounding only,
+    expectancy/win rate/profit factor stay at the observed values).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method: {method}")
+    position = np.asarray(position, dtype=float)
+    segments = np.asarray(segments, dtype=float)
+    if not len(position):
+        raise ValueError("Need at least one trade to resample")
+    per_chunk = max(1, CHUNK_ELEMENTS // len(position))
+    sizes = [min(per_chunk, n_sims - done) for done in range(0, n_sims, per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(position, segments, sims, method, s, drawdown_label) for sims, s in zip(sizes, seeds)]
+
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes == 1:
+        chunks = list(map(_simulate_chunk, jobs))
+    else:
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            chunks = pool.map(_simulate_chunk, jobs)
+    return {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+
+
+def monte_carlo(trades, cash, n_sims=10_000, method="bootstrap", quantiles=QUANTILES, processes=1, seed=0,
+                equity=None):
+    """
+    Distribution quantiles of return, max drawdown, expectancy, win rate and profit factor
+    over n_sims resamples of a backtest's trades. One row per metric, one column per
+    quantile plus the observed value, e.g.
+
+        mc = monte_carlo(stats._trades, cash=100_000_000, equity=stats._equity_curve['Equity'],
+                         n_sims=50_000, processes=None)
+        mc.loc['Max. Drawdown [%]', 0.05]   # 1-in-20 drawdown
+
+    Pass the equity curve: the drawdown then includes every trade's in-trade excursion and
+    the observed row equals backtesting.py's. Without it the row is named
+    'Closed-Trade Drawdown [%]' and only sees equity at trade exits.
+    """
+    import pandas as pd
+    label = "Max. Drawdown [%]" if equity is not None else "Closed-Trade Drawdown [%]"
+    position, segments = trade_returns(trades, cash, equity)
+    samples = resample(position, segments, n_sims, method, processes, seed, label)
+    observed = _metrics(position[None, :], segments[None, :], label)
+    table = pd.DataFrame({q: {k: np.nanquantile(v, q) for k, v in samples.items()} for q in quantiles})
+    table["observed"] = pd.Series({k: v[0] for k, v in observed.items()})
+    return table
@@ -0,0 +1,137 @@
+from functools import cached_property
+import numpy as np
+
+# ==========================================
+# OPTIMIZER OBJECTIVES WITHOUT THE FULL STATS SERIES
+# ==========================================
+# Each metric is computed on its own from the equity curve and the trade arrays, with the
+# exact formulas of backtesting.py 0.3.3's compute_stats, so a grid point only pays for
+# the number it is scored on.
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _geometric_mean(returns):
+    """backtesting._stats.geometric_mean: NaN counts as a 0 return, any wipe-out gives 0"""
+    returns = np.nan_to_num(returns, nan=0.0) + 1
+    if np.any(returns <= 0):
+        return 0
+    return np.exp(np.log(returns).sum() / (len(returns) or np.nan)) - 1
+
+
+def _sample_std(values):
+    """pandas' .std(): ddof=1 over the non-NaN values, NaN below two of them"""
+    values = values[~np.isnan(values)]
+    return values.std(ddof=1) if len(values) > 1 else np.nan
+
+
+class _Run:
+    """Lazily shared intermediates (drawdown, daily returns) of one VectorResult"""
+
+    def __init__(self, result):
+        self.result = result
+        self.equity = np.asarray(result.equity, dtype=float)
+        self.pnl = np.asarray(result.pnl, dtype=float)
+        self.returns = np.asarray(result.returns, dtype=float)
+
+    @cached_property
+    def max_drawdown(self):
+        """Max drawdown as a positive fraction (0 without any)"""
+        dd = 1 - self.equity / np.maximum.accumulate(self.equity)
+        return np.nan_to_num(dd.max())
+
+    @cached_property
+    def days(self):
+        """(daily returns with pct_change's leading NaN, trading days per year)"""
+        import pandas as pd
+        index = pd.DatetimeIndex(self.result.ohlc.index)
+        day = index.as_unit('ns').asi8 // NS_PER_DAY
+        last = np.flatnonzero(np.append(day[1:] != day[:-1], True))  # resample('D').last()
+        closes = self.equity[last]
+        day_returns = np.concatenate(([np.nan], closes[1:] / closes[:-1] - 1))
+        weekend = np.isin(index.dayofweek, (5, 6)).mean()
+        return day_returns, float(365 if weekend > 2 / 7 * .6 else 252)
+
+    @cached_property
+    def gmean_day_return(self):
+        return _geometric_mean(self.days[0])
+
+    @cached_property
+    def annualized_return(self):
+        return (1 + self.gmean_day_return) ** self.days[1] - 1
+
+    @cached_property
+    def volatility(self):
+        day_returns, annual = self.days
+        g = self.gmean_day_return
+        variance = _sample_std(day_returns) ** 2
+        return np.sqrt((variance + (1 + g) ** 2) ** annual - (1 + g) ** (2 * annual)) * 100
+
+
+def _exposure(run):
+    have_position = np.zeros(len(run.equity) + 1, dtype=int)
+    np.add.at(have_position, run.result.entry_bar, 1)
+    np.add.at(have_position, np.asarray(run.result.exit_bar) + 1, -1)
+    return (np.cumsum(have_position[:-1]) > 0).mean() * 100
+
+
+def _sortino(run):
+    day_returns, annual = run.days
+    downside = np.minimum(day_returns[~np.isnan(day_returns)], 0)
+    if not len(downside):
+        return np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(run.annualized_return / (np.sqrt(np.mean(downside ** 2)) * np.sqrt(annual)), 0, np.inf)
+
+
+def _profit_factor(run):
+    r = run.returns
+    return r[r > 0].sum() / (abs(r[r < 0].sum()) or np.nan)
+
+
+def _buy_and_hold(run):
+    close = run.result.ohlc['Close'].to_numpy()
+    return (close[-1] - close[0]) / close[0] * 100
+
+
+METRICS = {
+    '# Trades': lambda run: len(run.returns),
+    'Exposure Time [%]': _exposure,
+    'Equity Final [$]': lambda run: run.equity[-1],
+    'Equity Peak [$]': lambda run: run.equity.max(),
+    'Return [%]': lambda run: (run.equity[-1] - run.equity[0]) / run.equity[0] * 100,
+    'Buy & Hold Return [%]': _buy_and_hold,
+    'Return (Ann.) [%]': lambda run: run.annualized_return * 100,
+    'Volatility (Ann.) [%]': lambda run: run.volatility,
+    'Sharpe Ratio': lambda run: np.clip(run.annualized_return * 100 / (run.volatility or np.nan), 0, np.inf),
+    'Sortino Ratio': _sortino,
+    'Calmar Ratio': lambda run: np.clip(run.annualized_return / (run.max_drawdown or np.nan), 0, np.inf),
+    'Max. Drawdown [%]': lambda run: -run.max_drawdown * 100,
+    'Win Rate [%]': lambda run: (run.pnl > 0).sum() / len(run.pnl) * 100 if len(run.pnl) else np.nan,
+    'Best Trade [%]': lambda run: run.returns.max() * 100 if len(run.returns) else np.nan,
+    'Worst Trade [%]': lambda run: run.returns.min() * 100 if len(run.returns) else np.nan,
+    'Avg. Trade [%]': lambda run: _geometric_mean(run.returns) * 100,
+    'Profit Factor': _profit_factor,
+    'Expectancy [%]': lambda run: run.returns.mean() * 100 if len(run.returns) else np.nan,
+    'SQN': lambda run: np.sqrt(len(run.pnl)) * run.pnl.mean() / (_sample_std(run.pnl) or np.nan)
+    if len(run.pnl) else np.nan,
+}
+
+
+def compute(result, names):
+    """The requested backtesting.py metrics of a VectorResult, as {name: value}"""
+    run = _Run(result)
+    return {name: METRICS[name](run) for name in names}
+
+
+def objective(result, maximize):
+    """
+    wfo.score for a VectorResult: NaN when the run made no trade, else the `maximize`
+    metric. Names outside METRICS (durations, average drawdown) and callables, which may
+    read any field, fall back to the full stats() Series.
+    """
+    from .wfo import score
+    if not len(result.size):
+        return np.nan
+    if isinstance(maximize, str) and maximize in METRICS:
+        return float(METRICS[maximize](_Run(result)))
+    return score(result.stats(), maximize)
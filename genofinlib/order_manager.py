@@ -1,32 +1,46 @@
 import time
 import logging
+import threading
 import requests
 import hmac
 import hashlib
 import urllib.parse
-import math
+from collections import deque
 from .slack_bot import StrategyState, trade_message, error_message
+from .rate_limiter import get_governor
+from .instrument_cache import get_instrument_cache
+from .quantizer import get_quantizer
+from .order_registry import OrderRegistry, ENTRY, EXIT, SL, TP
+from .time_sync import RECV_WINDOW
 
 
 class OrderManager:
-    def __init__(self, ws_api, symbol, api_key, api_secret, is_testnet=False):
+    def __init__(self, ctx, ws_api, symbol):
+        self.ctx = ctx
         self.ws_api = ws_api
         self.symbol = symbol
-        self.api_key = api_key
-        self.api_secret = api_secret
-        self.is_testnet = is_testnet
-        self.base_url = "https://testnet.binancefuture.com" if is_testnet else "https://fapi.binance.com"
+        self.api_key = ctx.api_key
+        self.api_secret = ctx.api_secret
+        self.is_testnet = ctx.is_testnet
+        self.base_url = ctx.fapi_url
         self.active_tp_id = None
+        self.tp_replaces = {}  # strategy -> TpReplace in flight
+        self.tp_lock = threading.Lock()
+        self.registry = OrderRegistry()
 
         self.markets = {}
+        self.markets_key = f"binance{'-testnet' if self.is_testnet else ''}:markets"
         self.session = requests.Session()
         self.session.headers.update({'X-MBX-APIKEY': self.api_key})
+        self.governor = get_governor("binance")
+        self.clock = ctx.clock("binance")
 
-    def _request(self, method, endpoint, params=None, signed=False):
+    def _request(self, method, endpoint, params=None, signed=False, weight=1, is_order=False):
         params = params or {}
+        self.governor.acquire(weight, is_order)
         if signed:
-            params['timestamp'] = int(time.time() * 1000)
-            params['recvWindow'] = 10000
+            params['timestamp'] = self.clock.now_ms()
+            params['recvWindow'] = RECV_WINDOW
             query_string = urllib.parse.urlencode(params)
             signature = hmac.new(self.api_secret.encode('utf-8'), query_string.encode('utf-8'),
                                  hashlib.sha256).hexdigest()
@@ -36,6 +50,7 @@ class OrderManager:
             url = f"{self.base_url}{endpoint}?{query_string}" if query_string else f"{self.base_url}{endpoint}"
 
         res = self.session.request(method, url)
+        self.governor.check_response(res.status_code, res.headers)
         if not res.ok:
             raise Exception(f"Binance API Error ({res.status_code}): {res.text}")
         return res.json()
@@ -43,49 +58,62 @@ class OrderManager:
     # ==========================================
     # DATA & MARKET METHODS (Replacing CCXT)
     # ==========================================
-    def load_markets(self):
+    def _download_markets(self):
+        markets = {}
         info = self._request("GET", "/fapi/v1/exchangeInfo")
         for symbol_data in info['symbols']:
             filters = {f['filterType']: f for f in symbol_data['filters']}
-            self.markets[symbol_data['symbol']] = {
+            markets[symbol_data['symbol']] = {
                 'stepSize': float(filters.get('LOT_SIZE', {}).get('stepSize', 0.001)),
                 'tickSize': float(filters.get('PRICE_FILTER', {}).get('tickSize', 0.001))
             }
+        return markets
+
+    def load_markets(self):
+        """
+        Reads the filters through the instrument cache. The quantizers call it on every use,
+        so a background refresh of a stale entry reaches them without a restart.
+        """
+        self.markets = get_instrument_cache().get(self.markets_key, self._download_markets)
         return self.markets
 
+    def _quantizer(self, symbol, field):
+        filters = self.load_markets().get(symbol.replace("/", ""))
+        return get_quantizer(filters[field]) if filters else get_quantizer(0.001)
+
     def fetch_ohlcv(self, symbol, timeframe, limit=1500):
         binance_symbol = symbol.replace("/", "")
         klines = self._request("GET", "/fapi/v1/klines",
-                               {'symbol': binance_symbol, 'interval': timeframe, 'limit': limit})
+                               {'symbol': binance_symbol, 'interval': timeframe, 'limit': limit},
+                               weight=10 if limit > 1000 else 5)
         return [[int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])] for k in klines]
 
     def fetch_balance(self):
-        account = self._request("GET", "/fapi/v2/account", signed=True)
+        account = self._request("GET", "/fapi/v2/account", signed=True, weight=5)
         return {'info': account}
 
     def fetch_positions(self, symbols=None):
-        raw_positions = self._request("GET", "/fapi/v2/positionRisk", signed=True)
+        raw_positions = self._request("GET", "/fapi/v2/positionRisk", signed=True, weight=5)
         if symbols:
             binance_symbols = [s.replace("/", "") for s in symbols]
             raw_positions = [p for p in raw_positions if p['symbol'] in binance_symbols]
-        return [{'symbol': p['symbol'], 'contracts': float(p['positionAmt']), 'positionAmt': p['positionAmt']} for p in
-                raw_positions]
+        return [{'symbol': p['symbol'], 'contracts': float(p['positionAmt']), 'positionAmt': p['positionAmt'],
+                 'notional': abs(float(p.get('notional', 0)))} for p in raw_positions]
 
     def set_leverage(self, leverage, symbol):
         binance_symbol = symbol.replace("/", "")
         return self._request("POST", "/fapi/v1/leverage", {'symbol': binance_symbol, 'leverage': leverage}, signed=True)
 
     def amount_to_precision(self, symbol, amount):
-        binance_symbol = symbol.replace("/", "")
-        step_size = self.markets.get(binance_symbol, {}).get('stepSize', 0.001)
-        precision = int(round(-math.log(step_size, 10), 0))
-        return f"{amount:.{precision}f}"
+        # Quantities always floor to the step so we never size above the available margin
+        q = self._quantizer(symbol, 'stepSize')
+        return q.to_str(amount, "floor")
 
-    def price_to_precision(self, symbol, price):
-        binance_symbol = symbol.replace("/", "")
-        tick_size = self.markets.get(binance_symbol, {}).get('tickSize', 0.001)
-        precision = int(round(-math.log(tick_size, 10), 0))
-        return f"{price:.{precision}f}"
+    def price_to_precision(self, symbol, price, side=None):
+        q = self._quantizer(symbol, 'tickSize')
+        if side is None:
+            return q.to_str(price, "nearest")
+        return q.to_str(price, q.mode_for_side(side))
 
     def enable_demo_trading(self, enable):
         pass  # Handled inherently by the is_testnet flag in __init__
@@ -97,13 +125,15 @@ class OrderManager:
         # 1. Cancel Standard via REST (Replacing CCXT cancel)
         try:
             binance_symbol = self.symbol.replace("/", "")
-            self._request("DELETE", "/fapi/v1/allOpenOrders", {'symbol': binance_symbol}, signed=True)
+            self._request("DELETE", "/fapi/v1/allOpenOrders", {'symbol': binance_symbol}, signed=True,
+                          is_order=True)
         except:
             pass
 
         # 2. Cancel Algo via REST
         try:
-            self._request("DELETE", "/fapi/v1/algoOpenOrders", {'symbol': self.symbol.replace('/', '')}, signed=True)
+            self._request("DELETE", "/fapi/v1/algoOpenOrders", {'symbol': self.symbol.replace('/', '')}, signed=True,
+                          is_order=True)
         except Exception as e:
             logging.error(f"Algo Cancel Error: {e}")
             trade_message(f"Algo Cancel Error: {e}", StrategyState.VK)
@@ -111,68 +141,180 @@ class OrderManager:
         logging.info("All Orders Cancelled")
         trade_message("All Orders Cancelled", StrategyState.VK)
 
-    def cancel_algo_order(self, client_algo_id):
-        self.ws_api.send_request("algoOrder.cancel", {
+    def cancel_algo_order(self, client_algo_id, callback=None):
+        return self.ws_api.send_request("algoOrder.cancel", {
             "symbol": self.symbol.replace('/', ''),
             "clientAlgoId": client_algo_id
-        })
+        }, callback=callback)
+
+    def cancel_strategy_orders(self, strategy, kind=None):
+        """Cancels only the SL/TP orders the registry knows are open (WS, no REST sweep)"""
+        for order in self.registry.open_orders(strategy, kind):
+            if order.kind in (SL, TP):
+                self.cancel_algo_order(order.cid)
 
-    def enter_long(self, amount, leverage):
-        self.ws_api.send_request("order.place", {
-            "symbol": self.symbol.replace('/', ''), "side": "BUY", "type": "MARKET", "quantity": amount
+    def enter_long(self, amount, leverage, strategy=None):
+        """Returns the monotonic stamp the order went out at (slaves measure copy lag from it), None if unsent"""
+        cid = self.registry.new_order(ENTRY, strategy, "BUY", amount)
+        req_id = self.ws_api.send_request("order.place", {
+            "symbol": self.symbol.replace('/', ''), "side": "BUY", "type": "MARKET", "quantity": amount,
+            "newClientOrderId": cid
         })
+        if req_id is None:
+            self.registry.mark(cid, "REJECTED")
+            error_message(f"Long Entry Not Sent | Qty: {amount}", StrategyState.VK)
+            return None
+        sent_at = time.monotonic()
         log_msg = f"Long Entry | Qty: {amount} | Lev: {leverage}"
         logging.info(log_msg)
         trade_message(log_msg, StrategyState.VK)
+        return sent_at
 
-    def exit_long(self):
+    def exit_long(self, strategy=None):
+        """Like enter_long: the send stamp of the close, None when no order went out"""
         try:
             pos = self.fetch_positions([self.symbol])[0]
             amt = abs(float(pos["contracts"]))
             if amt > 0:
-                self.ws_api.send_request("order.place", {
+                cid = self.registry.new_order(EXIT, strategy, "SELL", amt)
+                req_id = self.ws_api.send_request("order.place", {
                     "symbol": self.symbol.replace('/', ''), "side": "SELL", "type": "MARKET", "quantity": amt,
-                    "reduceOnly": True
+                    "reduceOnly": True, "newClientOrderId": cid
                 })
+                if req_id is None:
+                    self.registry.mark(cid, "REJECTED")
+                    error_message(f"Long Exit Not Sent | Qty: {amt}", StrategyState.VK)
+                    return None
+                sent_at = time.monotonic()
                 log_msg = f"Long Exit | Closed Qty: {amt}"
                 logging.info(log_msg)
                 trade_message(log_msg, StrategyState.VK)
+                return sent_at
         except Exception as e:
             logging.error(f"Exit Error: {e}")
             error_message(f"Long Exit Error: {e}", StrategyState.VK)
+        return None
 
-    def place_sl(self, amount, price):
-        ts = str(int(time.time()))
-        final_price = self.price_to_precision(self.symbol, price)
+    def place_sl(self, amount, price, strategy=None):
+        final_price = self.price_to_precision(self.symbol, price, side="SELL")
+        cid = self.registry.new_order(SL, strategy, "SELL", amount, final_price)
 
         self.ws_api.send_request("algoOrder.place", {
             "algoType": "CONDITIONAL", "symbol": self.symbol.replace('/', ''), "side": "SELL", "type": "STOP_MARKET",
             "quantity": amount, "triggerPrice": final_price, "reduceOnly": True, "workingType": "MARK_PRICE",
-            "priceProtect": True, "clientAlgoId": f"SL_L1_{ts}"
+            "priceProtect": True, "clientAlgoId": cid
         })
         logging.info(f"SL Sent| Qty: {amount} | Price: {final_price}")
         trade_message(f"SL Sent | Qty: {amount} | Prc: {final_price}", StrategyState.VK)
 
-    def place_tp(self, amount, price):
-        ts = str(int(time.time()))
-        cid = f"TP_{ts}"
-        self.active_tp_id = cid
+    def place_tp(self, amount, price, strategy=None, callback=None):
+        """
+        The TP only enters the registry and becomes active_tp_id once the exchange acked it,
+        so a rejected or unsent TP is never the one modify_tp cancels or replaces.
+        """
+        final_price = self.price_to_precision(self.symbol, price, side="SELL")
+        cid = self.registry.next_cid(TP, strategy)
 
-        final_price = self.price_to_precision(self.symbol, price)
+        def on_ack(response):
+            if 'error' not in response:
+                self.registry.track(cid, TP, strategy, "SELL", amount, final_price)
+                self.active_tp_id = cid
+            if callback:
+                callback(response)
 
-        self.ws_api.send_request("algoOrder.place", {
+        req_id = self.ws_api.send_request("algoOrder.place", {
             "algoType": "CONDITIONAL", "symbol": self.symbol.replace('/', ''), "side": "SELL",
             "type": "TAKE_PROFIT_MARKET",
             "quantity": amount, "triggerPrice": final_price, "reduceOnly": True, "workingType": "CONTRACT_PRICE",
             "clientAlgoId": cid
-        })
+        }, callback=on_ack)
         logging.info(f"TP Sent| Qty: {amount} | Price: {final_price}")
         trade_message(f"TP Sent | Qty: {amount} | Prc: {final_price}", StrategyState.VK)
+        return cid if req_id else None
 
-    def modify_tp(self, amount, new_price):
-        if self.active_tp_id:
-            self.cancel_algo_order(self.active_tp_id)
-            time.sleep(0.5)
-        self.place_tp(amount, new_price)
+    def modify_tp(self, amount, new_price, strategy=None):
+        """
+        Non-blocking replace of the take profit: the new TP goes out first and the old one
+        is only cancelled once the new one is acked, so the position is never without a TP.
+        Replaces of one strategy run one after another; a modify arriving while one is in
+        flight is parked (only the latest target is kept) and starts from the acked TP.
+        """
+        with self.tp_lock:
+            running = self.tp_replaces.get(strategy)
+            if running is not None:
+                running.queued = (amount, new_price)
+                logging.info(f"TP Modify Queued | Qty: {amount} | Price: {new_price}")
+                return
+            replace = self.tp_replaces[strategy] = TpReplace(self, amount, new_price, strategy)
+        replace.start()
         logging.info(f"TP Modified | Qty: {amount} | Price: {new_price}")
         trade_message(f"TP Modified to {new_price}", StrategyState.VK)
+
+    def _tp_replace_done(self, replace):
+        with self.tp_lock:
+            self.tp_replaces.pop(replace.strategy, None)
+        if replace.queued:
+            self.modify_tp(*replace.queued, strategy=replace.strategy)
+
+
+class TpReplace:
+    """
+    One place-then-cancel replace of the take profit, driven by the WS acks: the old TP is
+    cancelled from the new TP's place ack, so a rejected replacement (after one retry)
+    leaves the old TP working. `total_ms` runs from the send to the last ack.
+    """
+    history = deque(maxlen=100)
+
+    def __init__(self, manager, amount, new_price, strategy):
+        self.manager = manager
+        self.amount = amount
+        self.new_price = new_price
+        self.strategy = strategy
+        self.old_cid = None
+        self.queued = None  # (amount, price) of a modify that arrived meanwhile
+        self.sent_at = None
+        self.place_ok = None
+        self.retried = False
+
+    def start(self):
+        self.old_cid = self.manager.active_tp_id
+        self.sent_at = time.monotonic()
+        self._place()
+
+    def _place(self):
+        if self.manager.place_tp(self.amount, self.new_price, self.strategy, callback=self.on_place_ack) is None:
+            self.on_place_ack({"error": {"msg": "WS not connected"}})
+
+    def on_place_ack(self, response):
+        self.place_ok = 'error' not in response
+        if not self.place_ok:
+            logging.error(f"TP Replace: new TP rejected: {response.get('error')}")
+            if not self.retried:
+                self.retried = True  # one immediate re-place
+                self._place()
+                return
+            msg = f"TP Replace: new TP at {self.new_price} rejected twice, old TP {self.old_cid} kept"
+            logging.error(msg)
+            error_message(msg, StrategyState.VK)
+            self._finish()
+            return
+        if not self.old_cid:
+            self._finish()
+            return
+        if self.manager.cancel_algo_order(self.old_cid, callback=self.on_cancel_ack) is None:
+            self.on_cancel_ack({"error": {"msg": "WS not connected"}})
+
+    def on_cancel_ack(self, response):
+        if 'error' in response and response['error'].get('code') != -2011:
+            msg = f"TP Replace: cancel of old TP {self.old_cid} failed, two TPs may be open: {response.get('error')}"
+            logging.error(msg)
+            error_message(msg, StrategyState.VK)
+        else:
+            self.manager.registry.mark(self.old_cid, "CANCELED")
+        self._finish()
+
+    def _finish(self):
+        self.total_ms = (time.monotonic() - self.sent_at) * 1000
+        TpReplace.history.append(self.total_ms)
+        logging.info(f"TP Replace {'Confirmed' if self.place_ok else 'Failed'} | Total: {self.total_ms:.1f}ms")
+        self.manager._tp_replace_done(self)
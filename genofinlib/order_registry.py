@@ -0,0 +1,174 @@
+import time
+import threading
+import itertools
+from collections import deque
+
+
+# ==========================================
+# ORDER KINDS & STATES
+# ==========================================
+ENTRY = "EN"
+EXIT = "EX"
+SL = "SL"
+TP = "TP"
+
+PENDING = "PENDING"  # sent, no exchange event yet
+OPEN_STATES = {PENDING, "NEW", "PARTIALLY_FILLED", "TRIGGERING", "TRIGGERED"}
+FINAL_STATES = {"FILLED", "CANCELED", "EXPIRED", "EXPIRED_IN_MATCH", "REJECTED", "FINISHED"}
+
+HISTORY_SIZE = 500
+BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _base36(n):
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = BASE36[r] + out
+        if n == 0:
+            return out
+
+
+class TrackedOrder:
+    __slots__ = ("cid", "kind", "strategy", "side", "qty", "price", "state", "exchange_id",
+                 "filled_qty", "avg_price", "created", "updated")
+
+    def __init__(self, cid, kind, strategy, side, qty, price):
+        self.cid = cid
+        self.kind = kind
+        self.strategy = strategy
+        self.side = side
+        self.qty = qty
+        self.price = price
+        self.state = PENDING
+        self.exchange_id = None
+        self.filled_qty = 0.0
+        self.avg_price = None
+        self.created = time.time()
+        self.updated = self.created
+
+    @property
+    def is_open(self):
+        return self.state in OPEN_STATES
+
+    def __repr__(self):
+        return f"TrackedOrder({self.cid}, {self.state}, qty={self.qty}, price={self.price})"
+
+
+class OrderRegistry:
+    """
+    In-memory book of every order this process sent, keyed by client order id.
+    Client ids are `<KIND>_<STRATEGY>_<session>_<seq>`: the session stamp is unique per
+    process start and the sequence per order, so two orders sent in the same
+    second (or millisecond) can never share an id. Fits Binance's 36-char limit.
+    """
+
+    def __init__(self):
+        self.session = _base36(int(time.time() * 1000) % 36 ** 8)
+        self.seq = itertools.count(1)
+        self.lock = threading.Lock()
+        self.orders = {}
+        self.open_by_strategy = {}
+        self.history = deque()
+        self.early = {}  # cid -> (apply, payload): events that arrived before the order was tracked
+
+    def next_cid(self, kind, strategy=None):
+        """A fresh client id, not yet tracked"""
+        tag = (strategy or "VK")[:5].upper()
+        return f"{kind}_{tag}_{self.session}_{next(self.seq)}"
+
+    def track(self, cid, kind, strategy=None, side=None, qty=None, price=None):
+        """
+        Starts tracking `cid` (e.g. once its placement was acked). A user-stream event that
+        beat the ack was kept aside and is applied now.
+        """
+        order = TrackedOrder(cid, kind, strategy, side, qty, price)
+        with self.lock:
+            self.orders[cid] = order
+            self.open_by_strategy.setdefault(strategy, {})[cid] = order
+            early = self.early.pop(cid, None)
+        if early:
+            early[0](early[1])
+        return cid
+
+    def new_order(self, kind, strategy=None, side=None, qty=None, price=None):
+        """Registers an order about to be sent and returns its client id"""
+        return self.track(self.next_cid(kind, strategy), kind, strategy, side, qty, price)
+
+    def _keep_early(self, cid, apply, o):
+        """Holds the latest event of an id this session issued but does not track (yet)"""
+        if f"_{self.session}_" not in cid:
+            return
+        self.early.pop(cid, None)
+        self.early[cid] = (apply, o)
+        while len(self.early) > HISTORY_SIZE:
+            self.early.pop(next(iter(self.early)))
+
+    def get(self, cid):
+        return self.orders.get(cid)
+
+    def open_orders(self, strategy=None, kind=None):
+        """Open orders for a strategy, straight from the index (no REST call)"""
+        with self.lock:
+            book = self.open_by_strategy.get(strategy, {})
+            if kind is None:
+                return list(book.values())
+            return [o for o in book.values() if o.kind == kind]
+
+    def _set_state(self, order, state):
+        order.state = state
+        order.updated = time.time()
+        if state in FINAL_STATES:
+            self.open_by_strategy.get(order.strategy, {}).pop(order.cid, None)
+            self.history.append(order.cid)
+            # Bounded memory: forget the oldest finished orders
+            while len(self.history) > HISTORY_SIZE:
+                self.orders.pop(self.history.popleft(), None)
+
+    def on_order_update(self, o):
+        """
+        Applies the `o` payload of an ORDER_TRADE_UPDATE event.
+        Returns the tracked order, or None for orders this process did not send.
+        """
+        with self.lock:
+            order = self.orders.get(o.get("c", ""))
+            if order is None:
+                self._keep_early(o.get("c", ""), self.on_order_update, o)
+                return None
+            order.exchange_id = o.get("i", order.exchange_id)
+            order.filled_qty = float(o.get("z", order.filled_qty))
+            if float(o.get("ap", 0) or 0) > 0:
+                order.avg_price = float(o["ap"])
+            self._set_state(order, o.get("X", order.state))
+            return order
+
+    def on_algo_update(self, o):
+        """Applies the `o` payload of an ALGO_UPDATE event (conditional SL/TP orders)"""
+        with self.lock:
+            order = self.orders.get(o.get("caid", ""))
+            if order is None:
+                self._keep_early(o.get("caid", ""), self.on_algo_update, o)
+                return None
+            order.exchange_id = o.get("aid", order.exchange_id)
+            self._set_state(order, o.get("X", order.state))
+            return order
+
+    def mark(self, cid, state):
+        """Local transition, e.g. REJECTED from a WS API error or CANCELED after an ack"""
+        with self.lock:
+            order = self.orders.get(cid)
+            if order is not None and order.is_open:
+                self._set_state(order, state)
+            return order
+
+    def clear_strategy(self, strategy):
+        """Forget the open book of a strategy once the exchange confirmed we are flat"""
+        with self.lock:
+            for order in list(self.open_by_strategy.get(strategy, {}).values()):
+                self._set_state(order, "CANCELED")
+
+
+def kind_from_cid(cid):
+    """Fallback classification for ids not in the registry (e.g. orders from before a restart)"""
+    prefix = cid.split("_", 1)[0]
+    return prefix if prefix in (ENTRY, EXIT, SL, TP) else None
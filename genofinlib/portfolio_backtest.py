@@ -0,0 +1,288 @@
+import math
+import numpy as np
+from .vector_backtest import (njit, HAS_NUMBA, OK, OUT_OF_MONEY, VectorResult, _stop_fill,
+                              warmup_start, price_cross, drawdown_extremes)
+
+# ==========================================
+# LIVE ROUTER STRATEGIES ON ONE ACCOUNT
+# ==========================================
+NONE = -1
+TREND = 0
+SCALP = 1
+HV = 2
+STRATEGY_NAMES = {TREND: "TREND", SCALP: "SCALP", HV: "HV"}
+
+
+@njit(cache=True)
+def _units(cash, capital_pct, divisor, leverage, price, qty_step):
+    """valkyrie_trader sizing: (free balance * pct / divisor) * leverage / price, floored to the step"""
+    raw = cash * capital_pct / divisor * leverage / price
+    return math.floor(raw / qty_step) * qty_step
+
+
+@njit(cache=True)
+def _simulate_portfolio(open_, high, low, close, above, bull, bear, scalp_zone, spike, drawdown_ok,
+                        start, cash, commission, capital_pct, qty_step,
+                        sll1, tpl, h1_close, h2_sl, profit_threshold, min_leverage, max_leverage,
+                        scalp_leverage, scalp_sl, scalp_tp, scalp_adaptive, scalp_boost_tp, scalp_safe_tp,
+                        hv_leverage, hv_sl, hv_tp):
+    """
+    valkyrie_trader's main loop on closed bars, one long position shared by TREND, SCALP and HV.
+    Decisions are taken at the close of bar i in the live router's order (trend L1, trend L2,
+    bear event, scalp, HV) and market orders fill at the next open. Blocks that need a flat
+    account only act if no earlier block placed an order on the same bar. SL/TP follow the
+    vector engine (pending exit first, then SL before TP, on the entry bar too); their fills
+    update the router flags exactly like on_user_message. An HV position is closed at the
+    close of the bar it was opened on.
+    """
+    n = len(close)
+    equity = np.full(n, cash)
+    max_trades = n + 1
+    t_entry_bar = np.empty(max_trades, np.int64)
+    t_exit_bar = np.empty(max_trades, np.int64)
+    t_size = np.empty(max_trades, np.float64)
+    t_entry_price = np.empty(max_trades, np.float64)
+    t_exit_price = np.empty(max_trades, np.float64)
+    t_strategy = np.empty(max_trades, np.int64)
+    n_trades = 0
+    status = OK
+
+    pos = 0.0
+    entry_price = 0.0
+    entry_bar = 0
+    sl = math.nan
+    tp = math.nan
+    active = NONE
+    hv_exit_bar = -1
+
+    pend_entry = False
+    pend_close = False
+    pend_qty = 0.0
+    pend_sl = math.nan
+    pend_tp = math.nan
+    pend_strategy = NONE
+
+    # Router state (module globals of valkyrie_trader)
+    failed_l1 = False
+    l2_order = False
+    take_profit = False
+    trend_up = False
+    trend_down = False
+    leverage = min_leverage
+    last_entry = math.nan  # entry_price_list[-1] / [-2]
+    prev_entry = math.nan
+    n_entries = 0
+    scalp_long = False
+    adaptable_tp = False
+    tp_is_boosted = False
+    scalp_entry = math.nan
+
+    for i in range(start, n):
+        o = open_[i]
+
+        # --- Broker: pending exit, pending entry, SL/TP, HV bar-close exit ---
+        exit_price = math.nan
+        if pend_close:
+            pend_close = False
+            if pos != 0.0:
+                exit_price = o
+        if exit_price != exit_price and pend_entry:
+            pend_entry = False
+            pos = pend_qty
+            entry_price = o * (1 + commission)
+            entry_bar = i
+            active = pend_strategy
+            if active == HV:
+                sl, tp, hv_exit_bar = o * hv_sl, o * hv_tp, i
+            else:
+                sl, tp = pend_sl, pend_tp
+        pend_entry = False
+        if exit_price != exit_price and pos != 0.0:
+            exit_price = _stop_fill(1, o, high[i], low[i], sl, tp)
+            if exit_price == exit_price and active != HV:
+                if sl == sl and low[i] < sl:
+                    failed_l1, take_profit, l2_order = True, False, False
+                else:
+                    failed_l1, take_profit, l2_order = False, True, False
+            if exit_price != exit_price and active == HV and hv_exit_bar == i:
+                exit_price = close[i]
+        if exit_price == exit_price:
+            t_entry_bar[n_trades] = entry_bar
+            t_exit_bar[n_trades] = i
+            t_size[n_trades] = pos
+            t_entry_price[n_trades] = entry_price
+            t_exit_price[n_trades] = exit_price
+            t_strategy[n_trades] = active
+            n_trades += 1
+            cash += pos * (exit_price - entry_price)
+            pos = 0.0
+
+        eq = cash + pos * (close[i] - entry_price)
+        equity[i] = eq
+        if eq <= 0:
+            if pos != 0.0:
+                t_entry_bar[n_trades] = entry_bar
+                t_exit_bar[n_trades] = i
+                t_size[n_trades] = pos
+                t_entry_price[n_trades] = entry_price
+                t_exit_price[n_trades] = close[i]
+                t_strategy[n_trades] = active
+                n_trades += 1
+            for k in range(i, n):
+                equity[k] = 0.0
+            status = OUT_OF_MONEY
+            break
+        if i == n - 1:
+            break
+
+        # --- Router: decided at the close of bar i ---
+        c = close[i]
+        flat = pos == 0.0
+        if flat:
+            active = NONE
+            scalp_long, adaptable_tp, tp_is_boosted = False, False, False
+
+        # Trend L1
+        if bull[i] and not failed_l1 and not trend_up:
+            trend_up, trend_down, take_profit = True, False, False
+            if flat:
+                if drawdown_ok[i]:
+                    leverage = 2.0
+                prev_entry, last_entry, n_entries = last_entry, c, n_entries + 1
+                pend_qty = _units(cash, capital_pct, 100.0, leverage, c, qty_step)
+                pend_entry = pend_qty > 0
+                pend_sl, pend_tp, pend_strategy = c * sll1, c * tpl, TREND
+                scalp_long, adaptable_tp, tp_is_boosted = False, False, False
+            elif active == SCALP and scalp_long and adaptable_tp and not tp_is_boosted:
+                tp = last_entry * scalp_boost_tp
+                tp_is_boosted = True
+
+        # Trend L2
+        if (above[i] and failed_l1 and not l2_order and flat and not take_profit and not pend_entry
+                and last_entry == last_entry and c >= last_entry * h1_close):
+            trigger = last_entry * h1_close
+            pend_qty = _units(cash, capital_pct, 100.0, leverage, trigger, qty_step)
+            pend_entry = pend_qty > 0
+            pend_sl, pend_tp, pend_strategy = last_entry * h2_sl, math.nan, TREND
+            l2_order = True
+
+        # Trend bear event
+        if bear[i] and not trend_down:
+            trend_up, trend_down = False, True
+            prev_entry, last_entry, n_entries = last_entry, c, n_entries + 1
+            if not flat:
+                if active == HV:
+                    pass  # Bear Signal Ignored (HV Active)
+                elif active == SCALP and adaptable_tp:
+                    safe_tp = scalp_entry * scalp_safe_tp
+                    if c > safe_tp:
+                        pend_close = True
+                    elif tp_is_boosted:
+                        tp = safe_tp
+                        tp_is_boosted = False
+                else:
+                    pend_close = True
+            if n_entries >= 2:
+                if last_entry >= prev_entry * profit_threshold:
+                    leverage = 2.0
+                elif last_entry >= prev_entry:
+                    leverage = max(min_leverage, leverage - 3)
+                else:
+                    leverage = min(max_leverage, leverage + 1)
+            failed_l1, l2_order, take_profit = False, False, False
+
+        # Scalp
+        if scalp_zone[i] and flat and not pend_entry:
+            ref = low[i]
+            scalp_long, adaptable_tp, tp_is_boosted = True, scalp_adaptive, False
+            scalp_entry = ref
+            prev_entry, last_entry, n_entries = last_entry, ref, n_entries + 1
+            pend_qty = _units(cash, capital_pct, 101.0, scalp_leverage, ref, qty_step)
+            pend_entry = pend_qty > 0
+            pend_sl, pend_tp, pend_strategy = ref * scalp_sl, ref * scalp_tp, SCALP
+
+        # High volatility: in and out within the next bar
+        if spike[i] and flat and not pend_entry:
+            pend_qty = _units(cash, capital_pct, 100.0, hv_leverage, c, qty_step)
+            pend_entry = pend_qty > 0
+            pend_sl, pend_tp, pend_strategy = math.nan, math.nan, HV
+
+    if status == OK and pos != 0.0:
+        t_entry_bar[n_trades] = entry_bar
+        t_exit_bar[n_trades] = n - 1
+        t_size[n_trades] = pos
+        t_entry_price[n_trades] = entry_price
+        t_exit_price[n_trades] = close[n - 1]
+        t_strategy[n_trades] = active
+        n_trades += 1
+
+    return (equity, t_entry_bar[:n_trades], t_exit_bar[:n_trades], t_size[:n_trades],
+            t_entry_price[:n_trades], t_exit_price[:n_trades], status, t_strategy[:n_trades])
+
+
+class PortfolioResult(VectorResult):
+    """VectorResult with fractional sizes and the strategy that owned each trade"""
+
+    def __init__(self, ohlc, equity, entry_bar, exit_bar, size, entry_price, exit_price, status, strategy):
+        super().__init__(ohlc, equity, entry_bar, exit_bar, size, entry_price, exit_price, status)
+        self.strategy = strategy
+
+    def trades(self):
+        trades = super().trades()
+        trades['Size'] = self.size
+        trades['Strategy'] = [STRATEGY_NAMES[s] for s in self.strategy]
+        return trades
+
+    def by_strategy(self):
+        """Trade count and PnL per strategy"""
+        return self.trades().groupby('Strategy')['PnL'].agg(['count', 'sum'])
+
+
+def router_signals(ohlc, fast_ma=10, slow_ma=50, scalp_dip=0.95, vol_window=20, vol_spike=2.0,
+                   drawdown_threshold=0.80):
+    """
+    The live loop's inputs per closed bar: fast/slow SMA state and crosses, the scalp zone
+    (close below slow SMA * scalp_dip), the volume spike (volume above vol_spike x its
+    vol_window SMA, never without a Volume column) and the L1 drawdown leverage condition.
+    """
+    from .vector_strategies import sma
+    close = ohlc["Close"].to_numpy(dtype=float)
+    fast, slow = sma(close, fast_ma), sma(close, slow_ma)
+    bull, bear, above = price_cross(fast, slow)
+    with np.errstate(invalid="ignore"):
+        scalp_zone = close < slow * scalp_dip
+        if "Volume" in ohlc:
+            volume = ohlc["Volume"].to_numpy(dtype=float)
+            spike = volume > sma(volume, vol_window) * vol_spike
+        else:
+            spike = np.zeros(len(close), dtype=bool)
+    highest, lowest = drawdown_extremes(ohlc["High"].to_numpy(), ohlc["Low"].to_numpy())
+    return dict(above=above, bull=bull, bear=bear, scalp_zone=scalp_zone, spike=spike,
+                drawdown_ok=lowest > highest * drawdown_threshold, start=warmup_start(fast, slow))
+
+
+def run_portfolio(ohlc, cash=100_000, commission=.0005, capital_pct=99, qty_step=0.001,
+                  sll1=0.97, tpl=1.40, h1_close=1.03, h2_sl=0.98, profit_threshold=1.20,
+                  min_leverage=1, max_leverage=10,
+                  scalp_leverage=3, scalp_sl=0.95, scalp_tp=1.05, scalp_adaptive=False,
+                  scalp_boost_tp=1.70, scalp_safe_tp=1.25,
+                  hv_leverage=3, hv_sl=0.95, hv_tp=1.10, **signal_params):
+    """
+    Runs TREND, SCALP and HV together on one account with valkyrie_trader's arbitration:
+    HV ignores the bear signal, a bull cross boosts an adaptive scalp's TP, the bear event
+    pulls it back to the safe TP, and L1/L2 leverage follows the entry-price ladder.
+    Parameters mirror trader/config.py; signal_params go to router_signals().
+    """
+    signals = router_signals(ohlc, **signal_params)
+    arrays = [ohlc[col].to_numpy(dtype=float) for col in ("Open", "High", "Low", "Close")]
+    flags = [signals[k] for k in ("above", "bull", "bear", "scalp_zone", "spike", "drawdown_ok")]
+    if not HAS_NUMBA:
+        arrays = [a.tolist() for a in arrays]
+        flags = [f.tolist() for f in flags]
+    out = _simulate_portfolio(*arrays, *flags, int(signals["start"]), float(cash), float(commission),
+                              float(capital_pct), float(qty_step), float(sll1), float(tpl), float(h1_close),
+                              float(h2_sl), float(profit_threshold), float(min_leverage), float(max_leverage),
+                              float(scalp_leverage), float(scalp_sl), float(scalp_tp), bool(scalp_adaptive),
+                              float(scalp_boost_tp), float(scalp_safe_tp), float(hv_leverage), float(hv_sl),
+                              float(hv_tp))
+    return PortfolioResult(ohlc, *out)
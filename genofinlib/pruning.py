@@ -0,0 +1,131 @@
+import multiprocessing
+import numpy as np
+
+# ==========================================
+# EARLY TERMINATION OF OPTIMIZER RUNS
+# ==========================================
+CHECK_EVERY = 100    # bars between checkpoints
+MIN_PROGRESS = 0.5   # share of the window simulated before the projections may prune
+
+
+EXACT_REASONS = ("equity floor", "max drawdown")
+
+
+class Pruned(Exception):
+    """Raised from Strategy.next to abort a backtest"""
+
+    def __init__(self, reason, bar):
+        super().__init__(f"{reason} at bar {bar}")
+        self.reason, self.bar = reason, bar
+
+    @property
+    def exact(self):
+        """True for the hard constraints, whose NaN does not depend on any other run"""
+        return self.reason in EXACT_REASONS
+
+
+class Provisional(float):
+    """
+    Score of a run cut by a projection ("trade pace", "behind best"). It depends on which
+    runs a worker finished first, so it is used within the current search only and never
+    written to a ResultStore.
+    """
+
+
+class Pruner:
+    """
+    Checkpoints a backtest every CHECK_EVERY bars and aborts it once it cannot be kept.
+    Pruned runs score NaN, like bt.optimize's no-trade runs; projection prunes score a
+    Provisional NaN that run_wfo keeps out of the ResultStore.
+
+    Hard constraints (exact: once violated, the finished run would violate them too):
+      equity_floor   equity fell below this share of the starting cash
+      max_drawdown   peak-to-trough drawdown (share of the peak) beyond this
+    Projections (heuristic, only after MIN_PROGRESS of the window):
+      min_trades     the trade pace so far projects fewer trades over the whole window
+      best_margin    return so far trails the best finished run's return at the same
+                     checkpoint (same bar) by more than this (0.2 = 20 points). The
+                     reference is the best run this worker finished on the same window.
+
+    Counters live in shared memory (create the Pruner before run_wfo forks its pool),
+    so summary() reports the bars saved across all workers.
+    """
+
+    def __init__(self, equity_floor=None, max_drawdown=None, min_trades=None, best_margin=None,
+                 every=CHECK_EVERY, min_progress=MIN_PROGRESS):
+        self.equity_floor, self.max_drawdown = equity_floor, max_drawdown
+        self.min_trades, self.best_margin = min_trades, best_margin
+        self.every, self.min_progress = every, min_progress
+        self.counters = multiprocessing.Array('d', 4)  # runs, pruned runs, bars simulated, bars in window
+        self.best = {}  # window key -> (value, {checkpoint bar: return}): per worker
+
+    def __repr__(self):
+        return (f"Pruner(equity_floor={self.equity_floor}, max_drawdown={self.max_drawdown}, "
+                f"min_trades={self.min_trades}, best_margin={self.best_margin}, every={self.every}, "
+                f"min_progress={self.min_progress})")
+
+    def wrap(self, strategy, cash):
+        """Subclass of a Strategy that checkpoints after every next()"""
+        pruner = self
+
+        class Checkpointed(strategy):
+            def init(self):
+                super().init()
+                # data is still full length here; next() only sees the bars so far
+                self._bars, self._window = len(self.data), window_key(self.data.df)
+                self._cash0, self._peak, self._returns = cash, cash, {}
+
+            def next(self):
+                super().next()
+                equity, bar = self.equity, len(self.data)
+                self._peak = max(self._peak, equity)
+                reason = None
+                if pruner.equity_floor is not None and equity < self._cash0 * pruner.equity_floor:
+                    reason = "equity floor"
+                elif pruner.max_drawdown is not None and equity < self._peak * (1 - pruner.max_drawdown):
+                    reason = "max drawdown"
+                elif bar % pruner.every == 0:
+                    self._returns[bar] = equity / self._cash0 - 1
+                    reason = pruner.checkpoint(self, bar)
+                if reason:
+                    raise Pruned(reason, bar)
+
+        Checkpointed.__name__ = Checkpointed.__qualname__ = strategy.__name__
+        return Checkpointed
+
+    def checkpoint(self, strat, bar):
+        """Reason to abort at this checkpoint, or None"""
+        progress = bar / strat._bars
+        if progress < self.min_progress:
+            return None
+        if self.min_trades is not None and (len(strat.closed_trades) + len(strat.trades)) / progress < self.min_trades:
+            return "trade pace"
+        if self.best_margin is not None:
+            # checkpoints fire at absolute bars, so runs with different warm-ups line up by bar
+            best = self.best.get(strat._window)
+            reference = best[1].get(bar) if best is not None else None
+            if reference is not None and strat._returns[bar] < reference - self.best_margin:
+                return "behind best"
+        return None
+
+    def record(self, data, value, returns=None, pruned_at=None):
+        """Books one run; a finished run with a better value becomes its window's reference"""
+        bars = len(data)
+        with self.counters.get_lock():
+            self.counters[0] += 1
+            self.counters[1] += pruned_at is not None
+            self.counters[2] += bars if pruned_at is None else pruned_at
+            self.counters[3] += bars
+        if pruned_at is None and returns is not None and not np.isnan(value):
+            key = window_key(data)
+            if key not in self.best or value > self.best[key][0]:
+                self.best[key] = (value, dict(returns))
+
+    def summary(self):
+        runs, pruned, simulated, total = self.counters[:]
+        saved = 1 - simulated / total if total else 0.0
+        return f"Pruned {pruned:.0f}/{runs:.0f} runs: {saved:.1%} of the simulated bars saved"
+
+
+def window_key(df):
+    return df.index[0], df.index[-1], len(df)
@@ -0,0 +1,84 @@
+import math
+from decimal import Decimal
+
+
+# Absorbs float noise such as 0.30000000000000004 / 0.1 so exact multiples are not
+# pushed a whole tick down (floor) or up (ceil).
+TICK_EPSILON = 1e-9
+
+
+class Quantizer:
+    """
+    Integer-tick rounding for one instrument filter (stepSize, tickSize, lotSz...).
+    Everything that depends on the step is computed once here, so a call is just
+    a division, a floor/ceil and a multiplication.
+    Works for any step, not only powers of ten (e.g. a 0.5 tick or a 25 lot).
+    """
+    __slots__ = ("step", "step_units", "scale", "decimals", "fmt")
+
+    def __init__(self, step):
+        step_dec = Decimal(str(step)).normalize()
+        self.decimals = max(0, -step_dec.as_tuple().exponent)
+        self.scale = 10 ** self.decimals
+        self.step_units = int(step_dec * self.scale)  # step expressed in 10^-decimals units
+        self.step = self.step_units / self.scale
+        self.fmt = f"{{:.{self.decimals}f}}"
+
+    def ticks(self, value, mode="floor"):
+        x = value / self.step
+        if mode == "floor":
+            return math.floor(x + TICK_EPSILON)
+        if mode == "ceil":
+            return math.ceil(x - TICK_EPSILON)
+        return round(x)
+
+    def _from_ticks(self, ticks):
+        return ticks * self.step_units / self.scale
+
+    def floor(self, value):
+        return self._from_ticks(self.ticks(value, "floor"))
+
+    def ceil(self, value):
+        return self._from_ticks(self.ticks(value, "ceil"))
+
+    def nearest(self, value):
+        return self._from_ticks(self.ticks(value, "nearest"))
+
+    @staticmethod
+    def mode_for_side(side):
+        """Passive rounding: never pay more on a BUY, never receive less on a SELL"""
+        return "floor" if side.upper() == "BUY" else "ceil"
+
+    def for_side(self, value, side):
+        return self._from_ticks(self.ticks(value, self.mode_for_side(side)))
+
+    def to_str(self, value, mode="floor"):
+        return self.fmt.format(self._from_ticks(self.ticks(value, mode)))
+
+    def to_number(self, value, mode="floor"):
+        """Quantized value as an int when the step is integral (contract counts), else a float"""
+        q = self._from_ticks(self.ticks(value, mode))
+        return int(q) if self.decimals == 0 else q
+
+    def quantize_array(self, values, mode="floor"):
+        """Vectorized variant for batch orders (ladders, split entries)"""
+        import numpy as np
+        x = np.asarray(values, dtype=float) / self.step
+        if mode == "floor":
+            ticks = np.floor(x + TICK_EPSILON)
+        elif mode == "ceil":
+            ticks = np.ceil(x - TICK_EPSILON)
+        else:
+            ticks = np.rint(x)
+        return ticks * self.step_units / self.scale
+
+
+_quantizers = {}
+
+
+def get_quantizer(step):
+    """Quantizers are immutable, so one instance per distinct step is shared everywhere"""
+    q = _quantizers.get(step)
+    if q is None:
+        q = _quantizers[step] = Quantizer(step)
+    return q
@@ -0,0 +1,186 @@
+import time
+import hashlib
+import logging
+import threading
+
+
+# ==========================================
+# VENUE LIMITS
+# ==========================================
+# (capacity, interval_seconds) per bucket. Order buckets count order placements only.
+VENUE_LIMITS = {
+    "binance": {"weight": (2400, 60), "orders": (300, 10)},
+    "bitmex": {"weight": (120, 60), "orders": (10, 1)},
+    "okx": {"weight": (20, 2), "orders": (60, 2)},
+}
+
+# Fraction of the weight bucket that informational calls may never touch.
+INFO_RESERVE = 0.25
+LOW_HEADROOM = 0.10
+
+
+class TokenBucket:
+    def __init__(self, capacity, interval):
+        self.capacity = float(capacity)
+        self.interval = float(interval)
+        self.rate = self.capacity / self.interval
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount, floor=0.0):
+        """Seconds until `amount` tokens can be taken without dropping below `floor`"""
+        missing = amount + floor - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def sync_used(self, used, limit=None):
+        """Align with the exchange's own counter (it is authoritative)"""
+        if limit:
+            self.capacity = float(limit)
+            self.rate = self.capacity / self.interval  # same window, new limit: refill speed follows
+        self.tokens = min(self.tokens, self.capacity - float(used))
+
+
+class RateLimitGovernor:
+    """
+    Per-venue token buckets shared by every client talking to that venue.
+    Order traffic may drain the whole weight bucket, informational calls
+    (balances, positions, klines) stop at INFO_RESERVE so they can never
+    starve an order at signal time.
+    """
+
+    def __init__(self, venue, weight=(1200, 60), orders=(100, 10)):
+        self.venue = venue
+        self.weight = TokenBucket(*weight)
+        self.orders = TokenBucket(*orders)
+        self.banned_until = 0.0
+        self.lock = threading.Lock()
+        self.throttled = 0
+
+    def acquire(self, weight=1, is_order=False):
+        """Blocks until the request fits in the budget. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.weight.refill(now)
+                self.orders.refill(now)
+
+                if now < self.banned_until:
+                    delay = self.banned_until - now
+                else:
+                    floor = 0.0 if is_order else self.weight.capacity * INFO_RESERVE
+                    delay = self.weight.wait_for(weight, floor)
+                    if is_order:
+                        delay = max(delay, self.orders.wait_for(1))
+
+                    if delay == 0.0:
+                        self.weight.tokens -= weight
+                        if is_order:
+                            self.orders.tokens -= 1
+                        return waited
+
+                self.throttled += 1
+
+            time.sleep(min(delay, 1.0))
+            waited += min(delay, 1.0)
+
+    def penalize(self, retry_after=None):
+        """Called on 429/418: stop all traffic until the venue lets us back in"""
+        delay = float(retry_after) if retry_after else 5.0
+        with self.lock:
+            self.banned_until = max(self.banned_until, time.monotonic() + delay)
+            self.weight.tokens = 0.0
+        logging.warning(f"[{self.venue}] Rate limited, backing off {delay:.1f}s")
+
+    def update_from_headers(self, headers):
+        """Reads the used-weight counters the venue returns on every REST response"""
+        with self.lock:
+            if self.venue == "binance":
+                used = headers.get("X-MBX-USED-WEIGHT-1M")
+                if used is not None:
+                    self.weight.sync_used(used)
+                orders = headers.get("X-MBX-ORDER-COUNT-10S")
+                if orders is not None:
+                    self.orders.sync_used(orders)
+            elif self.venue == "bitmex":
+                limit = headers.get("x-ratelimit-limit")
+                remaining = headers.get("x-ratelimit-remaining")
+                if limit is not None and remaining is not None:
+                    self.weight.sync_used(float(limit) - float(remaining), limit)
+                remaining_1s = headers.get("x-ratelimit-remaining-1s")
+                if remaining_1s is not None:
+                    self.orders.sync_used(self.orders.capacity - float(remaining_1s))
+
+    def update_from_ws(self, rate_limits):
+        """Binance WS API responses carry a `rateLimits` list with the live counters"""
+        if not rate_limits:
+            return
+        with self.lock:
+            for rl in rate_limits:
+                if rl.get("rateLimitType") == "REQUEST_WEIGHT":
+                    self.weight.sync_used(rl.get("count", 0), rl.get("limit"))
+                elif rl.get("rateLimitType") == "ORDERS" and rl.get("interval") == "SECOND":
+                    self.orders.sync_used(rl.get("count", 0), rl.get("limit"))
+
+    def check_response(self, status_code, headers):
+        self.update_from_headers(headers)
+        if status_code in (418, 429):
+            self.penalize(headers.get("Retry-After"))
+        else:
+            headroom = self.headroom()
+            if headroom < LOW_HEADROOM:
+                logging.warning(f"[{self.venue}] Rate limit headroom low: {headroom:.0%}")
+
+    def headroom(self):
+        """Fraction of the tightest bucket still available (0.0 = exhausted, 1.0 = idle)"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.banned_until:
+                return 0.0
+            self.weight.refill(now)
+            self.orders.refill(now)
+            return max(0.0, min(self.weight.tokens / self.weight.capacity, self.orders.tokens / self.orders.capacity))
+
+    def metrics(self):
+        return {
+            "venue": self.venue,
+            "headroom": round(self.headroom(), 3),
+            "weight_left": int(self.weight.tokens),
+            "orders_left": int(self.orders.tokens),
+            "throttled": self.throttled,
+            "banned": time.monotonic() < self.banned_until,
+        }
+
+
+# ==========================================
+# SHARED REGISTRY
+# ==========================================
+_governors = {}
+_registry_lock = threading.Lock()
+
+
+def account_tag(key):
+    """Short, stable stand-in for an API key in governor names (headroom reports reach logs/Slack)"""
+    return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+def get_governor(venue, account=None):
+    """
+    One governor per venue for the whole process (master and slave clients share it).
+    Venues that budget per API key (BitMEX, OKX sub-accounts) pass the key as `account` to
+    get their own; the name only carries account_tag(key), never the key itself.
+    """
+    name = f"{venue}:{account_tag(account)}" if account else venue
+    with _registry_lock:
+        if name not in _governors:
+            limits = VENUE_LIMITS.get(venue, {})
+            _governors[name] = RateLimitGovernor(venue, **limits)
+        return _governors[name]
+
+
+def headroom_report():
+    return {name: gov.metrics() for name, gov in _governors.items()}
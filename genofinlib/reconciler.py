@@ -0,0 +1,135 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .slack_bot import StrategyState, trade_message, error_message
+from .rate_limiter import INFO_RESERVE
+
+RECONCILE_INTERVAL = 30   # seconds between sweeps
+CONFIRMATIONS = 2         # a mismatch must persist this many sweeps (skips copies still in flight)
+RATIO_TOLERANCE = 0.25    # relative gap between the slave/master notional ratio and the expected one
+MIN_HEADROOM = INFO_RESERVE + 0.10  # skip a venue this sweep well before it would touch the order reserve
+
+
+class PositionReconciler:
+    """
+    Background drift detector between the master position and every slave account.
+    Runs entirely on its own thread and pool, reads positions with informational
+    priority (the rate governors keep order budget for the trading path), closes slaves
+    that are long while the master is flat, and alerts on anything it should not fix blindly.
+
+    While both are long, the slave/master notional ratio is checked against the one the
+    copy sizing implies: slave equity over master equity, scaled by the account's
+    size_multiplier (capped like SlaveAccount.percentage at the configured percentage_of_capital).
+    """
+
+    def __init__(self, ctx, master, slaves, interval=RECONCILE_INTERVAL, auto_correct=True):
+        self.ctx = ctx
+        self.master = master
+        self.slaves = slaves
+        self.interval = interval
+        self.auto_correct = auto_correct
+        self.percentage_of_capital = getattr(ctx.cfg, "percentage_of_capital", None)
+        self.pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reconcile")
+        self.strikes = {}
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Reconcile Error: {e}")
+
+    def _fetch_master(self):
+        """(contracts, notional, equity); equity is only fetched while long"""
+        pos = self.master.fetch_positions([self.master.symbol])
+        pos = pos[0] if pos else {'contracts': 0.0, 'notional': 0.0}
+        if pos['contracts'] <= 0:
+            return pos['contracts'], pos['notional'], None
+        equity = float(self.master.fetch_balance()['info']['totalMarginBalance'])
+        return pos['contracts'], pos['notional'], equity
+
+    def _fetch_slave(self, account):
+        """(contracts, notional, equity) from one position read; equity is only fetched while long"""
+        contracts = account.position_contracts()
+        if contracts <= 0:
+            return contracts, 0.0, None
+        return contracts, account.notional(contracts), account.equity()
+
+    def expected_ratio(self, account, master_equity, slave_equity):
+        """Slave/master notional ratio the copy sizing aims for"""
+        if self.percentage_of_capital:
+            scale = account.percentage(self.percentage_of_capital) / self.percentage_of_capital
+        else:
+            scale = account.size_multiplier
+        return slave_equity * scale / master_equity
+
+    def run_once(self):
+        if self.master.governor.headroom() < MIN_HEADROOM:
+            logging.info("Reconcile skipped: master rate budget low")
+            return
+
+        accounts = [acc for acc in self.slaves.accounts if acc.client.governor.headroom() >= MIN_HEADROOM]
+        master_job = self.pool.submit(self._fetch_master)
+        slave_jobs = {acc: self.pool.submit(self._fetch_slave, acc) for acc in accounts}
+
+        master_contracts, master_notional, master_equity = master_job.result()
+        master = (master_contracts > 0, master_notional, master_equity)
+
+        for acc, job in slave_jobs.items():
+            try:
+                contracts, notional, equity = job.result()
+            except Exception as e:
+                logging.warning(f"Reconcile: {acc.name} position fetch failed: {e}")
+                continue
+            self._check(acc, *master, contracts > 0, notional, equity)
+
+    def _strike(self, key):
+        self.strikes[key] = self.strikes.get(key, 0) + 1
+        return self.strikes[key] >= CONFIRMATIONS
+
+    def _check(self, acc, master_long, master_notional, master_equity, slave_long, slave_notional, slave_equity):
+        # --- Slave left in a position the master already closed: fix it ---
+        if slave_long and not master_long:
+            if self._strike((acc.name, "orphan")):
+                msg = f"Reconcile: {acc.name} long while master flat"
+                logging.warning(msg)
+                if self.auto_correct:
+                    try:
+                        acc.close_long()
+                        trade_message(f"{msg} -> closed", StrategyState.VK)
+                    except Exception as e:
+                        error_message(f"{msg} -> close failed: {e}", StrategyState.VK)
+                else:
+                    error_message(msg, StrategyState.VK)
+                self.strikes.pop((acc.name, "orphan"), None)
+            return
+
+        # --- Slave missed an entry: alert only, a late entry at a worse price is a decision for a human ---
+        if master_long and not slave_long:
+            if self._strike((acc.name, "missing")):
+                error_message(f"Reconcile: {acc.name} flat while master long", StrategyState.VK)
+                self.strikes.pop((acc.name, "missing"), None)
+            return
+
+        self.strikes.pop((acc.name, "orphan"), None)
+        self.strikes.pop((acc.name, "missing"), None)
+        if not (master_long and slave_long) or master_notional <= 0 or not master_equity:
+            self.strikes.pop((acc.name, "ratio"), None)
+            return
+
+        # --- Both long: the slave/master notional ratio should match what the sizing implies ---
+        ratio = slave_notional / master_notional
+        expected = self.expected_ratio(acc, master_equity, slave_equity)
+        if expected > 0 and abs(ratio / expected - 1) > RATIO_TOLERANCE:
+            if self._strike((acc.name, "ratio")):
+                error_message(f"Reconcile: {acc.name} copy ratio {ratio:.4f}, expected {expected:.4f}",
+                              StrategyState.VK)
+                self.strikes.pop((acc.name, "ratio"), None)
+        else:
+            self.strikes.pop((acc.name, "ratio"), None)
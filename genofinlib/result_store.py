@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import inspect
+import sqlite3
+import datetime
+import sysconfig
+import logging
+import numpy as np
+from .instrument_cache import CACHE_DIR
+
+# ==========================================
+# STORE SETTINGS
+# ==========================================
+STORE_FILE = "optimizer_results.sqlite"
+PARAM_DIGITS = 10  # 0.65 from np.arange(0.65, ...) and from np.arange(0.60, ...) must be the same point
+FLUSH_EVERY = 200  # rows buffered before a commit (an interrupted run loses at most this many)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    strategy TEXT NOT NULL,
+    data TEXT NOT NULL,
+    window TEXT NOT NULL,
+    params TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL,
+    created REAL NOT NULL,
+    PRIMARY KEY (strategy, data, window, params, metric)
+) WITHOUT ROWID
+"""
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+def code_hash(*objects):
+    """Hash of the source of classes/functions/modules: any edit to the strategy invalidates its results"""
+    return _digest(*(inspect.getsource(obj) for obj in objects))
+
+
+LIBRARY_PATHS = tuple({os.path.realpath(p) for p in (sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"],
+                                                       sysconfig.get_paths()["platlib"], sys.prefix)})
+CONSTANT_TYPES = (bool, int, float, str, bytes, type(None), np.number, datetime.date, datetime.timedelta,
+                  tuple, list, dict, set, frozenset)
+
+
+def _is_project_code(obj):
+    """Defined in a source file of this project (not the stdlib or an installed package)"""
+    path = getattr(inspect.getmodule(obj), "__file__", None)
+    return bool(path) and not os.path.realpath(path).startswith(LIBRARY_PATHS)
+
+
+def _code_names(code):
+    """Global/attribute names a code object and its nested functions/comprehensions load"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _functions(obj):
+    if inspect.isfunction(obj):
+        return [obj]
+    found = []
+    for member in vars(obj).values():
+        member = getattr(member, "__func__", member)  # staticmethod / classmethod
+        if isinstance(member, property):
+            found += [f for f in (member.fget, member.fset) if f is not None]
+        elif inspect.isfunction(member):
+            found.append(member)
+    return found
+
+
+def closure_hash(*objects):
+    """
+    code_hash plus what the objects' code reaches through module globals: project
+    functions and classes (source, followed recursively) and plain constants (repr), so
+    editing an indicator helper or MACRO_EVENT_DATE invalidates results while edits
+    elsewhere in the script (grids, plotting) do not. Library code is covered by versions.
+    """
+    parts, seen, todo = [], set(), list(objects)
+    while todo:
+        obj = todo.pop(0)
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        parts.append(inspect.getsource(obj))
+        for func in _functions(obj):
+            for name in sorted(_code_names(func.__code__)):
+                if name not in func.__globals__:
+                    continue
+                value = func.__globals__[name]
+                if inspect.isfunction(value) or inspect.isclass(value):
+                    if _is_project_code(value):
+                        todo.append(value)
+                elif isinstance(value, CONSTANT_TYPES):
+                    parts.append(f"{func.__module__}.{name}={value!r}")
+    return _digest(*parts)
+
+
+def data_version(df):
+    """Content hash of an OHLC slice (index + values), so appending new bars keeps older windows valid"""
+    values = np.ascontiguousarray(df[["Open", "High", "Low", "Close"]].to_numpy(dtype=float))
+    return _digest(np.asarray(df.index.asi8).tobytes(), values.tobytes())
+
+
+def params_key(params):
+    normalized = {}
+    for k, v in params.items():
+        if isinstance(v, (float, np.floating)):
+            v = float(f"{float(v):.{PARAM_DIGITS}g}")
+        elif isinstance(v, np.integer):
+            v = int(v)
+        normalized[k] = v
+    return json.dumps(normalized, sort_keys=True)
+
+
+def metric_key(maximize):
+    if isinstance(maximize, str):
+        return maximize
+    return f"{getattr(maximize, '__qualname__', 'objective')}:{code_hash(maximize)[:12]}"
+
+
+class ResultStore:
+    """
+    Persistent optimizer results keyed by (strategy code hash, data version, window,
+    parameter tuple, metric). SQLite (stdlib, one file, indexed by the full key) so any
+    run can resume or be extended without recomputing a single stored point.
+    Only the optimizer's parent process writes; workers never touch the file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, STORE_FILE)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.pending = []
+
+    def lookup(self, strategy, data, window, metric):
+        """{params_key: value} of every stored point of one window"""
+        rows = self.conn.execute(
+            "SELECT params, value FROM results WHERE strategy=? AND data=? AND window=? AND metric=?",
+            (strategy, data, window, metric))
+        return {params: (np.nan if value is None else value) for params, value in rows}
+
+    def put(self, strategy, data, window, params, metric, value):
+        value = None if value is None or np.isnan(value) else float(value)
+        self.pending.append((strategy, data, window, params, metric, value, time.time()))
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        try:
+            self.conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+            self.conn.commit()
+            self.pending = []
+        except sqlite3.Error as e:
+            logging.error(f"Result store write failed: {e}")
+
+    def heatmap(self, strategy, data, window, metric):
+        """Every stored point of a window as a heatmap Series, whatever grid produced it"""
+        import pandas as pd
+        points = self.lookup(strategy, data, window, metric)
+        if not points:
+            return pd.Series(dtype=float, name=metric)
+        params = [json.loads(p) for p in points]
+        names = list(params[0])
+        index = pd.MultiIndex.from_tuples([tuple(p[k] for k in names) for p in params], names=names)
+        return pd.Series(list(points.values()), index=index, name=metric).sort_index()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
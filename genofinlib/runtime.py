@@ -0,0 +1,59 @@
+import logging
+
+
+# ==========================================
+# NETWORK ENDPOINTS
+# ==========================================
+# is_testnet -> (ws api, user/market stream, rest)
+BINANCE_ENDPOINTS = {
+    True: ("wss://testnet.binancefuture.com/ws-fapi/v1",
+           "wss://stream.binancefuture.com/ws",
+           "https://testnet.binancefuture.com"),
+    False: ("wss://ws-fapi.binance.com/ws-fapi/v1",
+            "wss://fstream.binance.com/ws",
+            "https://fapi.binance.com"),
+}
+
+
+class RuntimeContext:
+    """
+    Everything a process decides once at startup: network, config module, endpoints
+    and credentials. Built by the entry point and handed to the library components,
+    so nothing inside genofinlib has to import the trader to find out how it runs.
+    """
+
+    def __init__(self, cfg, is_testnet):
+        self.cfg = cfg
+        self.is_testnet = is_testnet
+        self.ws_api_url, self.fstream_url, self.fapi_url = BINANCE_ENDPOINTS[bool(is_testnet)]
+
+        if is_testnet:
+            self.api_key = cfg.binance_test_key
+            self.api_secret = cfg.binance_test_secret
+        else:
+            self.api_key = cfg.binance_copy_key
+            self.api_secret = cfg.binance_copy_secret
+
+        self.slack_token = getattr(cfg, "slack_token", None)
+        self.slack_channel = getattr(cfg, "slack_channel", None)
+
+    @property
+    def net_type(self):
+        return "TESTNET" if self.is_testnet else "MAINNET"
+
+    def clock(self, venue):
+        """The shared exchange clock of `venue` on this network"""
+        from .time_sync import get_clock
+        return get_clock(venue, self.is_testnet)
+
+    def __repr__(self):
+        return f"RuntimeContext({self.net_type})"
+
+
+def build_context(cfg, is_testnet):
+    """Builds the context and wires the process-wide services that depend on it"""
+    from .slack_bot import configure
+    context = RuntimeContext(cfg, is_testnet)
+    configure(context)
+    logging.info(f"Runtime context ready: {context.net_type}")
+    return context
@@ -0,0 +1,155 @@
+import math
+import logging
+import numpy as np
+from .wfo import grid_axes, window_bounds, window_report, persistable, _stream, _window_keys
+from .result_store import params_key, metric_key
+
+# ==========================================
+# SUCCESSIVE HALVING SETTINGS
+# ==========================================
+ETA = 3               # keep the best 1/ETA of the candidates at each rung
+MIN_FRACTION = 1 / 9  # lowest fidelity: the last 1/9 of the window's bars
+MIN_BARS = 60         # a low-fidelity slice never gets shorter than this (indicator warm-up)
+INITIAL_SHARE = 0.05  # share of the grid sampled at the lowest fidelity
+TOP_K = 3             # best points whose neighbours keep being refined at full fidelity
+WARM_RADIUS = 2       # grid steps around the previous window's best points used as seeds
+
+
+def _neighbours(point, sizes, radius=1):
+    """Axis-aligned moves of 1..radius grid steps"""
+    for axis, size in enumerate(sizes):
+        for step in range(-radius, radius + 1):
+            i = point[axis] + step
+            if step and 0 <= i < size:
+                yield point[:axis] + (i,) + point[axis + 1:]
+
+
+def _ranked(points, values, keep):
+    order = np.argsort(-np.nan_to_num(np.asarray(values, dtype=float), nan=-np.inf), kind='stable')
+    return [points[i] for i in order[:keep]]
+
+
+class HalvingSearch:
+    """
+    Successive halving on a parameter grid, window by window:
+      1. sample INITIAL_SHARE of the grid (plus the previous window's best region) and
+         score it on the most recent MIN_FRACTION of the window,
+      2. keep the best 1/ETA and re-score on ETA times more bars, until the full window,
+      3. hill-climb from the TOP_K full-window points over their grid neighbours until
+         no neighbour of the best points is left unexplored.
+    Cost is counted in full-window backtests (a 1/9 slice costs 1/9).
+    """
+
+    def __init__(self, data, evaluate, grid, maximize, constraint=None, processes=None, store=None,
+                 eta=ETA, min_fraction=MIN_FRACTION, initial_share=INITIAL_SHARE, top_k=TOP_K,
+                 warm_radius=WARM_RADIUS, seed=0):
+        self.data, self.evaluate, self.maximize = data, evaluate, maximize
+        self.names, self.axes = grid_axes(grid)
+        self.sizes = [len(axis) for axis in self.axes]
+        self.constraint, self.processes, self.store = constraint, processes, store
+        self.eta, self.min_fraction, self.initial_share = eta, min_fraction, initial_share
+        self.top_k, self.warm_radius = top_k, warm_radius
+        self.rng = np.random.default_rng(seed)
+        self.grid_size = math.prod(self.sizes)
+        self.cost = 0.0
+        if store is not None:
+            self.strategy, self.metric = evaluate.fingerprint(), metric_key(maximize)
+
+    def params(self, point):
+        return {name: axis[i] for name, axis, i in zip(self.names, self.axes, point)}
+
+    def admissible(self, point):
+        return self.constraint is None or self.constraint(self.params(point))
+
+    def _score(self, lo, hi, points, fraction, cached=None):
+        """Scores points on the last `fraction` of [lo, hi); stored full-window points are free"""
+        cached = cached or {}
+        values = np.full(len(points), np.nan)
+        todo = []
+        for i, point in enumerate(points):
+            key = params_key(self.params(point))
+            if key in cached:
+                values[i] = cached[key]
+            else:
+                todo.append(i)
+        start = lo if fraction >= 1 else max(lo, hi - max(MIN_BARS, int((hi - lo) * fraction)))
+        combos = [self.params(points[i]) for i in todo]
+        jobs = [(0, c) for c in range(len(combos))]
+        keep = np.ones(len(points), dtype=bool)  # cleared for scores the store must not keep
+        for _, c, value in _stream(self.data, [(start, hi)], combos, self.evaluate, self.maximize,
+                                   self.processes, jobs=jobs):
+            values[todo[c]] = value
+            keep[todo[c]] = persistable(value)
+        self.cost += len(todo) * (hi - start) / (hi - lo)
+        return values, keep
+
+    def _initial(self, warm):
+        n = max(self.top_k * self.eta ** self._rungs(), int(self.grid_size * self.initial_share))
+        seeds = {q for p in warm for q in _neighbours(p, self.sizes, self.warm_radius)} | set(warm)
+        candidates = [p for p in sorted(seeds) if self.admissible(p)][:n // 2]
+        chosen = set(candidates)
+        for flat in self.rng.permutation(self.grid_size):
+            if len(candidates) >= min(n, self.grid_size):
+                break
+            point = tuple(int(i) for i in np.unravel_index(flat, self.sizes))
+            if point not in chosen and self.admissible(point):
+                candidates.append(point)
+                chosen.add(point)
+        return candidates
+
+    def _rungs(self):
+        return max(0, math.ceil(math.log(1 / self.min_fraction, self.eta) - 1e-9))
+
+    def search_window(self, lo, hi, warm=(), window_key=None):
+        """{point: full-window value} of every point scored on the full window"""
+        cached = self.store.lookup(self.strategy, *window_key, self.metric) if window_key else {}
+        candidates = self._initial(warm)
+        for rung in range(self._rungs()):
+            fraction = self.min_fraction * self.eta ** rung
+            values, _ = self._score(lo, hi, candidates, fraction)
+            candidates = _ranked(candidates, values, max(self.top_k, math.ceil(len(candidates) / self.eta)))
+
+        full = {}
+        frontier = candidates
+        while frontier:
+            values, keep = self._score(lo, hi, frontier, 1.0, cached)
+            full.update(zip(frontier, values))
+            if window_key:
+                for point, value, stored in zip(frontier, values, keep):
+                    if stored:
+                        self.store.put(self.strategy, *window_key, params_key(self.params(point)), self.metric,
+                                       value)
+            best = _ranked(list(full), list(full.values()), self.top_k)
+            frontier = list(dict.fromkeys(q for p in best for q in _neighbours(p, self.sizes)
+                                          if q not in full and self.admissible(q)))
+        if window_key:
+            self.store.flush()
+        return full
+
+
+def run_halving(data, windows, evaluate, grid, maximize, constraint=None, processes=None, store=None, **kwargs):
+    """
+    Same report layout as wfo.run_wfo, but each heatmap_is only holds the points scored on
+    the full window. Windows run in order: each one is warm-started from the previous
+    window's TOP_K points. 'evaluations' is the cost in full-window backtests.
+    """
+    import pandas as pd
+    search = HalvingSearch(data, evaluate, grid, maximize, constraint, processes, store, **kwargs)
+    bounds = window_bounds(data.index, windows)
+    window_keys = _window_keys(data, bounds) if store is not None else [None] * len(bounds)
+    label = maximize if isinstance(maximize, str) else None
+
+    report, warm = [], []
+    for (lo, hi), window_key in zip(bounds, window_keys):
+        spent = search.cost
+        full = search.search_window(lo, hi, warm, window_key)
+        points = sorted(full)
+        index = pd.MultiIndex.from_tuples([tuple(search.params(p).values()) for p in points], names=search.names)
+        entry = window_report(data, lo, hi, pd.Series([full[p] for p in points], index=index, name=label),
+                              search.names)
+        entry['evaluations'] = search.cost - spent
+        report.append(entry)
+        warm = _ranked(list(full), list(full.values()), search.top_k)
+        logging.info(f"Halving search {entry['start_date']} - {entry['end_date']}: "
+                     f"{entry['evaluations']:.0f} backtests for a {search.grid_size} point grid")
+    return report
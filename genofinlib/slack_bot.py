@@ -1,19 +1,7 @@
+import time
 import logging
 import threading
 from enum import Enum
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-import trader.config as config
-import trader.config_test as config_test
-from trader.valkyrie_trader import IS_TESTNET
-
-if IS_TESTNET:
-    cfg = config_test
-else:
-    cfg = config
-
-SLACK_TOKEN = cfg.slack_token
-SLACK_CHANNEL = cfg.slack_channel
 
 
 class StrategyState(Enum):
@@ -23,61 +11,180 @@ class StrategyState(Enum):
     RSI = "Scalp Strategy"      # [SANITIZED] Proprietary strategy name masked
 
 
+# ==========================================
+# DELIVERY SETTINGS
+# ==========================================
+PRIORITY = {"TRADE": 0, "ERROR": 1, "INFO": 2}  # lower = more important, dropped last
+MAX_QUEUE = 200        # pending notifications before backpressure drops kick in
+BATCH_WINDOW = 1.0     # seconds to linger after the first message so a burst goes out as one post
+MAX_BATCH = 20         # attachments per post
+MIN_POST_INTERVAL = 1.1  # chat.postMessage allows ~1 post/s per channel
+
+
+class Notification:
+    __slots__ = ("text", "color", "title", "priority", "count")
+
+    def __init__(self, text, color, title, priority):
+        self.text = text
+        self.color = color
+        self.title = title
+        self.priority = priority
+        self.count = 1
+
+
 class SlackNotifier:
-    def __init__(self, token, channel):
+    """
+    One daemon worker drains a bounded in-memory queue, so `send()` is an O(1)
+    append on the caller's thread. Identical pending messages are merged with a
+    counter, bursts are batched into a single post, posts are spaced to Slack's
+    rate limit, and when the queue is full INFO goes first, then ERROR; TRADE is never dropped
+    (the queue overruns MAX_QUEUE instead).
+    Messages sent before `start()` are held (bounded) and delivered once it runs.
+    """
+
+    def __init__(self):
         self.client = None
+        self.channel = None
+        self.enabled = True  # accepting messages; turned off if start() finds no token
+        self.queue = []
+        self.index = {}  # (title, text) -> pending Notification, for dedupe
+        self.dropped = 0
+        self.cond = threading.Condition()
+        self.last_post = 0.0
+
+    def start(self, token, channel):
+        """Creates the client (slack_sdk is imported here, off the import path) and starts the worker"""
         self.channel = channel
-        self.enabled = False
-
-        if token:
-            try:
-                self.client = WebClient(token=token)
-                self.enabled = True
-            except Exception as e:
-                logging.error(f"Failed to initialize Slack Client: {e}")
-        else:
+        if not token:
             logging.warning("Slack Token is empty. Notifications disabled.")
-
-    def _send_thread(self, text, color, title):
-        """Executed in a background thread to prevent blocking the trading loop"""
-        if not self.enabled or not self.client:
+            self._disable()
             return
-
         try:
-            # Create a rich attachment with color
-            attachment = {
-                "color": color,
-                "fallback": f"{title}: {text}", # This shows on mobile notifications
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"*{title}*\n{text}"
-                        }
-                    }
-                ]
-            }
+            from slack_sdk import WebClient
+            self.client = WebClient(token=token)
+        except Exception as e:
+            logging.error(f"Failed to initialize Slack Client: {e}")
+            self._disable()
+            return
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _disable(self):
+        with self.cond:
+            self.enabled = False
+            self.queue.clear()
+            self.index.clear()
+
+    # --- Producer side ---
+    def _drop_one(self, priority):
+        """
+        Evicts the oldest least important message, if it is not more important than `priority`.
+        TRADE messages are never victims.
+        """
+        candidates = [n for n in self.queue if n.priority != PRIORITY["TRADE"]]
+        if not candidates:
+            return False
+        victim = max(candidates, key=lambda n: n.priority)
+        if victim.priority < priority:
+            return False
+        self.queue.remove(victim)
+        self.index.pop((victim.title, victim.text), None)
+        self.dropped += victim.count
+        return True
 
+    def send(self, message, strategy: StrategyState, msg_type="INFO", color="#3498db"):
+        """Queues the message for the worker. Never blocks on the network."""
+        if not self.enabled:
+            return
+        title = f"[{msg_type}] - {strategy.value}"
+        priority = PRIORITY.get(msg_type, PRIORITY["INFO"])
+        with self.cond:
+            pending = self.index.get((title, message))
+            if pending is not None:
+                pending.count += 1
+                return
+            # A TRADE is never refused: with nothing else left to evict the queue grows past MAX_QUEUE
+            if (len(self.queue) >= MAX_QUEUE and not self._drop_one(priority)
+                    and priority != PRIORITY["TRADE"]):
+                self.dropped += 1
+                return
+            note = Notification(message, color, title, priority)
+            self.queue.append(note)
+            self.index[(title, message)] = note
+            self.cond.notify()
+
+    # --- Worker side ---
+    def _take_batch(self):
+        with self.cond:
+            while not self.queue:
+                self.cond.wait()
+        time.sleep(BATCH_WINDOW)  # let the rest of the burst arrive
+        with self.cond:
+            batch = sorted(self.queue, key=lambda n: n.priority)[:MAX_BATCH]  # stable: arrival order kept
+            for note in batch:
+                self.queue.remove(note)
+                self.index.pop((note.title, note.text), None)
+            dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+    def _attachment(self, note):
+        text = note.text if note.count == 1 else f"{note.text}\n_(x{note.count})_"
+        return {
+            "color": note.color,
+            "fallback": f"{note.title}: {note.text}",  # This shows on mobile notifications
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*{note.title}*\n{text}"
+                    }
+                }
+            ]
+        }
+
+    def _post(self, attachments, retry=True):
+        from slack_sdk.errors import SlackApiError
+        wait = self.last_post + MIN_POST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
             self.client.chat_postMessage(
                 channel=self.channel,
-                attachments=[attachment],
+                attachments=attachments,
                 text=""  # FIX: Set to empty to prevent double message in chat
             )
         except SlackApiError as e:
+            if e.response.status_code == 429 and retry:
+                retry_after = int(e.response.headers.get("Retry-After", 1))
+                logging.warning(f"Slack rate limited, retrying in {retry_after}s")
+                self.last_post = time.monotonic() + retry_after
+                return self._post(attachments, retry=False)
             logging.error(f"Slack API Error: {e.response['error']}")
         except Exception as e:
             logging.error(f"Slack Send Error: {e}")
+        self.last_post = time.monotonic()
 
-    def send(self, message, strategy: StrategyState, msg_type="INFO", color="#3498db"):
-        """Spawns a thread to send the message"""
-        title = f"[{msg_type}] - {strategy.value}"
-        # Daemon thread ensures it doesn't block program exit
-        threading.Thread(target=self._send_thread, args=(message, color, title), daemon=True).start()
+    def _worker(self):
+        while True:
+            try:
+                batch, dropped = self._take_batch()
+                attachments = [self._attachment(note) for note in batch]
+                if dropped:
+                    attachments.append({"color": "#95a5a6",
+                                        "fallback": f"{dropped} notifications dropped",
+                                        "text": f"_{dropped} notifications dropped (backpressure)_"})
+                self._post(attachments)
+            except Exception as e:
+                logging.error(f"Slack Worker Error: {e}")
+
+
+# Initialize the Notifier ONCE (delivery starts when the entry point calls configure)
+notifier = SlackNotifier()
 
 
-# Initialize the Notifier ONCE
-notifier = SlackNotifier(SLACK_TOKEN, SLACK_CHANNEL)
+def configure(context):
+    """Starts delivery with the token/channel of the RuntimeContext built by the entry point"""
+    notifier.start(context.slack_token, context.slack_channel)
 
 
 # ==========================================
@@ -6,23 +6,62 @@ import base64
 import requests
 import datetime
 import logging
-from math import floor
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from requests.adapters import HTTPAdapter
 from genofinlib.slack_bot import trade_message, error_message, info_message, StrategyState
+from genofinlib.rate_limiter import get_governor
+from genofinlib.time_sync import get_clock
+from genofinlib.instrument_cache import get_instrument_cache
+from genofinlib.quantizer import get_quantizer
+from genofinlib.slave_ws import OkxWsTransport, BitmexWsTransport
+
+
+MAX_SLAVE_CONCURRENCY = 16
+
+# =========================================================
+# ================= SHARED HTTP POOLS =====================
+# =========================================================
+_venue_sessions = {}
+
+
+def get_venue_session(venue):
+    """
+    One keep-alive connection pool per venue, shared by every account on it,
+    so adding sub-accounts does not add TLS handshakes on the copy path.
+    """
+    if venue not in _venue_sessions:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_SLAVE_CONCURRENCY)
+        session.mount("https://", adapter)
+        _venue_sessions[venue] = session
+    return _venue_sessions[venue]
 
 
 # =========================================================
 # ==================== BITMEX CLIENT ======================
 # =========================================================
 class BitmexClient:
-    def __init__(self, key, secret, is_testnet=False):
+    def __init__(self, key, secret, is_testnet=False, session=None):
         self.key = key
         self.secret = secret
         self.base_url = "https://testnet.bitmex.com" if is_testnet else "https://www.bitmex.com"
-        self.session = requests.Session()
+        self.is_testnet = is_testnet
+        self.session = session or requests.Session()
+        self.governor = get_governor("bitmex", key)
+        self.clock = get_clock("bitmex", is_testnet)
+        self.ws = None
 
-    def _request(self, method, path, data=None):
+    def attach_ws(self, transport):
+        """Serve get_positions from the private position stream (orders stay on REST)"""
+        self.ws = transport
+
+    def _request(self, method, path, data=None, is_order=False):
+        self.governor.acquire(1, is_order)
         url = self.base_url + path
-        expires = str(int(time.time() + 10))
+        expires = str(int(self.clock.now() + 5))
         data_str = json.dumps(data) if data else ""
 
         parsed_url = requests.utils.urlparse(url)
@@ -46,23 +85,30 @@ class BitmexClient:
         elif method == "POST":
             response = self.session.post(url, headers=headers, data=data_str)
 
+        self.governor.check_response(response.status_code, response.headers)
         if not response.ok:
             raise Exception(f"BitMEX API Error ({response.status_code}): {response.text}")
         return response.json()
 
-    def get_balance(self):
+    def _usdt_margin(self, field):
         res = self._request("GET", "/api/v1/user/margin?currency=all")
         if isinstance(res, list):
             for item in res:
                 if item.get('currency') == 'USDt':
-                    return float(item.get('availableMargin', 0)) / 1000000.0
+                    return float(item.get(field, 0)) / 1000000.0
         return 0.0
 
-    def get_ticker_and_contract_size(self, symbol):
+    def get_balance(self):
+        return self._usdt_margin('availableMargin')
+
+    def get_equity(self):
+        """Margin balance incl. unrealised PnL (what the copy ratio is measured against)"""
+        return self._usdt_margin('marginBalance')
+
+    def _download_contract_spec(self, symbol):
         res = self._request("GET", f"/api/v1/instrument?symbol={symbol}&count=1&reverse=true")
         if res and len(res) > 0:
             data = res[0]
-            last_price = float(data.get('lastPrice', 0))
             lot_size = float(data.get('lotSize', 1.0))
 
             pos_mult = data.get('underlyingToPositionMultiplier')
@@ -72,9 +118,24 @@ class BitmexClient:
                 mult = data.get('multiplier', 1000)
                 contract_size = float(mult) / 1000000.0
 
-            return last_price, contract_size, lot_size
+            return {'contract_size': contract_size, 'lot_size': lot_size}
+        raise Exception(f"Instrument {symbol} not found")
+
+    def get_contract_spec(self, symbol):
+        cache_key = f"bitmex{'-testnet' if self.is_testnet else ''}:{symbol}"
+        spec = get_instrument_cache().get(cache_key, lambda: self._download_contract_spec(symbol))
+        return spec['contract_size'], spec['lot_size']
+
+    def get_last_price(self, symbol):
+        res = self._request("GET", f"/api/v1/instrument?symbol={symbol}&count=1&reverse=true&columns=lastPrice")
+        if res and len(res) > 0:
+            return float(res[0].get('lastPrice', 0))
         raise Exception(f"Ticker for {symbol} not found")
 
+    def get_ticker_and_contract_size(self, symbol):
+        contract_size, lot_size = self.get_contract_spec(symbol)
+        return self.get_last_price(symbol), contract_size, lot_size
+
     def set_leverage(self, symbol, leverage):
         try:
             self._request("POST", "/api/v1/position/leverage", {"symbol": symbol, "leverage": str(leverage)})
@@ -85,9 +146,15 @@ class BitmexClient:
         data = {"symbol": symbol, "side": side, "orderQty": int(orderQty), "ordType": "Market"}
         if reduceOnly:
             data["execInst"] = "ReduceOnly"
-        return self._request("POST", "/api/v1/order", data)
-
-    def get_positions(self, symbol):
+        return self._request("POST", "/api/v1/order", data, is_order=True)
+
+    def get_positions(self, symbol, fresh=False):
+        """
+        Served from the position stream once synced. fresh=True always asks REST: a close
+        must see the fill of an open that was acked a moment ago, whose push may still be in flight.
+        """
+        if self.ws and self.ws.positions_synced.is_set() and not fresh:
+            return self.ws.get_positions(symbol)
         import urllib.parse
         filter_json = json.dumps({'symbol': symbol}, separators=(',', ':'))
         encoded_filter = urllib.parse.quote(filter_json)
@@ -98,16 +165,23 @@ class BitmexClient:
 # ====================== OKX CLIENT =======================
 # =========================================================
 class OkxClient:
-    def __init__(self, key, secret, passphrase, is_testnet=False):
+    def __init__(self, key, secret, passphrase, is_testnet=False, session=None):
         self.key = key
         self.secret = secret
         self.passphrase = passphrase
         self.base_url = "https://www.okx.com"
         self.is_testnet = is_testnet
-        self.session = requests.Session()
+        self.session = session or requests.Session()
+        self.governor = get_governor("okx", key)
+        self.clock = get_clock("okx", is_testnet)
+        self.ws = None
+
+    def attach_ws(self, transport):
+        """Route orders through the private WS and serve positions from its push (REST stays as fallback)"""
+        self.ws = transport
 
     def _get_timestamp(self):
-        now = datetime.datetime.now(datetime.timezone.utc)
+        now = datetime.datetime.fromtimestamp(self.clock.now(), datetime.timezone.utc)
         return now.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
 
     def _sign(self, timestamp, method, requestPath, body):
@@ -115,7 +189,8 @@ class OkxClient:
         mac = hmac.new(bytes(self.secret, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod='sha256')
         return base64.b64encode(mac.digest()).decode('utf-8')
 
-    def _request(self, method, requestPath, data=None):
+    def _request(self, method, requestPath, data=None, is_order=False):
+        self.governor.acquire(1, is_order)
         url = self.base_url + requestPath
         body = json.dumps(data) if data else ""
         timestamp = self._get_timestamp()
@@ -137,6 +212,7 @@ class OkxClient:
         elif method == "POST":
             res = self.session.post(url, headers=headers, data=body)
 
+        self.governor.check_response(res.status_code, res.headers)
         json_data = res.json()
         if str(json_data.get("code", "0")) != "0":
             raise Exception(f"OKX API Error: {res.text}")
@@ -149,24 +225,43 @@ class OkxClient:
         except:
             pass
 
-    def get_balance(self):
+    def _usdt_detail(self, field):
         res = self._request("GET", "/api/v5/account/balance?ccy=USDT")
         data = res.get("data", [])
         if len(data) > 0:
             details = data[0].get("details", [])
             for ccy in details:
                 if ccy.get("ccy") == "USDT":
-                    return float(ccy.get("availEq", 0))
+                    return float(ccy.get(field, 0) or 0)
         return 0.0
 
-    def get_ticker_and_contract(self, instId):
-        tick_res = self._request("GET", f"/api/v5/market/ticker?instId={instId}")
-        last_price = float(tick_res["data"][0]["last"])
+    def get_balance(self):
+        return self._usdt_detail("availEq")
+
+    def get_equity(self):
+        """USDT equity incl. unrealised PnL (what the copy ratio is measured against)"""
+        return self._usdt_detail("eq")
+
+    def _download_contract_spec(self, instId):
         inst_res = self._request("GET", f"/api/v5/public/instruments?instType=SWAP&instId={instId}")
-        contract_size = float(inst_res["data"][0]["ctVal"])
-        min_amount = float(inst_res["data"][0]["minSz"])
-        lot_size = float(inst_res["data"][0]["lotSz"])
-        return last_price, contract_size, min_amount, lot_size
+        return {
+            'contract_size': float(inst_res["data"][0]["ctVal"]),
+            'min_amount': float(inst_res["data"][0]["minSz"]),
+            'lot_size': float(inst_res["data"][0]["lotSz"])
+        }
+
+    def get_contract_spec(self, instId):
+        cache_key = f"okx{'-testnet' if self.is_testnet else ''}:{instId}"
+        spec = get_instrument_cache().get(cache_key, lambda: self._download_contract_spec(instId))
+        return spec['contract_size'], spec['min_amount'], spec['lot_size']
+
+    def get_last_price(self, instId):
+        tick_res = self._request("GET", f"/api/v5/market/ticker?instId={instId}")
+        return float(tick_res["data"][0]["last"])
+
+    def get_ticker_and_contract(self, instId):
+        contract_size, min_amount, lot_size = self.get_contract_spec(instId)
+        return self.get_last_price(instId), contract_size, min_amount, lot_size
 
     def set_leverage(self, instId, leverage):
         try:
@@ -177,122 +272,392 @@ class OkxClient:
             pass
 
     def create_market_order(self, instId, side, sz, posSide=None, reduceOnly=False):
+        if self.ws and self.ws.ready.is_set():
+            self.governor.acquire(1, True)  # WS orders count against the same per-key order budget
+            return self.ws.create_market_order(instId, side, sz, posSide, reduceOnly)
         data = {"instId": instId, "tdMode": "cross", "side": side, "ordType": "market", "sz": str(sz)}
         if posSide: data["posSide"] = posSide
         if reduceOnly: data["reduceOnly"] = True
-        return self._request("POST", "/api/v5/trade/order", data)
+        return self._request("POST", "/api/v5/trade/order", data, is_order=True)
 
-    def get_positions(self, instId):
+    def get_positions(self, instId, fresh=False):
+        """Served from the position push once synced; fresh=True always asks REST (see BitmexClient)"""
+        if self.ws and self.ws.positions_synced.is_set() and not fresh:
+            return self.ws.get_positions(instId)
         res = self._request("GET", f"/api/v5/account/positions?instId={instId}")
         return res.get("data", [])
 
 
 # =========================================================
-# ==================== SLAVE MANAGER ======================
+# ==================== SLAVE ACCOUNTS =====================
 # =========================================================
-class SlaveManager:
-    def __init__(self, config, is_testnet=False):
-        self.okx = None
-        self.bitmex = None
-        self.symbol_base = config.symbol_name.upper()
-
-        bm_key = config.bitmex_test_key if is_testnet else config.bitmex_copy_key
-        bm_secret = config.bitmex_test_secret if is_testnet else config.bitmex_copy_secret
-        okx_key = config.okx_test_key if is_testnet else config.okx_copy_key
-        okx_secret = config.okx_test_secret if is_testnet else config.okx_copy_secret
-        okx_pass = config.okx_test_pass if is_testnet else config.okx_copy_pass
-
-        if bm_key and bm_secret:
-            self.bitmex = BitmexClient(bm_key, bm_secret, is_testnet)
-            info_message(f"Slave Connected: BITMEX ({'TESTNET' if is_testnet else 'MAINNET'})", StrategyState.VK)
-            logging.info(f"Slave Connected: BITMEX ({'TESTNET' if is_testnet else 'MAINNET'})")
-        if okx_key and okx_secret:
-            self.okx = OkxClient(okx_key, okx_secret, okx_pass, is_testnet)
-            info_message(f"Slave Connected: OKX ({'TESTNET' if is_testnet else 'MAINNET'})", StrategyState.VK)
-            logging.info(f"Slave Connected: OKX ({'TESTNET' if is_testnet else 'MAINNET'})")
-            self.okx.set_position_mode(False)
-
-    def enter_long(self, percentage_of_capital, leverage):
-        self.open_long_bitmex(percentage_of_capital, leverage)
-        self.open_long_okx(percentage_of_capital, leverage)
-
-    def exit_long(self):
-        self.close_long_bitmex()
-        self.close_long_okx()
-
-    def get_bitmex_symbol(self):
+SLAVE_REFRESH_INTERVAL = 5  # seconds between background balance / price refreshes
+WARM_MAX_AGE = 30           # older snapshots are re-fetched inline on the signal path
+
+
+class MarketState:
+    """Last price and contract spec of one venue symbol, shared by every account on that venue"""
+
+    def __init__(self):
+        self.price = None
+        self.price_at = 0.0
+        self.spec = None
+
+
+class SlaveAccount(ABC):
+    """
+    One copy account. Venue subclasses implement symbol mapping, data fetches and order calls.
+    Balance, price and contract spec are kept warm by SlaveManager's refresher, so sizing at
+    signal time is a pure in-memory calculation and the order is the only network call.
+    """
+    venue = None
+
+    def __init__(self, name, client, symbol_base, size_multiplier=1.0):
+        self.name = name
+        self.client = client
+        self.symbol_base = symbol_base
+        self.size_multiplier = float(size_multiplier)
+        self.market = MarketState()
+        self.balance = None
+        self.balance_at = 0.0
+        self.latency_ms = deque(maxlen=100)
+        self.failures = 0
+        self.last_error = None
+
+    def percentage(self, percentage_of_capital):
+        return min(100.0, percentage_of_capital * self.size_multiplier)
+
+    # --- Venue specific ---
+    @abstractmethod
+    def symbol(self):
+        """Venue symbol of symbol_base"""
+
+    @abstractmethod
+    def fetch_spec(self):
+        """Returns {'contract_size', 'lot_size', 'min_amount'}"""
+
+    @abstractmethod
+    def place_open(self, contracts):
+        """Market buy of `contracts`"""
+
+    @abstractmethod
+    def close_long(self):
+        """Reduce-only close of the whole long"""
+
+    @abstractmethod
+    def position_contracts(self):
+        """Signed position size in venue contracts"""
+
+    def notional(self, contracts):
+        """USDT value of `contracts` at the warm price, through the venue's contract size"""
+        if self.market.spec is None or self.market.price is None:
+            self.refresh_market()
+        return abs(contracts) * self.market.spec['contract_size'] * self.market.price
+
+    def equity(self):
+        return self.client.get_equity()
+
+    # --- Warm state ---
+    def refresh_balance(self):
+        self.balance = self.client.get_balance()
+        self.balance_at = time.monotonic()
+
+    def refresh_market(self):
+        self.market.spec = self.fetch_spec()  # memory hit in the instrument cache, picks up its refreshes
+        self.market.price = self.client.get_last_price(self.symbol())
+        self.market.price_at = time.monotonic()
+
+    def sizing_inputs(self):
+        """Warm balance/price/spec; only a missing or very stale snapshot costs a request here"""
+        now = time.monotonic()
+        if self.market.spec is None or now - self.market.price_at > WARM_MAX_AGE:
+            self.refresh_market()
+        if self.balance is None or now - self.balance_at > WARM_MAX_AGE:
+            self.refresh_balance()
+        return self.balance, self.market.price, self.market.spec
+
+    def size_long(self, percentage, leverage):
+        usdt_free, price, spec = self.sizing_inputs()
+        if usdt_free <= 5: return 0
+        # [SANITIZED] Proprietary notional and margin buffer multipliers removed
+        raw_contracts = (usdt_free * (percentage / 100) * leverage) / (price * spec['contract_size'])
+        contracts = get_quantizer(spec['lot_size']).to_number(raw_contracts)
+        return contracts if contracts >= spec['min_amount'] else 0
+
+    def open_long(self, percentage, leverage):
+        contracts = self.size_long(percentage, leverage)
+        if not contracts:
+            return None
+        self.place_open(contracts)
+        self.balance_at = 0.0  # margin changed, refresh before the next sizing
+        return contracts
+
+    def stats(self):
+        lat = sorted(self.latency_ms)
+        return {
+            "venue": self.venue,
+            "orders": len(lat),
+            "p50_ms": round(lat[len(lat) // 2], 1) if lat else None,
+            "max_ms": round(lat[-1], 1) if lat else None,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class BitmexSlave(SlaveAccount):
+    venue = "bitmex"
+
+    def symbol(self):
         base = "XBT" if self.symbol_base == "BTC" else self.symbol_base
         return f"{base}USDT"
 
-    def open_long_bitmex(self, percentage, leverage):
-        if not self.bitmex: return
-        try:
-            symbol = self.get_bitmex_symbol()
-            usdt_free = self.bitmex.get_balance()
-            if usdt_free <= 5: return
+    def fetch_spec(self):
+        contract_size, lot_size = self.client.get_contract_spec(self.symbol())
+        return {'contract_size': contract_size, 'lot_size': lot_size, 'min_amount': lot_size}
 
-            price, contract_size, lot_size = self.bitmex.get_ticker_and_contract_size(symbol)
-            # [SANITIZED] Proprietary notional and margin buffer multipliers removed
-            raw_contracts = (usdt_free * (percentage / 100) * leverage) / (price * contract_size)
-            contracts = int(floor(raw_contracts / lot_size) * lot_size)
+    def place_open(self, contracts):
+        self.client.create_market_order(self.symbol(), "Buy", int(contracts))
 
-            if contracts > 0:
-                self.bitmex.create_market_order(symbol, "Buy", contracts)
-                trade_message(f"BITMEX Long Opened | Qty: {contracts}", StrategyState.VK)
-        except Exception as e:
-            error_message(f"BITMEX Entry Failed: {e}", StrategyState.VK)
+    def position_contracts(self):
+        return sum(float(pos.get('currentQty', 0) or 0) for pos in self.client.get_positions(self.symbol()))
 
-    def close_long_bitmex(self):
-        if not self.bitmex: return
-        try:
-            symbol = self.get_bitmex_symbol()
-            positions = self.bitmex.get_positions(symbol)
-            for pos in positions:
-                amt = float(pos.get('currentQty', 0))
-                if amt > 0:
-                    self.bitmex.create_market_order(symbol, "Sell", amt, reduceOnly=True)
-                    trade_message(f"BITMEX Long Closed", StrategyState.VK)
-        except:
-            pass
+    def close_long(self):
+        symbol = self.symbol()
+        closed = None
+        for pos in self.client.get_positions(symbol, fresh=True):
+            amt = float(pos.get('currentQty', 0))
+            if amt > 0:
+                self.client.create_market_order(symbol, "Sell", amt, reduceOnly=True)
+                closed = amt
+        self.balance_at = 0.0
+        return closed
+
+
+class OkxSlave(SlaveAccount):
+    venue = "okx"
 
-    def get_okx_symbol(self):
+    def symbol(self):
         return f"{self.symbol_base}-USDT-SWAP"
 
-    def open_long_okx(self, percentage, leverage):
-        if not self.okx: return
+    def fetch_spec(self):
+        contract_size, min_amount, lot_size = self.client.get_contract_spec(self.symbol())
+        return {'contract_size': contract_size, 'lot_size': lot_size, 'min_amount': min_amount}
+
+    def place_open(self, contracts):
+        self.client.create_market_order(self.symbol(), "buy", contracts)
+
+    def position_contracts(self):
+        return sum(float(pos.get('pos', 0) or 0) for pos in self.client.get_positions(self.symbol()))
+
+    def close_long(self):
+        symbol = self.symbol()
+        closed = None
+        for pos in self.client.get_positions(symbol, fresh=True):
+            contracts = float(pos.get('pos', 0))
+            if contracts > 0:
+                self.client.create_market_order(symbol, "sell", contracts, reduceOnly=True)
+                closed = contracts
+        self.balance_at = 0.0
+        return closed
+
+
+def build_bitmex_slave(spec, symbol_base, is_testnet):
+    client = BitmexClient(spec["key"], spec["secret"], is_testnet, session=get_venue_session("bitmex"))
+    if spec.get("ws", True):
+        client.attach_ws(BitmexWsTransport(spec["key"], spec["secret"], client.clock, is_testnet).connect())
+    return BitmexSlave(spec["name"], client, symbol_base, spec.get("size_multiplier", 1.0))
+
+
+def build_okx_slave(spec, symbol_base, is_testnet):
+    client = OkxClient(spec["key"], spec["secret"], spec.get("passphrase", ""), is_testnet,
+                       session=get_venue_session("okx"))
+    client.set_position_mode(False)
+    slave = OkxSlave(spec["name"], client, symbol_base, spec.get("size_multiplier", 1.0))
+    if spec.get("ws", True):
+        client.attach_ws(OkxWsTransport(spec["key"], spec["secret"], spec.get("passphrase", ""), client.clock,
+                                        is_testnet, inst_ids=[slave.symbol()]).connect())
+    return slave
+
+
+# Extension point: register a builder here to copy to a new venue
+SLAVE_BUILDERS = {
+    "bitmex": build_bitmex_slave,
+    "okx": build_okx_slave,
+}
+
+
+def load_slave_specs(config, is_testnet=False):
+    """
+    Reads `slave_accounts` (list of dicts: name, venue, key, secret, passphrase, size_multiplier, ws).
+    Falls back to the single legacy BitMEX / OKX key attributes when the list is absent or empty.
+    """
+    specs = [dict(s) for s in getattr(config, "slave_accounts", None) or [] if s.get("enabled", True)]
+    if specs:
+        return specs
+
+    prefix = "test" if is_testnet else "copy"
+    bm_key = getattr(config, f"bitmex_{prefix}_key", None)
+    bm_secret = getattr(config, f"bitmex_{prefix}_secret", None)
+    okx_key = getattr(config, f"okx_{prefix}_key", None)
+    okx_secret = getattr(config, f"okx_{prefix}_secret", None)
+    okx_pass = getattr(config, f"okx_{prefix}_pass", None)
+
+    if bm_key and bm_secret:
+        specs.append({"name": "BITMEX", "venue": "bitmex", "key": bm_key, "secret": bm_secret})
+    if okx_key and okx_secret:
+        specs.append({"name": "OKX", "venue": "okx", "key": okx_key, "secret": okx_secret, "passphrase": okx_pass})
+    return specs
+
+
+# =========================================================
+# ==================== SLAVE MANAGER ======================
+# =========================================================
+class SerialQueue:
+    """
+    FIFO of one account's copy jobs on the shared pool: at most one of them runs at a time,
+    so a close never overtakes the open still in flight on another worker, while accounts
+    still run side by side.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.jobs = deque()
+        self.lock = threading.Lock()
+        self.draining = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self.lock:
+            self.jobs.append((future, fn, args))
+            if self.draining:
+                return future
+            self.draining = True
         try:
-            import math
-            symbol = self.get_okx_symbol()
-            usdt_free = self.okx.get_balance()
-            if usdt_free <= 5: return
-
-            price, contract_size, min_amount, lot_size = self.okx.get_ticker_and_contract(symbol)
-            # [SANITIZED] Proprietary margin buffer removed
-            raw_contracts = (usdt_free * (percentage / 100) * leverage) / (price * contract_size)
-            contracts = math.floor(raw_contracts / lot_size) * lot_size
-
-            # Precision formatting
-            if contracts.is_integer():
-                contracts = int(contracts)
-            else:
-                decimals = max(0, int(round(-math.log(lot_size, 10), 0)))
-                contracts = round(contracts, decimals)
+            self.executor.submit(self._drain)
+        except RuntimeError as e:  # pool shut down
+            with self.lock:
+                self.jobs.clear()
+                self.draining = False
+            future.set_exception(e)
+        return future
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                if not self.jobs:
+                    self.draining = False
+                    return
+                future, fn, args = self.jobs.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
 
-            if contracts >= min_amount:
-                self.okx.create_market_order(symbol, "buy", contracts)
-                trade_message(f"OKX Long Opened | Qty: {contracts}", StrategyState.VK)
+
+class SlaveManager:
+    def __init__(self, ctx):
+        self.ctx = ctx
+        is_testnet, net_type = ctx.is_testnet, ctx.net_type
+        self.symbol_base = ctx.cfg.symbol_name.upper()
+        self.accounts = []
+
+        for spec in load_slave_specs(ctx.cfg, is_testnet):
+            builder = SLAVE_BUILDERS.get(spec.get("venue", "").lower())
+            if builder is None:
+                logging.error(f"Slave {spec.get('name')}: unknown venue {spec.get('venue')}")
+                continue
+            try:
+                self.accounts.append(builder(spec, self.symbol_base, is_testnet))
+                info_message(f"Slave Connected: {spec['name']} ({net_type})", StrategyState.VK)
+                logging.info(f"Slave Connected: {spec['name']} ({net_type})")
+            except Exception as e:
+                logging.error(f"Slave {spec.get('name')} Init Failed: {e}")
+                error_message(f"Slave {spec.get('name')} Init Failed: {e}", StrategyState.VK)
+
+        # Accounts on the same venue/symbol share one MarketState, so prices are fetched once per venue
+        self.markets = {}
+        for acc in self.accounts:
+            acc.market = self.markets.setdefault((acc.venue, acc.symbol()), acc.market)
+
+        # Slave orders never run on the trading thread; concurrency is bounded so dozens of
+        # accounts share a fixed number of workers and connections
+        workers = max(1, min(MAX_SLAVE_CONCURRENCY, len(self.accounts)))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slave")
+        self.queues = {acc: SerialQueue(self.executor) for acc in self.accounts}
+
+        # Background refresh runs on its own small pool so it never delays an order
+        self.refresh_executor = ThreadPoolExecutor(max_workers=min(4, workers), thread_name_prefix="slave-refresh")
+        self.refresh_now = threading.Event()
+        if self.accounts:
+            threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                leaders = {}
+                for acc in self.accounts:
+                    leaders.setdefault((acc.venue, acc.symbol()), acc)
+                jobs = [self.refresh_executor.submit(acc.refresh_market) for acc in leaders.values()]
+                jobs += [self.refresh_executor.submit(acc.refresh_balance) for acc in self.accounts]
+                for job in jobs:
+                    try:
+                        job.result()
+                    except Exception as e:
+                        logging.warning(f"Slave refresh failed: {e}")
+            except RuntimeError:
+                return  # executor shut down with the interpreter
+            self.refresh_now.wait(SLAVE_REFRESH_INTERVAL)
+            self.refresh_now.clear()
+
+    def enter_long(self, percentage_of_capital, leverage, master_sent_at=None):
+        """
+        Dispatches the copy to every account concurrently (in order per account) and returns
+        immediately. `master_sent_at` is the master order's send stamp; without one (nothing
+        was sent, or the master order fired on the exchange) no copy lag is recorded.
+        """
+        return [self.queues[acc].submit(self._open_long, acc, percentage_of_capital, leverage, master_sent_at)
+                for acc in self.accounts]
+
+    def exit_long(self, master_sent_at=None):
+        return [self.queues[acc].submit(self._close_long, acc, master_sent_at) for acc in self.accounts]
+
+    def record_copy_lag(self, account, master_sent_at):
+        """Copy lag = master order send -> slave order ack"""
+        if master_sent_at is None:
+            return None
+        lag_ms = (time.monotonic() - master_sent_at) * 1000
+        account.latency_ms.append(lag_ms)
+        logging.info(f"{account.name} Copy Lag: {lag_ms:.0f}ms")
+        return lag_ms
+
+    def _open_long(self, account, percentage_of_capital, leverage, master_sent_at):
+        try:
+            contracts = account.open_long(account.percentage(percentage_of_capital), leverage)
+            self.refresh_now.set()
+            if contracts:
+                lag_ms = self.record_copy_lag(account, master_sent_at)
+                lag = f"{lag_ms:.0f}ms" if lag_ms is not None else "n/a"
+                trade_message(f"{account.name} Long Opened | Qty: {contracts} | Lag: {lag}", StrategyState.VK)
         except Exception as e:
-            error_message(f"OKX Entry Failed: {e}", StrategyState.VK)
+            account.failures += 1
+            account.last_error = str(e)
+            error_message(f"{account.name} Entry Failed: {e}", StrategyState.VK)
 
-    def close_long_okx(self):
-        if not self.okx: return
+    def _close_long(self, account, master_sent_at):
         try:
-            symbol = self.get_okx_symbol()
-            positions = self.okx.get_positions(symbol)
-            for pos in positions:
-                contracts = float(pos.get('pos', 0))
-                if contracts > 0:
-                    self.okx.create_market_order(symbol, "sell", contracts, reduceOnly=True)
-                    trade_message(f"OKX Long Closed", StrategyState.VK)
-        except:
-            pass
\ No newline at end of file
+            closed = account.close_long()
+            self.refresh_now.set()
+            if closed:
+                self.record_copy_lag(account, master_sent_at)
+                trade_message(f"{account.name} Long Closed", StrategyState.VK)
+        except Exception as e:
+            account.failures += 1
+            account.last_error = str(e)
+            logging.error(f"{account.name} Exit Failed: {e}")
+            error_message(f"{account.name} Exit Failed: {e}", StrategyState.VK)
+
+    def report(self):
+        """Per-account copy latency and failure counts"""
+        return {acc.name: acc.stats() for acc in self.accounts}
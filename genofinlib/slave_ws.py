@@ -0,0 +1,249 @@
+import json
+import time
+import hmac
+import base64
+import hashlib
+import logging
+import threading
+import itertools
+import websocket
+from abc import ABC, abstractmethod
+from .slack_bot import StrategyState, error_message
+
+HEARTBEAT_INTERVAL = 20  # both venues drop idle private sockets after ~30s
+REQUEST_TIMEOUT = 5
+RECONNECT_DELAY = 2
+
+
+class WsTransport(ABC):
+    """
+    Authenticated, self-reconnecting private socket for a slave account.
+    Subclasses build the login frame and route pushes; `request()` correlates
+    replies by id so worker threads can use it like a blocking REST call.
+    """
+    name = "WS"
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        self.ready = threading.Event()
+        self.positions_synced = threading.Event()  # set once the first position snapshot arrived
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.positions = {}
+        self.last_recv = time.monotonic()
+        self.closing = False
+
+    # --- Subclass hooks ---
+    @abstractmethod
+    def login_frame(self):
+        """The auth frame sent on every (re)connect"""
+
+    @abstractmethod
+    def get_positions(self, symbol):
+        """Latest pushed position rows for `symbol`"""
+
+    def on_login(self, ws):
+        """Called once authenticated: subscribe private channels here"""
+
+    def handle(self, msg):
+        """Routes a parsed push. Returns the request id it answers, if any."""
+        return msg.get("id")
+
+    # --- Connection ---
+    def on_open(self, ws):
+        ws.send(json.dumps(self.login_frame()))
+
+    def on_close(self, ws, close_status_code, close_msg):
+        self.ready.clear()
+        self.positions_synced.clear()
+        self.positions.clear()
+        logging.warning(f"{self.name} Disconnected: {close_msg}")
+        self._fail_pending("socket closed")
+
+    def on_error(self, ws, error):
+        logging.error(f"{self.name} Error: {error}")
+
+    def on_message(self, ws, message):
+        self.last_recv = time.monotonic()
+        if message == "pong":
+            return
+        try:
+            msg = json.loads(message)
+            req_id = self.handle(msg)
+            if req_id is not None:
+                with self.pending_lock:
+                    waiter = self.pending.pop(str(req_id), None)
+                if waiter:
+                    waiter[1] = msg
+                    waiter[0].set()
+        except Exception as e:
+            logging.error(f"{self.name} Parse Error: {e}")
+
+    def _fail_pending(self, reason):
+        with self.pending_lock:
+            waiters = list(self.pending.values())
+            self.pending.clear()
+        for waiter in waiters:
+            waiter[1] = {"error": reason}
+            waiter[0].set()
+
+    def _heartbeat(self):
+        while not self.closing:
+            time.sleep(HEARTBEAT_INTERVAL / 2)
+            if self.ready.is_set() and time.monotonic() - self.last_recv > HEARTBEAT_INTERVAL:
+                try:
+                    self.ws.send("ping")
+                except Exception as e:
+                    logging.warning(f"{self.name} Ping Failed: {e}")
+
+    def connect(self):
+        def run():
+            while not self.closing:
+                try:
+                    self.ws = websocket.WebSocketApp(
+                        self.url, on_open=self.on_open, on_close=self.on_close,
+                        on_error=self.on_error, on_message=self.on_message)
+                    self.ws.run_forever()
+                except Exception as e:
+                    logging.error(f"{self.name} Reconnect Error: {e}")
+                    error_message(f"{self.name} Reconnect Error: {e}", StrategyState.VK)
+                time.sleep(RECONNECT_DELAY)
+        threading.Thread(target=run, daemon=True).start()
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+        return self
+
+    def close(self):
+        """Stops reconnecting and closes the socket (pending requests fail in on_close)"""
+        self.closing = True
+        if self.ws is not None:
+            self.ws.close()
+
+    def request(self, frame, timeout=REQUEST_TIMEOUT):
+        """Sends `frame` with a fresh id and blocks until the matching reply (or raises)"""
+        if not self.ready.is_set():
+            raise ConnectionError(f"{self.name} not ready")
+        req_id = str(next(self.ids))
+        frame["id"] = req_id
+        waiter = [threading.Event(), None]
+        with self.pending_lock:
+            self.pending[req_id] = waiter
+        self.ws.send(json.dumps(frame))
+        if not waiter[0].wait(timeout):
+            with self.pending_lock:
+                self.pending.pop(req_id, None)
+            raise TimeoutError(f"{self.name} request {req_id} timed out")
+        return waiter[1]
+
+
+# =========================================================
+# ======================== OKX ============================
+# =========================================================
+class OkxWsTransport(WsTransport):
+    """OKX private channel: order entry over `op: order`, positions from the `positions` push"""
+    name = "OKX WS"
+
+    def __init__(self, key, secret, passphrase, clock, is_testnet=False, inst_ids=()):
+        url = ("wss://wspap.okx.com:8443/ws/v5/private?brokerId=9999" if is_testnet
+               else "wss://ws.okx.com:8443/ws/v5/private")
+        super().__init__(url)
+        self.key = key
+        self.secret = secret
+        self.passphrase = passphrase
+        self.clock = clock
+        self.inst_ids = list(inst_ids)
+
+    def login_frame(self):
+        ts = str(int(self.clock.now()))
+        mac = hmac.new(self.secret.encode("utf-8"), f"{ts}GET/users/self/verify".encode("utf-8"), hashlib.sha256)
+        sign = base64.b64encode(mac.digest()).decode("utf-8")
+        return {"op": "login", "args": [{"apiKey": self.key, "passphrase": self.passphrase,
+                                          "timestamp": ts, "sign": sign}]}
+
+    def on_login(self, ws):
+        args = [{"channel": "positions", "instType": "SWAP", "instId": inst_id} for inst_id in self.inst_ids]
+        if args:
+            ws.send(json.dumps({"op": "subscribe", "args": args}))
+        self.ready.set()
+
+    def handle(self, msg):
+        if msg.get("event") == "login":
+            if str(msg.get("code")) == "0":
+                logging.info(f"{self.name} Logged In")
+                self.on_login(self.ws)
+            else:
+                logging.error(f"{self.name} Login Failed: {msg}")
+            return None
+        if msg.get("event") == "error":
+            logging.error(f"{self.name} Error Event: {msg}")
+            return None
+        if msg.get("arg", {}).get("channel") == "positions" and "data" in msg:
+            for pos in msg["data"]:
+                self.positions[pos.get("instId")] = pos
+            self.positions_synced.set()
+            return None
+        return msg.get("id")
+
+    def create_market_order(self, instId, side, sz, posSide=None, reduceOnly=False):
+        args = {"instId": instId, "tdMode": "cross", "side": side, "ordType": "market", "sz": str(sz)}
+        if posSide: args["posSide"] = posSide
+        if reduceOnly: args["reduceOnly"] = True
+        res = self.request({"op": "order", "args": [args]})
+        data = res.get("data") or [{}]
+        if str(res.get("code", "1")) != "0" or str(data[0].get("sCode", "0")) != "0":
+            raise Exception(f"OKX WS Order Error: {res}")
+        return res
+
+    def get_positions(self, instId):
+        pos = self.positions.get(instId)
+        return [pos] if pos else []
+
+
+# =========================================================
+# ======================= BITMEX ==========================
+# =========================================================
+class BitmexWsTransport(WsTransport):
+    """
+    BitMEX's realtime API is subscription-only (no order entry), so this transport serves
+    get_positions from the authenticated `position` stream; orders stay on pooled REST.
+    """
+    name = "BITMEX WS"
+
+    def __init__(self, key, secret, clock, is_testnet=False):
+        url = "wss://ws.testnet.bitmex.com/realtime" if is_testnet else "wss://ws.bitmex.com/realtime"
+        super().__init__(url)
+        self.key = key
+        self.secret = secret
+        self.clock = clock
+
+    def login_frame(self):
+        expires = int(self.clock.now() + 5)
+        sign = hmac.new(self.secret.encode("utf-8"), f"GET/realtime{expires}".encode("utf-8"),
+                        hashlib.sha256).hexdigest()
+        return {"op": "authKeyExpires", "args": [self.key, expires, sign]}
+
+    def handle(self, msg):
+        req = msg.get("request", {})
+        if req.get("op") == "authKeyExpires":
+            if msg.get("success"):
+                logging.info(f"{self.name} Logged In")
+                self.ws.send(json.dumps({"op": "subscribe", "args": ["position"]}))
+                self.ready.set()
+            else:
+                logging.error(f"{self.name} Login Failed: {msg}")
+            return None
+        if msg.get("table") == "position":
+            if msg.get("action") == "partial":
+                self.positions.clear()
+            for pos in msg.get("data", []):
+                merged = self.positions.get(pos.get("symbol"), {})
+                merged.update(pos)
+                self.positions[pos.get("symbol")] = merged
+            if msg.get("action") == "partial":
+                self.positions_synced.set()
+        return None
+
+    def get_positions(self, symbol):
+        pos = self.positions.get(symbol)
+        return [pos] if pos else []
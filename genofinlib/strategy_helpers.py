@@ -0,0 +1,51 @@
+import math
+from collections import deque
+import numpy as np
+
+# ==========================================
+# O(1)-PER-BAR STATE FOR backtesting.py STRATEGIES
+# ==========================================
+DRAWDOWN_LOOKBACK = 3  # bars before the highest high where the lowest-low scan starts
+STATE_HISTORY = 2      # strategies only ever read [-1] and [-2] of their entry/equity history
+
+
+class DrawdownTracker:
+    """
+    Running version of
+        highest_high = High.max()
+        lowest_low = Low.iloc[max(0, High.argmax() - 3):].min()
+    Each bar is seen once; only the last lookback + 1 lows are kept to restart the
+    lowest-low scan when a new (strictly higher, so argmax stays the first) high prints.
+    """
+
+    def __init__(self, lookback=DRAWDOWN_LOOKBACK):
+        self.recent_lows = deque(maxlen=lookback + 1)
+        self.highest = -math.inf
+        self.lowest = math.inf
+        self.seen = 0
+
+    def update(self, high, low):
+        """
+        Feeds the bars not seen yet. backtesting.py's arrays grow by one bar per next()
+        and skip the indicator warm-up, so the first call catches up on those bars.
+        """
+        for i in range(self.seen, len(high)):
+            self.recent_lows.append(low[i])
+            if high[i] > self.highest:
+                self.highest = high[i]
+                self.lowest = min(self.recent_lows)
+            elif low[i] < self.lowest:
+                self.lowest = low[i]
+        self.seen = len(high)
+        return self.highest, self.lowest
+
+
+def macro_regime(index, macro_event):
+    """Per-bar flag, True from the macro event on (the `not macro_event > current_time` branch)"""
+    import pandas as pd
+    return np.asarray(pd.DatetimeIndex(index) >= pd.Timestamp(macro_event))
+
+
+def bounded_history(first, maxlen=STATE_HISTORY):
+    """Entry-price / equity history that keeps only what next() reads"""
+    return deque([first], maxlen=maxlen)
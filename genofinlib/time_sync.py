@@ -0,0 +1,138 @@
+import time
+import logging
+import threading
+import requests
+from .rate_limiter import get_governor
+
+
+# ==========================================
+# EXCHANGE TIME ENDPOINTS
+# ==========================================
+# venue -> (mainnet url, testnet url, parser returning server time in ms)
+TIME_ENDPOINTS = {
+    "binance": ("https://fapi.binance.com/fapi/v1/time",
+                "https://testnet.binancefuture.com/fapi/v1/time",
+                lambda res: int(res["serverTime"])),
+    "bitmex": ("https://www.bitmex.com/api/v1",
+               "https://testnet.bitmex.com/api/v1",
+               lambda res: int(res["timestamp"])),
+    "okx": ("https://www.okx.com/api/v5/public/time",
+            "https://www.okx.com/api/v5/public/time",
+            lambda res: int(res["data"][0]["ts"])),
+}
+
+SYNC_INTERVAL = 60
+SAMPLES_PER_SYNC = 5
+FIRST_SYNC_TIMEOUT = 3  # longest a signer waits for the first estimate before using the local clock
+
+# Binance recvWindow for every signed request, REST and WS API alike. Exchange-synced
+# timestamps let us run well under Binance's 5000ms default.
+RECV_WINDOW = 3000
+
+
+class ClockSync:
+    """
+    Estimates the exchange clock from the minimum-RTT sample of each sync round
+    (the sample with the least network asymmetry) and anchors it to the monotonic
+    clock, so host wall-clock jumps never reach the signed timestamps.
+    """
+
+    def __init__(self, venue, url, parser, interval=SYNC_INTERVAL, samples=SAMPLES_PER_SYNC):
+        self.venue = venue
+        self.url = url
+        self.parser = parser
+        self.interval = interval
+        self.samples = samples
+        self.session = requests.Session()
+        self.governor = get_governor(venue)
+
+        self.lock = threading.Lock()
+        self.anchor_mono = None
+        self.anchor_server_ms = None
+        self.offset_ms = 0.0
+        self.rtt_ms = None
+        self.started = False
+        self.first_sync = threading.Event()  # set after the first round, successful or not
+
+    def _sample(self):
+        self.governor.acquire(1)
+        t0 = time.monotonic()
+        wall0 = time.time()
+        res = self.session.get(self.url, timeout=5)
+        t1 = time.monotonic()
+        server_ms = self.parser(res.json())
+        rtt = t1 - t0
+        mid_mono = t0 + rtt / 2
+        offset_ms = server_ms - (wall0 + rtt / 2) * 1000
+        return rtt * 1000, mid_mono, server_ms, offset_ms
+
+    def sync(self):
+        best = None
+        for _ in range(self.samples):
+            try:
+                sample = self._sample()
+            except Exception as e:
+                logging.warning(f"[{self.venue}] Time sync sample failed: {e}")
+                continue
+            if best is None or sample[0] < best[0]:
+                best = sample
+
+        if best is None:
+            return False
+
+        rtt_ms, mid_mono, server_ms, offset_ms = best
+        with self.lock:
+            self.rtt_ms = rtt_ms
+            self.anchor_mono = mid_mono
+            self.anchor_server_ms = server_ms
+            self.offset_ms = offset_ms
+        logging.info(f"[{self.venue}] Clock synced | Offset: {offset_ms:.1f}ms | RTT: {rtt_ms:.1f}ms")
+        return True
+
+    def start(self):
+        """Syncs in a daemon thread right away, then keeps the estimate fresh. Never blocks."""
+        with self.lock:
+            if self.started:
+                return self
+            self.started = True
+
+        def run():
+            while True:
+                try:
+                    self.sync()
+                finally:
+                    self.first_sync.set()
+                time.sleep(self.interval)
+
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+    def now_ms(self):
+        """Exchange time in milliseconds (falls back to the local clock if the first sync failed)"""
+        if not self.first_sync.is_set():
+            self.first_sync.wait(FIRST_SYNC_TIMEOUT)
+        with self.lock:
+            if self.anchor_mono is None:
+                return int(time.time() * 1000)
+            return int(self.anchor_server_ms + (time.monotonic() - self.anchor_mono) * 1000)
+
+    def now(self):
+        return self.now_ms() / 1000.0
+
+
+# ==========================================
+# SHARED REGISTRY
+# ==========================================
+_clocks = {}
+_registry_lock = threading.Lock()
+
+
+def get_clock(venue, is_testnet=False):
+    """One running clock per venue/network, shared by every signer in the process"""
+    key = (venue, bool(is_testnet))
+    with _registry_lock:
+        if key not in _clocks:
+            mainnet_url, testnet_url, parser = TIME_ENDPOINTS[venue]
+            _clocks[key] = ClockSync(venue, testnet_url if is_testnet else mainnet_url, parser)
+        clock = _clocks[key]
+    return clock.start()
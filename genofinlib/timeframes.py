@@ -0,0 +1,146 @@
+import numpy as np
+from .result_store import code_hash
+
+# ==========================================
+# ANY BAR SIZE FROM ONE PASS OVER THE 1m DATA
+# ==========================================
+BASE = '1h'  # pre-aggregated block size: every multiple of it is served from sparse tables
+AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _sparse_table(values, op):
+    """table[k][i] = op over values[i : i + 2**k]"""
+    table = [values]
+    step = 1
+    while 2 * step <= len(values):
+        prev = table[-1]
+        table.append(op(prev[:-step], prev[step:]))
+        step *= 2
+    return table
+
+
+def _range_query(table, op, starts, ends):
+    """op over values[s:e] for every (s, e): two overlapping power-of-two blocks"""
+    out = np.empty(len(starts))
+    level = np.floor(np.log2(ends - starts)).astype(int)
+    for k in np.unique(level):
+        rows = level == k
+        s, e = starts[rows], ends[rows]
+        out[rows] = op(table[k][s], table[k][e - (1 << k)])
+    return out
+
+
+class TimeframeIndex:
+    """
+    1m OHLC(V) indexed once so any bar size is cheap: fixed bar sizes that are multiples of
+    BASE come from per-block first/last arrays, sparse tables for High/Low and prefix sums
+    for Volume; other fixed sizes use one reduceat over the 1m arrays; calendar-anchored
+    ones ('1W', '1ME') fall back to pandas. Bars match
+    `df.resample(tf).agg(...)` (left-closed, left-labelled, origin at the first day's
+    midnight, empty bins as NaN rows).
+    """
+
+    def __init__(self, fine, base=BASE):
+        import pandas as pd
+        self.fine = fine
+        self.columns = [c for c in AGG if c in fine]
+        self.times = np.asarray(pd.DatetimeIndex(fine.index).as_unit('ns').asi8)  # pandas 3 defaults to us
+        self.origin = pd.Timestamp(fine.index[0]).floor('D').value
+        self.base = pd.Timedelta(base).value
+        self.cache = {}
+
+        starts, ends, self.base_times = self._blocks(self.times, self.base)
+        self.base_open = fine['Open'].to_numpy(dtype=float)[starts]
+        self.base_close = fine['Close'].to_numpy(dtype=float)[ends - 1]
+        self.high_table = _sparse_table(np.maximum.reduceat(fine['High'].to_numpy(dtype=float), starts), np.maximum)
+        self.low_table = _sparse_table(np.minimum.reduceat(fine['Low'].to_numpy(dtype=float), starts), np.minimum)
+        if 'Volume' in fine:
+            volume = np.add.reduceat(fine['Volume'].to_numpy(dtype=float), starts)
+            self.volume_sum = np.concatenate(([0.0], np.cumsum(volume)))
+
+    def __repr__(self):
+        return f"TimeframeIndex({len(self.times)} bars, {self.times[0]}..{self.times[-1]})"
+
+    def _blocks(self, times, size):
+        """[start, end) rows of each non-empty bin of `size` ns, and the bin labels"""
+        bins = (times - self.origin) // size
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        ends = np.append(starts[1:], len(times))
+        return starts, ends, self.origin + bins[starts] * size
+
+    def _fixed(self, size):
+        import pandas as pd
+        if size % self.base == 0:
+            s, e, labels = self._blocks(self.base_times, size)
+            data = {
+                'Open': self.base_open[s],
+                'High': _range_query(self.high_table, np.maximum, s, e),
+                'Low': _range_query(self.low_table, np.minimum, s, e),
+                'Close': self.base_close[e - 1],
+            }
+            if 'Volume' in self.columns:
+                data['Volume'] = self.volume_sum[e] - self.volume_sum[s]
+        else:
+            s, e, labels = self._blocks(self.times, size)
+            data = {
+                'Open': self.fine['Open'].to_numpy(dtype=float)[s],
+                'High': np.maximum.reduceat(self.fine['High'].to_numpy(dtype=float), s),
+                'Low': np.minimum.reduceat(self.fine['Low'].to_numpy(dtype=float), s),
+                'Close': self.fine['Close'].to_numpy(dtype=float)[e - 1],
+            }
+            if 'Volume' in self.columns:
+                data['Volume'] = np.add.reduceat(self.fine['Volume'].to_numpy(dtype=float), s)
+        index = pd.DatetimeIndex(labels.astype('datetime64[ns]'), name=self.fine.index.name)
+        full = pd.date_range(index[0], index[-1], freq=pd.Timedelta(size), name=self.fine.index.name)
+        bars = pd.DataFrame(data, index=index).reindex(full)
+        if 'Volume' in bars:
+            bars['Volume'] = bars['Volume'].fillna(0.0)  # resample sums empty bins to 0
+        bars.index = bars.index.as_unit(self.fine.index.unit)
+        return bars
+
+    def bars(self, timeframe, interpolate=False):
+        """
+        OHLC(V) bars of `timeframe` ('2h', '3h', '90min', '1D', ...), cached per timeframe;
+        interpolate=True fills the empty bins as the scripts do after resampling
+        """
+        import pandas as pd
+        if interpolate:
+            if (timeframe, 'interpolated') not in self.cache:
+                self.cache[timeframe, 'interpolated'] = self.bars(timeframe).interpolate()
+            return self.cache[timeframe, 'interpolated']
+        if timeframe not in self.cache:
+            offset = pd.tseries.frequencies.to_offset(timeframe)
+            if isinstance(offset, (pd.offsets.Tick, pd.offsets.Day)):
+                bars = self._fixed(pd.Timedelta(offset.nanos, 'ns').value)
+            else:
+                bars = self.fine.resample(timeframe).agg({c: AGG[c] for c in self.columns})
+            self.cache[timeframe] = bars
+        return self.cache[timeframe]
+
+
+class TimeframeEvaluator:
+    """
+    Makes `timeframe` a grid parameter for any wfo evaluator: the window's first/last
+    timestamps are re-cut from the index at that bar size (interpolated, as the scripts do
+    after resampling) before the wrapped evaluator runs. Without `timeframe` in the
+    params the window is passed through unchanged.
+    """
+
+    def __init__(self, evaluate, index, interpolate=True):
+        self.evaluate = evaluate
+        self.index = index
+        self.interpolate = interpolate
+        self.pruner = getattr(evaluate, 'pruner', None)
+
+    def fingerprint(self):
+        # the store's window keys already hash the window's bars, so the 1m span is left out
+        # and appending data keeps older windows valid
+        return (f"{self.evaluate.fingerprint()}|" + code_hash(TimeframeIndex, TimeframeEvaluator)
+                + f"|base={self.index.base}|interpolate={self.interpolate}")
+
+    def __call__(self, data, params, maximize):
+        if 'timeframe' in params:
+            params = dict(params)
+            bars = self.index.bars(params.pop('timeframe'), self.interpolate)
+            data = bars.loc[data.index[0]:data.index[-1]]
+        return self.evaluate(data, params, maximize)
@@ -0,0 +1,403 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # pure-Python loop over plain lists: slower than numba, still far from backtesting.py
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# ==========================================
+# ENGINE STATUS CODES
+# ==========================================
+OK = 0
+OUT_OF_MONEY = 1    # equity <= 0: everything closed at the bar close, simulation stopped
+INVALID_ORDER = 2   # SL/TP on the wrong side of the order price (backtesting.py raises ValueError)
+
+LONG = 1
+SHORT = -1
+
+
+@njit(cache=True)
+def _simulate(open_, high, low, close, entries, reentries, exits, sl_mult, tp_mult, size_up,
+              start, direction, cash, commission, leverage, base_size, size_step, max_size,
+              l2_low, l2_high, reentry_sl, regime_gate, fine_open, fine_high, fine_low, fine_start, fine_end):
+    """
+    Bar loop with backtesting.py 0.3.3 semantics (exclusive orders, one position at a time):
+    - orders decided on bar i fill at the open of bar i+1, the entry price carries the commission
+    - fractional sizes become int(margin * leverage * size // adjusted_price) units
+    - a pending close is filled before SL/TP; SL is checked before TP, on the entry bar too
+    - open trades are closed at the last bar's open when the data runs out
+    Strategy decisions follow the crossover family's if/elif chain: L1 entry, L2 re-entry, exit.
+    With fine bars (fine_start/fine_end = rows of each bar in fine_*), a bar that touches
+    both SL and TP is replayed minute by minute instead of assuming SL first.
+    """
+    n = len(close)
+    equity = np.full(n, cash)
+    max_trades = n + 1
+    t_entry_bar = np.empty(max_trades, np.int64)
+    t_exit_bar = np.empty(max_trades, np.int64)
+    t_size = np.empty(max_trades, np.float64)
+    t_entry_price = np.empty(max_trades, np.float64)
+    t_exit_price = np.empty(max_trades, np.float64)
+    n_trades = 0
+    status = OK
+    resolved = 0
+    intrabar = len(fine_start) > 0
+
+    pos = 0.0
+    entry_price = 0.0
+    entry_bar = 0
+    sl = math.nan
+    tp = math.nan
+
+    pend_entry = False
+    pend_close = False
+    pend_size = 0.0
+    pend_sl = math.nan
+    pend_tp = math.nan
+
+    ref_price = 0.0  # close of the last accepted L1 signal (L2 band and stops are relative to it)
+    cur_size = base_size
+    regime = False
+
+    stop = n + 1 if start < n else start  # no bar to run on: no final pass either
+    for i in range(start, stop):
+        last_pass = i == n
+        j = n - 1 if last_pass else i
+        if last_pass and pos != 0.0:
+            pend_close = True
+        o = open_[j]
+
+        # --- Broker: pending close, pending entry, then SL/TP ---
+        if pend_close:
+            pend_close = False
+            if pos != 0.0:
+                t_entry_bar[n_trades] = entry_bar
+                t_exit_bar[n_trades] = j
+                t_size[n_trades] = pos
+                t_entry_price[n_trades] = entry_price
+                t_exit_price[n_trades] = o
+                n_trades += 1
+                cash += pos * (o - entry_price)
+                pos = 0.0
+
+        if pend_entry:
+            pend_entry = False
+            adjusted = o * (1 + direction * commission)
+            units = (cash * leverage * pend_size) // adjusted
+            if units >= 1:
+                pos = direction * units
+                entry_price = adjusted
+                entry_bar = j
+                sl = pend_sl
+                tp = pend_tp
+
+        if pos != 0.0:
+            exit_price = _stop_fill(direction, o, high[j], low[j], sl, tp)
+            if (intrabar and fine_end[j] > fine_start[j] and sl == sl and tp == tp
+                    and (low[j] < sl if direction > 0 else high[j] > sl)
+                    and (high[j] > tp if direction > 0 else low[j] < tp)):
+                # Both touched: the first minute that reaches either level decides
+                resolved += 1
+                for k in range(fine_start[j], fine_end[j]):
+                    fill = _stop_fill(direction, fine_open[k], fine_high[k], fine_low[k], sl, tp)
+                    if fill == fill:
+                        exit_price = fill
+                        break
+            if exit_price == exit_price:
+                t_entry_bar[n_trades] = entry_bar
+                t_exit_bar[n_trades] = j
+                t_size[n_trades] = pos
+                t_entry_price[n_trades] = entry_price
+                t_exit_price[n_trades] = exit_price
+                n_trades += 1
+                cash += pos * (exit_price - entry_price)
+                pos = 0.0
+
+        eq = cash + pos * (close[j] - entry_price)
+        equity[j] = eq
+        if eq <= 0:
+            if pos != 0.0:
+                t_entry_bar[n_trades] = entry_bar
+                t_exit_bar[n_trades] = j
+                t_size[n_trades] = pos
+                t_entry_price[n_trades] = entry_price
+                t_exit_price[n_trades] = close[j]
+                n_trades += 1
+            for k in range(j, n):
+                equity[k] = 0.0
+            status = OUT_OF_MONEY
+            break
+        if last_pass:
+            break
+
+        # --- Strategy: decided at the close of bar i ---
+        c = close[i]
+        flat = pos == 0.0
+        order_sl = math.nan
+        order_tp = math.nan
+        place = False
+        if entries[i] and flat and not (regime_gate and regime):
+            regime = True
+            ref_price = c
+            if size_up[i]:
+                cur_size = min(max_size, cur_size + size_step)
+            else:
+                cur_size = base_size
+            order_sl = c * sl_mult[i]
+            order_tp = c * tp_mult[i]
+            place = True
+        elif (reentries[i] and flat and (regime or not regime_gate)
+              and ref_price * l2_high > c > ref_price * l2_low):
+            order_sl = ref_price * reentry_sl
+            order_tp = ref_price * tp_mult[i]
+            place = True
+        elif exits[i]:
+            regime = False
+            if not flat:
+                pend_close = True
+
+        if place:
+            adjusted = c * (1 + direction * commission)
+            lo = order_sl if direction > 0 else order_tp
+            hi = order_tp if direction > 0 else order_sl
+            if (lo == lo and not lo < adjusted) or (hi == hi and not adjusted < hi):
+                status = INVALID_ORDER
+                break
+            pend_entry = True
+            pend_size = cur_size
+            pend_sl = order_sl
+            pend_tp = order_tp
+
+    return (equity, t_entry_bar[:n_trades], t_exit_bar[:n_trades], t_size[:n_trades],
+            t_entry_price[:n_trades], t_exit_price[:n_trades], status, resolved)
+
+
+@njit(cache=True)
+def _stop_fill(direction, o, h, l, sl, tp):
+    """Fill price of the SL/TP hit on one bar (SL first, gaps fill at the open), NaN if none"""
+    if direction > 0:
+        if sl == sl and l < sl:
+            return min(o, sl)
+        if tp == tp and h > tp:
+            return max(o, tp)
+    else:
+        if sl == sl and h > sl:
+            return max(o, sl)
+        if tp == tp and l < tp:
+            return min(o, tp)
+    return math.nan
+
+
+# ==========================================
+# SIGNAL BUILDERS
+# ==========================================
+def warmup_start(*indicators):
+    """First bar the strategy runs on, the way backtesting.py skips indicator warm-up"""
+    start = 0
+    for ind in indicators:
+        start = max(start, int(np.isnan(np.asarray(ind, dtype=float)).argmin(axis=-1)))
+    return 1 + start
+
+
+def price_cross(close, line):
+    """
+    `signal = 1 if close > line else -1` on every bar (NaN counts as -1).
+    Returns (bull_cross, bear_cross, above) as evaluated in next() on bar i.
+    """
+    close = np.asarray(close, dtype=float)
+    with np.errstate(invalid="ignore"):
+        above = close > np.asarray(line, dtype=float)
+    prev = np.concatenate(([False], above[:-1]))
+    return above & ~prev, ~above & prev, above
+
+
+def slope_turn(line):
+    """
+    Momentum turns of a line: up when line[i] > line[i-1] <= line[i-2], down when
+    line[i] < line[i-1] >= line[i-2]. Comparisons with NaN are False, as in next().
+    """
+    line = np.asarray(line, dtype=float)
+    up = np.zeros(len(line), dtype=bool)
+    down = np.zeros(len(line), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        up[2:] = (line[2:] > line[1:-1]) & (line[1:-1] <= line[:-2])
+        down[2:] = (line[2:] < line[1:-1]) & (line[1:-1] >= line[:-2])
+    return up, down
+
+
+@njit(cache=True)
+def _drawdown_extremes(high, low, lookback):
+    n = len(high)
+    highest = np.empty(n)
+    lowest = np.empty(n)
+    peak = -math.inf
+    run = math.inf
+    for i in range(n):
+        if high[i] > peak:
+            # new peak: restart the running min at (peak - lookback)
+            peak = high[i]
+            run = math.inf
+            for k in range(max(0, i - lookback), i + 1):
+                run = min(run, low[k])
+        else:
+            run = min(run, low[i])
+        highest[i] = peak
+        lowest[i] = run
+    return highest, lowest
+
+
+def drawdown_extremes(high, low, lookback=3):
+    """
+    For every bar i: the highest high of high[:i+1] and the lowest low from
+    (first argmax of that high - lookback) to i. One pass instead of a rescan per signal.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    if not HAS_NUMBA:
+        high, low = high.tolist(), low.tolist()
+    return _drawdown_extremes(high, low, lookback)
+
+
+# ==========================================
+# RESULT
+# ==========================================
+class VectorResult:
+    """Equity curve and closed trades of one run, with backtesting.py-compatible stats on demand"""
+
+    def __init__(self, ohlc, equity, entry_bar, exit_bar, size, entry_price, exit_price, status, resolved=0):
+        self.ohlc = ohlc
+        self.equity = equity
+        self.entry_bar = entry_bar
+        self.exit_bar = exit_bar
+        self.size = size
+        self.entry_price = entry_price
+        self.exit_price = exit_price
+        self.status = status
+        self.resolved = resolved  # bars whose SL/TP order was settled on the fine bars
+
+    @property
+    def pnl(self):
+        return self.size * (self.exit_price - self.entry_price)
+
+    @property
+    def returns(self):
+        return np.sign(self.size) * (self.exit_price / self.entry_price - 1)
+
+    def trades(self):
+        """Trade list in the layout of backtesting.py's `stats._trades`"""
+        import pandas as pd
+        index = self.ohlc.index
+        trades = pd.DataFrame({
+            'Size': self.size.astype(int),
+            'EntryBar': self.entry_bar,
+            'ExitBar': self.exit_bar,
+            'EntryPrice': self.entry_price,
+            'ExitPrice': self.exit_price,
+            'PnL': self.pnl,
+            'ReturnPct': self.returns,
+            'EntryTime': index[self.entry_bar],
+            'ExitTime': index[self.exit_bar],
+        })
+        trades['Duration'] = trades['ExitTime'] - trades['EntryTime']
+        return trades
+
+    def stats(self):
+        """Full statistics Series, computed exactly like backtesting.py 0.3.3"""
+        from backtesting._stats import compute_stats
+        return compute_stats(trades=self.trades(), equity=self.equity, ohlc_data=self.ohlc,
+                             strategy_instance=None)
+
+
+class IntrabarData:
+    """
+    Fine (1m) bars for two-resolution runs: signals stay on the coarse bars, and only
+    coarse bars touching both SL and TP are replayed on the fine bars inside them.
+    A coarse bar labelled t covers fine bars in [t, next label), as df.resample() builds it.
+    """
+
+    def __init__(self, fine):
+        self.times = np.asarray(fine.index.asi8)
+        self.open = np.asarray(fine["Open"], dtype=float)
+        self.high = np.asarray(fine["High"], dtype=float)
+        self.low = np.asarray(fine["Low"], dtype=float)
+
+    def __repr__(self):
+        # stable across processes, so evaluator fingerprints stay valid for the result store
+        if not len(self.times):
+            return "IntrabarData(empty)"
+        return f"IntrabarData({len(self.times)} bars, {self.times[0]}..{self.times[-1]})"
+
+    def bounds(self, index):
+        """[start, end) fine rows of each coarse bar"""
+        times = np.asarray(index.asi8)
+        if len(times) == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        step = int(np.median(np.diff(times))) if len(times) > 1 else 0
+        edges = np.searchsorted(self.times, np.append(times, times[-1] + step), side="left")
+        return edges[:-1].astype(np.int64), edges[1:].astype(np.int64)
+
+
+def _as_flags(values, n):
+    if values is None:
+        return np.zeros(n, dtype=bool)
+    return np.broadcast_to(np.asarray(values, dtype=bool), (n,))
+
+
+def _as_levels(values, n):
+    if values is None:
+        return np.full(n, np.nan)
+    return np.broadcast_to(np.asarray(values, dtype=float), (n,))
+
+
+def run_backtest(ohlc, entries, exits=None, *, reentries=None, sl=None, tp=None, size=0.1,
+                 size_up=None, size_step=0.0, max_size=None, l2_band=(np.nan, np.nan),
+                 reentry_sl=np.nan, regime_gate=False, start=1, direction=LONG,
+                 cash=10_000, commission=0.0, margin=1.0, intrabar=None):
+    """
+    Simulates a crossover-family strategy from precomputed per-bar arrays.
+
+    `ohlc` is the DataFrame passed to `Backtest` (Open/High/Low/Close columns).
+    `entries`/`reentries`/`exits` are the L1, L2 and exit conditions evaluated on bar i
+    (position checks are done by the engine). `sl`/`tp` are multipliers of the L1
+    reference close (scalar or per bar, None = no order); L2 uses `reentry_sl` and `tp`
+    and only fires while `l2_band[0] < close / reference < l2_band[1]`.
+    `size` is the fraction of equity; with `size_up`, each L1 adds `size_step` (capped at
+    `max_size`) where size_up is True and resets to `size` otherwise.
+    `regime_gate` requires an exit before the next L1 and an L1 before any L2.
+    `intrabar` (an IntrabarData over the 1m bars) settles bars that touch both SL and TP
+    in the order the minutes hit them, instead of backtesting.py's SL-first guess.
+    """
+    n = len(ohlc)
+    if not 0 < size < 1 or (max_size is not None and not 0 < max_size < 1):
+        raise ValueError("size must be a fraction of equity (0 < size < 1)")
+    arrays = [np.asarray(ohlc[col], dtype=float) for col in ("Open", "High", "Low", "Close")]
+    flags = [_as_flags(entries, n), _as_flags(reentries, n), _as_flags(exits, n)]
+    levels = [_as_levels(sl, n), _as_levels(tp, n)]
+    ups = _as_flags(size_up, n)
+    if intrabar is not None:
+        fine = [intrabar.open, intrabar.high, intrabar.low, *intrabar.bounds(ohlc.index)]
+    else:
+        fine = [np.empty(0), np.empty(0), np.empty(0), np.empty(0, np.int64), np.empty(0, np.int64)]
+    if not HAS_NUMBA:
+        # Plain Python floats/bools index ~5x faster than numpy scalars in an interpreted loop
+        arrays = [a.tolist() for a in arrays]
+        flags = [f.tolist() for f in flags]
+        levels = [lv.tolist() for lv in levels]
+        ups = ups.tolist()
+        fine = [f.tolist() for f in fine]
+
+    out = _simulate(*arrays, *flags, *levels, ups, int(start), int(direction), float(cash),
+                    float(commission), 1.0 / margin, float(size), float(size_step),
+                    float(max_size if max_size is not None else size),
+                    float(l2_band[0]), float(l2_band[1]), float(reentry_sl), bool(regime_gate), *fine)
+    if out[6] == INVALID_ORDER:
+        raise ValueError("SL/TP on the wrong side of the order price")
+    return VectorResult(ohlc, *out)
@@ -0,0 +1,89 @@
+import numpy as np
+from .vector_backtest import (run_backtest, warmup_start, price_cross, slope_turn, drawdown_extremes,
+                              LONG, SHORT)
+from .strategy_helpers import macro_regime
+
+# ==========================================
+# ARRAY VERSIONS OF THE backtesters/ AND optimizers/ STRATEGIES
+# ==========================================
+# Each builder turns an OHLC frame and the strategy's class attributes into run_backtest()
+# arguments. Defaults are the optimizer classes' attributes; the backtester scripts pass theirs.
+MACRO_EVENT_DATE = '2024-04-19 00:00:00'
+
+
+def sma(close, length):
+    """Same values as pandas_ta.sma (pandas rolling mean), so crossovers match bar for bar"""
+    import pandas as pd
+    return pd.Series(np.asarray(close, dtype=float)).rolling(length, min_periods=length).mean().to_numpy()
+
+
+def macro_tp(index, base_tp, macro_boost_tp, macro_event=MACRO_EVENT_DATE):
+    """Per-bar TP multiplier: base before the macro event, boosted from it on"""
+    return np.where(macro_regime(index, macro_event), macro_boost_tp, base_tp)
+
+
+def trend(ohlc, length=10, base_tp=1.40, macro_boost_tp=1.70, sl_pct=0.97, reentry_sl=0.98,
+          l2_trigger=1.03, base_size=0.2, max_size=0.4, drawdown_limit=0.80,
+          macro_event=MACRO_EVENT_DATE, **unused):
+    """TrendBacktest / TrendOptimizer: close/SMA cross, L2 re-entry band, drawdown-scaled size"""
+    close = ohlc["Close"].to_numpy()
+    line = sma(close, length)
+    bull, bear, above = price_cross(close, line)
+    highest, lowest = drawdown_extremes(ohlc["High"].to_numpy(), ohlc["Low"].to_numpy())
+    return dict(entries=bull, reentries=above, exits=bear,
+                sl=sl_pct, tp=macro_tp(ohlc.index, base_tp, macro_boost_tp, macro_event),
+                size=base_size, size_up=highest * drawdown_limit > lowest, size_step=0.05, max_size=max_size,
+                l2_band=(l2_trigger, 1.2), reentry_sl=reentry_sl, start=warmup_start(line))
+
+
+def robespierre(ohlc, length=11, base_tp=1.50, sl_pct=0.97, reentry_sl=0.98, l2_trigger=1.035,
+                base_size=0.1, max_size=0.3, drawdown_limit=0.80, **unused):
+    """RobespierreBacktest / RobespierreOptimizer: SMA slope turns gated by the uptrend flag"""
+    line = sma(ohlc["Close"].to_numpy(), length)
+    up, down = slope_turn(line)
+    highest, lowest = drawdown_extremes(ohlc["High"].to_numpy(), ohlc["Low"].to_numpy())
+    return dict(entries=up, reentries=True, exits=down, sl=sl_pct, tp=base_tp,
+                size=base_size, size_up=highest * drawdown_limit > lowest, size_step=0.05, max_size=max_size,
+                l2_band=(l2_trigger, 1.2), reentry_sl=reentry_sl, regime_gate=True, start=warmup_start(line))
+
+
+def macro_trend(ohlc, trend_length=20, base_size=0.2, **unused):
+    """MacroTrendBacktest: long while the close is above the SMA"""
+    close = ohlc["Close"].to_numpy()
+    line = sma(close, trend_length)
+    bull, bear, _ = price_cross(close, line)
+    return dict(entries=bull, exits=bear, size=base_size, start=warmup_start(line))
+
+
+def alpha_macro(ohlc, trend_length=20, base_size=0.1, **unused):
+    """AlphaMacroBacktest: long between SMA slope turns"""
+    line = sma(ohlc["Close"].to_numpy(), trend_length)
+    up, down = slope_turn(line)
+    return dict(entries=up, exits=down, size=base_size, start=warmup_start(line))
+
+
+def joan(ohlc, trend_length=7, sl_tier1=1.02, sl_tier2=1.05, tp_base=0.90, base_size=0.3, **unused):
+    """
+    JoanBacktest: short on a bear cross, cover on a bull cross. With exclusive_orders the
+    second ladder order cancels the first, so only the tier-2 half is ever filled.
+    """
+    close = ohlc["Close"].to_numpy()
+    line = sma(close, trend_length)
+    bull, bear, _ = price_cross(close, line)
+    return dict(entries=bear, exits=bull, sl=sl_tier2, tp=tp_base, size=base_size / 2,
+                direction=SHORT, start=warmup_start(line))
+
+
+STRATEGIES = {
+    "trend": trend,
+    "robespierre": robespierre,
+    "macro_trend": macro_trend,
+    "alpha_macro": alpha_macro,
+    "joan": joan,
+}
+
+
+def run_strategy(name, ohlc, cash=100_000_000, commission=.0005, margin=1.0, intrabar=None, **params):
+    """Builds the signals of a registered strategy and simulates them (intrabar: see run_backtest)"""
+    return run_backtest(ohlc, cash=cash, commission=commission, margin=margin, intrabar=intrabar,
+                        **STRATEGIES[name](ohlc, **params))
@@ -0,0 +1,247 @@
+import os
+import itertools
+import multiprocessing
+import logging
+import numpy as np
+from .result_store import code_hash, closure_hash, data_version, params_key, metric_key
+
+# ==========================================
+# SHARED STATE FOR FORKED WORKERS
+# ==========================================
+# Set in the parent right before the pool forks: workers inherit the dataset and the
+# evaluator copy-on-write, so only (window, params) tuples and floats cross the pipe.
+_shared = {}
+
+
+class BacktestingEvaluator:
+    """Runs an existing backtesting.py Strategy class on a window (exact same numbers as bt.optimize)"""
+
+    def __init__(self, strategy, pruner=None, **bt_kwargs):
+        self.strategy = strategy
+        self.bt_kwargs = bt_kwargs
+        self.pruner = pruner
+        if pruner is not None:
+            self.checkpointed = pruner.wrap(strategy, bt_kwargs.get('cash', 10_000))
+
+    def fingerprint(self):
+        import backtesting
+        bases = [c for c in self.strategy.__mro__ if c.__module__.split('.')[0] not in ('backtesting', 'builtins')]
+        return (closure_hash(*bases) + f"|{sorted(self.bt_kwargs.items())}|backtesting {backtesting.__version__}"
+                + (f"|{self.pruner!r}" if self.pruner is not None else ""))
+
+    def __call__(self, data, params, maximize):
+        from backtesting import Backtest
+        if self.pruner is None:
+            return score(Backtest(data, self.strategy, **self.bt_kwargs).run(**params), maximize)
+
+        from .pruning import Pruned, Provisional
+        try:
+            stats = Backtest(data, self.checkpointed, **self.bt_kwargs).run(**params)
+        except Pruned as e:
+            self.pruner.record(data, np.nan, pruned_at=e.bar)
+            return np.nan if e.exact else Provisional(np.nan)
+        value = score(stats, maximize)
+        self.pruner.record(data, value, stats._strategy._returns)
+        return value
+
+
+class VectorEvaluator:
+    """Runs a genofinlib.vector_strategies strategy on a window"""
+
+    def __init__(self, name, **bt_kwargs):
+        self.name = name
+        self.bt_kwargs = bt_kwargs
+
+    def fingerprint(self):
+        from . import vector_backtest, vector_strategies, objectives
+        return f"{self.name}:" + code_hash(vector_strategies, vector_backtest, objectives) + f"|{sorted(self.bt_kwargs.items())}"
+
+    def __call__(self, data, params, maximize):
+        from .vector_strategies import run_strategy
+        from .objectives import objective
+        return objective(run_strategy(self.name, data, **self.bt_kwargs, **params), maximize)
+
+
+class PortfolioEvaluator:
+    """Runs the combined TREND/SCALP/HV book of genofinlib.portfolio_backtest on a window"""
+
+    def __init__(self, **run_kwargs):
+        self.run_kwargs = run_kwargs
+
+    def fingerprint(self):
+        from . import vector_backtest, vector_strategies, portfolio_backtest, objectives
+        return (code_hash(portfolio_backtest, vector_strategies, vector_backtest, objectives)
+                + f"|{sorted(self.run_kwargs.items())}")
+
+    def __call__(self, data, params, maximize):
+        from .portfolio_backtest import run_portfolio
+        from .objectives import objective
+        return objective(run_portfolio(data, **self.run_kwargs, **params), maximize)
+
+
+def score(stats, maximize):
+    """bt.optimize convention: NaN when the run made no trade"""
+    if not stats['# Trades']:
+        return np.nan
+    return float(maximize(stats) if callable(maximize) else stats[maximize])
+
+
+def persistable(value):
+    """Whether a score may go to the ResultStore (a projection prune's Provisional NaN may not)"""
+    from .pruning import Provisional
+    return not isinstance(value, Provisional)
+
+
+def grid_axes(grid):
+    """Parameter names and the value list of each axis (scalars become one-value axes)"""
+    if not grid:
+        raise ValueError("Need some strategy parameters to optimize")
+    return list(grid), [list(v) if isinstance(v, (list, tuple, range, np.ndarray)) else [v] for v in grid.values()]
+
+
+def param_grid(grid, constraint=None):
+    """Cartesian product of the grid in the given key order (as bt.optimize builds it)"""
+    keys, values = grid_axes(grid)
+    combos = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+    if constraint is not None:
+        combos = [p for p in combos if constraint(p)]
+    if not combos:
+        raise ValueError("No admissible parameter combinations to test")
+    return combos
+
+
+def window_bounds(index, windows):
+    """
+    [start, end] dates (or the optimizers' {'in_sample': [start, end]} dicts) to iloc
+    slices, inclusive on both ends like `df[(df.index >= start) & (df.index <= end)]`
+    """
+    bounds = []
+    for window in windows:
+        start, end = window['in_sample'] if isinstance(window, dict) else window
+        bounds.append((int(index.searchsorted(start, side='left')), int(index.searchsorted(end, side='right'))))
+    return bounds
+
+
+def _run_job(job):
+    window_idx, combo_idx = job
+    data, bounds, combos, evaluate, maximize = (_shared[k] for k in
+                                                 ("data", "bounds", "combos", "evaluate", "maximize"))
+    lo, hi = bounds[window_idx]
+    return window_idx, combo_idx, evaluate(data.iloc[lo:hi], combos[combo_idx], maximize)
+
+
+def _stream(data, bounds, combos, evaluate, maximize, processes=None, chunksize=None, jobs=None):
+    # Grid-major order interleaves windows, so one slow window never ends up on a single worker
+    if jobs is None:
+        jobs = [(w, c) for c in range(len(combos)) for w in range(len(bounds))]
+    if not jobs:
+        return
+    processes = processes or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(jobs) // (processes * 16))
+
+    _shared.update(data=data, bounds=bounds, combos=combos, evaluate=evaluate, maximize=maximize)
+    try:
+        if processes == 1:
+            yield from map(_run_job, jobs)
+            return
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            yield from pool.imap_unordered(_run_job, jobs, chunksize=chunksize)
+    finally:
+        _shared.clear()
+
+
+def iter_wfo(data, windows, evaluate, grid, maximize, constraint=None, processes=None, chunksize=None):
+    """
+    Streams (window index, params, value) as jobs finish. Every window x grid point is one
+    job on a single forked pool, handed out in small chunks so idle workers keep pulling
+    work: wall-clock follows core count, not window count.
+    """
+    combos = param_grid(grid, constraint)
+    bounds = window_bounds(data.index, windows)
+    for w, c, value in _stream(data, bounds, combos, evaluate, maximize, processes, chunksize):
+        yield w, combos[c], value
+
+
+def _window_keys(data, bounds):
+    """(data version, window label) of each window"""
+    keys = []
+    for lo, hi in bounds:
+        window = data.iloc[lo:hi]
+        keys.append((data_version(window), f"{window.index[0].isoformat()}/{window.index[-1].isoformat()}"))
+    return keys
+
+
+def _resume(store, strategy, metric, window_keys, param_keys, values):
+    """Fills `values` with the stored points and returns the jobs still to run (grid-major)"""
+    done = np.zeros(values.shape, dtype=bool)
+    for w, (version, label) in enumerate(window_keys):
+        cached = store.lookup(strategy, version, label, metric)
+        for c, key in enumerate(param_keys):
+            if key in cached:
+                values[w, c] = cached[key]
+                done[w, c] = True
+    return [(w, c) for c in range(values.shape[1]) for w in range(values.shape[0]) if not done[w, c]]
+
+
+def run_wfo(data, windows, evaluate, grid, maximize, constraint=None, processes=None, progress=True, store=None,
+            method='grid', **search_kwargs):
+    """
+    Walk-forward grid search over all windows at once. Returns one report entry per
+    window in the optimizers' layout: start_date, end_date, heatmap_is (a Series on a
+    MultiIndex of the grid parameters, like bt.optimize's), plus best_params/best_value.
+    With a ResultStore, stored points are reused and only missing ones are simulated, so an
+    interrupted run resumes and a widened grid only pays for its new points.
+    method='halving' runs genofinlib.search's successive halving instead of the full grid.
+    """
+    import pandas as pd
+    if method == 'halving':
+        from .search import run_halving
+        return run_halving(data, windows, evaluate, grid, maximize, constraint, processes, store, **search_kwargs)
+    if method != 'grid':
+        raise ValueError(f"Unknown search method: {method}")
+    combos = param_grid(grid, constraint)
+    bounds = window_bounds(data.index, windows)
+    names = list(combos[0])
+    index = pd.MultiIndex.from_tuples([tuple(p.values()) for p in combos], names=names)
+    label = maximize if isinstance(maximize, str) else None
+    values = np.full((len(bounds), len(combos)), np.nan)
+
+    jobs = None
+    if store is not None:
+        strategy, metric = evaluate.fingerprint(), metric_key(maximize)
+        window_keys = _window_keys(data, bounds)
+        param_keys = [params_key(p) for p in combos]
+        jobs = _resume(store, strategy, metric, window_keys, param_keys, values)
+        logging.info(f"Result store: {values.size - len(jobs)}/{values.size} points reused, {len(jobs)} to run")
+
+    results = _stream(data, bounds, combos, evaluate, maximize, processes, jobs=jobs)
+    if progress:
+        try:
+            from tqdm import tqdm
+            results = tqdm(results, total=values.size if jobs is None else len(jobs))
+        except ImportError:
+            pass
+    try:
+        for w, c, value in results:
+            values[w, c] = value
+            if store is not None and persistable(value):
+                store.put(strategy, *window_keys[w], param_keys[c], metric, value)
+    finally:
+        if store is not None:
+            store.flush()
+    if getattr(evaluate, 'pruner', None) is not None:
+        logging.info(evaluate.pruner.summary())
+    return [window_report(data, lo, hi, pd.Series(row, index=index, name=label), names)
+            for (lo, hi), row in zip(bounds, values)]
+
+
+def window_report(data, lo, hi, heatmap, names):
+    """One report entry in the optimizers' layout"""
+    best = heatmap.idxmax() if heatmap.notna().any() else None
+    return {
+        'start_date': data.index[lo],
+        'end_date': data.index[hi - 1],
+        'heatmap_is': heatmap,
+        'best_params': dict(zip(names, best if isinstance(best, tuple) else (best,))) if best is not None else None,
+        'best_value': heatmap.max(),
+    }
@@ -7,27 +7,49 @@ import websocket
 import threading
 from urllib.parse import urlencode
 from .slack_bot import StrategyState, error_message, info_message
+from .rate_limiter import get_governor
+from .time_sync import RECV_WINDOW
+
+ORDER_METHODS = ("order.place", "order.cancel", "order.modify", "algoOrder.place", "algoOrder.cancel")
 
 class WebSocketApiManager:
-    def __init__(self, api_key, api_secret, ws_url, is_testnet):
+    def __init__(self, ctx):
+        self.ctx = ctx
         self.ws = None
         self.is_connected = False
+        self.ready = threading.Event()  # set while the socket is open, so callers wait instead of sleeping
         self.id_counter = 1
-        self.api_key = api_key
-        self.api_secret = api_secret
-        self.ws_url = ws_url
-        self.is_testnet = is_testnet
+        self.api_key = ctx.api_key
+        self.api_secret = ctx.api_secret
+        self.ws_url = ctx.ws_api_url
+        self.is_testnet = ctx.is_testnet
+        self.governor = get_governor("binance")
+        self.clock = ctx.clock("binance")
+        self.pending = {}  # req_id -> callback(response), fired from the WS thread on ack/error
+        self.pending_lock = threading.Lock()
 
     def on_open(self, ws):
-        net_type = 'TESTNET' if self.is_testnet else 'MAINNET'
-        logging.info(f"Trading Websocket Connected ({net_type})")
-        info_message(f"Trading Websocket Connected ({net_type})", StrategyState.VK)
+        logging.info(f"Trading Websocket Connected ({self.ctx.net_type})")
+        info_message(f"Trading Websocket Connected ({self.ctx.net_type})", StrategyState.VK)
         self.is_connected = True
+        self.ready.set()
 
     def on_close(self, ws, close_status_code, close_msg):
         logging.warning(f"Trading WS Disconnected: {close_msg}")
         info_message(f"Trading Websocket Disconnected {close_msg}", StrategyState.VK)
         self.is_connected = False
+        self.ready.clear()
+        self._fail_pending("socket closed")
+
+    def _fail_pending(self, reason):
+        """Answers every request still waiting for an ack: it will never come on a new socket"""
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            try:
+                callback({"error": {"msg": reason}})
+            except Exception as e:
+                logging.error(f"WS Callback Error: {e}")
 
     def on_error(self, ws, error):
         logging.error(f"Trading WS Error: {error}")
@@ -36,6 +58,20 @@ class WebSocketApiManager:
     def on_message(self, ws, message):
         try:
             data = json.loads(message)
+            self.governor.update_from_ws(data.get('rateLimits'))
+            if data.get('status') in (418, 429):
+                # retryAfter is the epoch (ms) at which the ban is lifted
+                retry_at = (data.get('error', {}).get('data') or {}).get('retryAfter')
+                self.governor.penalize(max(1.0, retry_at / 1000 - time.time()) if retry_at else None)
+
+            with self.pending_lock:
+                callback = self.pending.pop(data.get('id'), None)
+            if callback:
+                try:
+                    callback(data)
+                except Exception as e:
+                    logging.error(f"WS Callback Error: {e}")
+
             if 'error' in data:
                 err = data['error']
                 if err.get('code') == -2011: return
@@ -64,26 +100,42 @@ class WebSocketApiManager:
                     error_message(f"Trading WS Reconnect Error: {e}", StrategyState.VK)
                     time.sleep(5)
         threading.Thread(target=run, daemon=True).start()
-        time.sleep(2)
+        return self
+
+    def wait_ready(self, timeout=10):
+        """Blocks until the socket is open (or `timeout`). Returns whether it is."""
+        if not self.ready.wait(timeout):
+            logging.warning(f"Trading WS not connected after {timeout}s")
+            return False
+        return True
 
-    def send_request(self, method, params=None):
+    def send_request(self, method, params=None, callback=None):
+        """Fire-and-forget signed request. Returns the request id, `callback` gets the response."""
         if not self.is_connected: return
         if params is None: params = {}
+        self.governor.acquire(1, method in ORDER_METHODS)
 
         clean_params = {k: ('true' if v is True else 'false' if v is False else v) for k, v in params.items()}
         clean_params['apiKey'] = self.api_key
-        clean_params['timestamp'] = int(time.time() * 1000)
+        clean_params['timestamp'] = self.clock.now_ms()
+        clean_params['recvWindow'] = RECV_WINDOW
 
         query_string = urlencode(sorted(clean_params.items()))
         signature = hmac.new(self.api_secret.encode('utf-8'), query_string.encode('utf-8'), hashlib.sha256).hexdigest()
         clean_params['signature'] = signature
 
-        req_id = f"req_{self.id_counter}"
-        self.id_counter += 1
+        with self.pending_lock:
+            req_id = f"req_{self.id_counter}"
+            self.id_counter += 1
+            if callback:
+                self.pending[req_id] = callback
 
         try:
             self.ws.send(json.dumps({"id": req_id, "method": method, "params": clean_params}))
             logging.info(f"WS SENT: {method} | ID: {req_id}")
+            return req_id
         except Exception as e:
+            with self.pending_lock:
+                self.pending.pop(req_id, None)
             logging.error(f"WS Send Failed: {e}")
             error_message(f"WS Send Failed: {e}", StrategyState.VK)
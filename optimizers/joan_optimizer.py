@@ -1,9 +1,15 @@
 import pandas as pd
 import warnings
 warnings.simplefilter(action="ignore", category=FutureWarning )
-from backtesting import Backtest, Strategy
+from backtesting import Strategy
 import numpy as np
-from tqdm import tqdm
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.wfo import run_wfo, BacktestingEvaluator
+from genofinlib.result_store import ResultStore
+from genofinlib.timeframes import TimeframeIndex, TimeframeEvaluator
+from genofinlib.strategy_helpers import bounded_history
 import pandas_ta as ta
 import multiprocessing
 multiprocessing.set_start_method('fork')
@@ -15,9 +21,11 @@ multiprocessing.set_start_method('fork')
 CYCLE_START = '2015-01-01 00:00:00'
 CYCLE_END = '2023-10-31 00:00:00'
 
-df = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
-df = df.resample('4H').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+df_1m = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
+df = df_1m.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
 df = df.interpolate().loc[CYCLE_START:CYCLE_END]
+# Any other bar size for the `timeframe` grid parameter is cut from the 1m data on demand
+timeframes = TimeframeIndex(df_1m)
 
 def generic_trend_indicator(close, length):
     """
@@ -37,7 +45,7 @@ class JoanOptimizer(Strategy):
 
     def init(self):
         self.trend_line = self.I(generic_trend_indicator, close=self.data.Close, length=self.trend_length)
-        self.entry_prices = [1]
+        self.entry_prices = bounded_history(1)
 
     def next(self):
         signal = self.trend_line
@@ -80,26 +88,18 @@ iterations = [
     {'in_sample': [datetime(2022, 4, 10), datetime(2022, 11, 10)]}
 ]
 
-report = []
-
-# Iterative Walk-Forward Grid Search
-for iter in tqdm(iterations):
-    df_is = df[(df.index >= iter['in_sample'][0]) & (df.index <= iter['in_sample'][1])]
-    bt_is = Backtest(df_is, JoanOptimizer, cash=100_000_000, commission=.0005, exclusive_orders=True, margin=1/10)
-    stats_is, heatmap = bt_is.optimize(
+# Walk-Forward Grid Search: every window x grid point on one shared process pool
+report = run_wfo(
+    df, iterations,
+    evaluate=TimeframeEvaluator(BacktestingEvaluator(JoanOptimizer, cash=100_000_000, commission=.0005, exclusive_orders=True, margin=1/10), timeframes),
+    grid=dict(
         # [SANITIZED] Parameter search grids commented out to protect edge.
+        # timeframe=['2h', '3h', '4h', '6h', '8h'],
         # sls1=np.arange(1.040, 1.050, 0.002).tolist(),
         # tps1=np.arange(0.875, 0.876, 0.005).tolist(),
-        
-        maximize='Expectancy [%]',
-        method='grid',
-        return_heatmap=True)
-        
-    report.append({
-        'start_date': stats_is['Start'],
-        'end_date': stats_is['End'],
-        'heatmap_is': heatmap
-    })
+    ),
+    maximize='Expectancy [%]',
+    store=ResultStore())
 
 import matplotlib.pyplot as plt
 import math
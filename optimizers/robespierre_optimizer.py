@@ -1,9 +1,15 @@
 import pandas as pd
 import warnings
 warnings.simplefilter(action="ignore", category=FutureWarning )
-from backtesting import Backtest, Strategy
+from backtesting import Strategy
 import numpy as np
-from tqdm import tqdm
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.wfo import run_wfo, BacktestingEvaluator
+from genofinlib.result_store import ResultStore
+from genofinlib.timeframes import TimeframeIndex, TimeframeEvaluator
+from genofinlib.strategy_helpers import bounded_history
 import pandas_ta as ta
 import multiprocessing
 import math
@@ -17,9 +23,11 @@ multiprocessing.set_start_method('fork')
 CYCLE_START = '2019-04-02 00:00:00'
 CYCLE_END = '2025-10-16 21:00:00'
 
-df = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
-df = df.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+df_1m = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
+df = df_1m.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
 df = df.interpolate()
+# Any other bar size for the `timeframe` grid parameter is cut from the 1m data on demand
+timeframes = TimeframeIndex(df_1m)
 df = df.loc[CYCLE_START:CYCLE_END]
 
 def generic_trend_indicator(close, length):
@@ -41,7 +49,7 @@ class RobespierreOptimizer(Strategy):
         self.trend_line = self.I(generic_trend_indicator, close=self.data.Close, length=self.length)
         self.buy_signal = False
         self.sell_signal = False
-        self.equity_curve = [self.equity]
+        self.equity_curve = bounded_history(self.equity)
         self.current_size = self.base_size
 
     def next(self):
@@ -97,28 +105,18 @@ iterations = [
     {'in_sample': [datetime(2024, 8, 13), datetime(2025, 4, 2)]}
 ]
 
-report = []
-
-# Iterative Walk-Forward Grid Search
-for iter in tqdm(iterations):
-    df_is = df[(df.index >= iter['in_sample'][0]) & (df.index <= iter['in_sample'][1])]
-    bt_is = Backtest(df_is, RobespierreOptimizer, cash=100_000_000, commission=.003, exclusive_orders=True, margin=1/10)
-    
-    stats_is, heatmap = bt_is.optimize(
+# Walk-Forward Grid Search: every window x grid point on one shared process pool
+report = run_wfo(
+    df, iterations,
+    evaluate=TimeframeEvaluator(BacktestingEvaluator(RobespierreOptimizer, cash=100_000_000, commission=.003, exclusive_orders=True, margin=1/10), timeframes),
+    grid=dict(
         # [SANITIZED] Proprietary parameter search grids commented out to protect edge.
+        # timeframe=['2h', '3h', '4h', '6h', '8h'],
         # sl_pct=np.arange(0.94, 0.95, 0.002).tolist(),
         # base_tp=np.arange(1.50, 1.60, 0.01).tolist(),
-        
-        maximize='Expectancy [%]',
-        method='grid',
-        random_state=0,
-        return_heatmap=True)
-        
-    report.append({
-        'start_date': stats_is['Start'],
-        'end_date': stats_is['End'],
-        'heatmap_is': heatmap
-    })
+    ),
+    maximize='Expectancy [%]',
+    store=ResultStore())
 
 import matplotlib.pyplot as plt
 import math
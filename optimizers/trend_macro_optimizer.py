@@ -1,9 +1,14 @@
 import pandas as pd
 import warnings
 warnings.simplefilter(action="ignore", category=FutureWarning )
-from backtesting import Backtest, Strategy
+from backtesting import Strategy
 import numpy as np
-from tqdm import tqdm
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.wfo import run_wfo, BacktestingEvaluator
+from genofinlib.result_store import ResultStore
+from genofinlib.timeframes import TimeframeIndex, TimeframeEvaluator
 import pandas_ta as ta
 import multiprocessing
 from datetime import datetime
@@ -16,10 +21,12 @@ multiprocessing.set_start_method('fork')
 MACRO_START = '2015-07-10 00:00:00'
 MACRO_END = '2024-12-21 00:00:00'
 
-df = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
+df_1m = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
 # Resampling to a high timeframe (1W) for macro trend optimization
-df = df.resample('1W').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+df = df_1m.resample('1W').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
 df = df.interpolate()
+# Any other bar size for the `timeframe` grid parameter is cut from the 1m data on demand
+timeframes = TimeframeIndex(df_1m)
 df = df.loc[MACRO_START:MACRO_END]
 
 def generic_macro_trend(close, length):
@@ -65,27 +72,18 @@ iterations = [
     {'in_sample': [datetime(2015, 7, 10), datetime(2024, 12, 20)]}
 ]
 
-report = []
-
-# Iterative Grid Search
-for iter in tqdm(iterations):
-    df_is = df[(df.index >= iter['in_sample'][0]) & (df.index <= iter['in_sample'][1])]
-    bt_is = Backtest(df_is, MacroTrendOptimizer, cash=100_000_000, commission=.003, exclusive_orders=True, margin=1/10)
-    
-    stats_is, heatmap = bt_is.optimize(
+# Walk-Forward Grid Search: every window x grid point on one shared process pool
+report = run_wfo(
+    df, iterations,
+    evaluate=TimeframeEvaluator(BacktestingEvaluator(MacroTrendOptimizer, cash=100_000_000, commission=.003, exclusive_orders=True, margin=1/10), timeframes),
+    grid=dict(
         # [SANITIZED] Parameter search grids commented out to protect macro edge.
+        # timeframe=['3D', '5D', '1W'],
         # length=range(2, 4),
         # multiplier=np.arange(2.00, 2.6, 0.02).tolist(),
-        
-        maximize='Expectancy [%]',
-        method='grid',
-        return_heatmap=True)
-        
-    report.append({
-        'start_date': stats_is['Start'],
-        'end_date': stats_is['End'],
-        'heatmap_is': heatmap
-    })
+    ),
+    maximize='Expectancy [%]',
+    store=ResultStore())
 
 import matplotlib.pyplot as plt
 import math
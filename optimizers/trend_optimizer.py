@@ -1,9 +1,15 @@
 import pandas as pd
 import warnings
 warnings.simplefilter(action="ignore", category=FutureWarning )
-from backtesting import Backtest, Strategy
+from backtesting import Strategy
 import numpy as np
-from tqdm import tqdm
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib.wfo import run_wfo, BacktestingEvaluator
+from genofinlib.result_store import ResultStore
+from genofinlib.timeframes import TimeframeIndex, TimeframeEvaluator
+from genofinlib.strategy_helpers import DrawdownTracker, macro_regime, bounded_history
 import pandas_ta as ta
 import multiprocessing
 from datetime import datetime
@@ -17,9 +23,11 @@ CYCLE_START = '2019-04-02 00:00:00'
 CYCLE_END = '2024-12-16 21:00:00'
 MACRO_EVENT_DATE = '2024-04-19 00:00:00'
 
-df = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
-df = df.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+df_1m = pd.read_csv('../data/btc_usdt_1m.csv', index_col='Time', parse_dates=True)
+df = df_1m.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
 df = df.interpolate()
+# Any other bar size for the `timeframe` grid parameter is cut from the 1m data on demand
+timeframes = TimeframeIndex(df_1m)
 df = df.loc[CYCLE_START:CYCLE_END]
 
 def generic_trend_indicator(close, length):
@@ -46,32 +54,23 @@ class TrendOptimizer(Strategy):
 
     def init(self):
         self.trend_line = self.I(generic_trend_indicator, close=self.data.Close, length=self.length)
-        self.equity_curve = [self.equity]
-        self.entry_prices = [1]
+        self.equity_curve = bounded_history(self.equity)
+        self.entry_prices = bounded_history(1)
         self.current_size = self.base_size
+        self.drawdown = DrawdownTracker()
+        self.macro_on = macro_regime(self.data.index, MACRO_EVENT_DATE)
 
     def next(self):
         current_price = self.data.Close[-1]
         signal = self.trend_line
+        highest_high, lowest_low = self.drawdown.update(self.data.High, self.data.Low)
+        active_tp = self.macro_boost_tp if self.macro_on[len(self.data) - 1] else self.base_tp
         
         signal_cur = 1 if current_price > signal[-1] else -1
         signal_prev = 1 if self.data.Close[-2] > signal[-2] else -1
 
         # --- L1 ENTRY ---
         if signal_cur > 0 > signal_prev and not self.position.is_long:
-            high_series = pd.Series(self.data.High)
-            low_series = pd.Series(self.data.Low)
-            
-            highest_high = high_series.max()
-            highest_index = high_series.idxmax()
-            slice_start = max(0, highest_index - 3)
-            lowest_low = low_series.iloc[slice_start:].min()
-            
-            current_time = pd.Timestamp(str(self.data.index[-1]))
-            macro_event = pd.Timestamp(MACRO_EVENT_DATE)
-            
-            active_tp = self.base_tp if macro_event > current_time else self.macro_boost_tp
-            
             self.entry_prices.append(current_price)
             self.equity_curve.append(self.equity)
             
@@ -85,11 +84,6 @@ class TrendOptimizer(Strategy):
 
         # --- L2 RE-ENTRY ---
         elif signal_cur > 0 and self.entry_prices[-1] * 1.2 > current_price > self.entry_prices[-1] * self.l2_trigger and not self.position.is_long:
-            current_time = pd.Timestamp(str(self.data.index[-1]))
-            macro_event = pd.Timestamp(MACRO_EVENT_DATE)
-            
-            active_tp = self.base_tp if macro_event > current_time else self.macro_boost_tp
-            
             self.buy(sl=self.entry_prices[-1] * self.reentry_sl, tp=self.entry_prices[-1] * active_tp, size=self.current_size)
 
         # --- BEAR EXIT ---
@@ -117,31 +111,21 @@ iterations = [
     {'in_sample': [datetime(2024, 8, 13), datetime(2025, 4, 2)]}
 ]
 
-report = []
-
-# Iterative Walk-Forward Grid Search
-for iter in tqdm(iterations):
-    df_is = df[(df.index >= iter['in_sample'][0]) & (df.index <= iter['in_sample'][1])]
-    bt_is = Backtest(df_is, TrendOptimizer, cash=100_000_000, commission=.0005, exclusive_orders=True)
-    
-    stats_is, heatmap = bt_is.optimize(
+# Walk-Forward Grid Search: every window x grid point on one shared process pool
+report = run_wfo(
+    df, iterations,
+    evaluate=TimeframeEvaluator(BacktestingEvaluator(TrendOptimizer, cash=100_000_000, commission=.0005, exclusive_orders=True), timeframes),
+    grid=dict(
         # [SANITIZED] Proprietary parameter search grids commented out to protect edge.
+        # timeframe=['2h', '3h', '4h', '6h', '8h'],
         # length=range(10, 15),
         # sl_pct=np.arange(0.95, 0.99, 0.01).tolist(),
-        
+
         profit_threshold=np.arange(0.1, 0.3, 0.01).tolist(),
         drawdown_limit=np.arange(0.65, 0.90, 0.01).tolist(),
-        
-        maximize='Return [%]',
-        method='grid',
-        random_state=0,
-        return_heatmap=True)
-        
-    report.append({
-        'start_date': stats_is['Start'],
-        'end_date': stats_is['End'],
-        'heatmap_is': heatmap
-    })
+    ),
+    maximize='Return [%]',
+    store=ResultStore())
 
 import matplotlib.pyplot as plt
 import math
@@ -0,0 +1,42 @@
+import unittest
+from genofinlib.slack_bot import SlackNotifier, StrategyState, MAX_QUEUE
+
+
+def titles(notifier):
+    return [n.title.split("]")[0][1:] for n in notifier.queue]
+
+
+class QueueBackpressureTest(unittest.TestCase):
+    def fill(self, notifier, msg_type, count, start=0):
+        for i in range(start, start + count):
+            notifier.send(f"{msg_type} {i}", StrategyState.VK, msg_type)
+
+    def test_info_goes_first_then_error(self):
+        notifier = SlackNotifier()
+        self.fill(notifier, "ERROR", MAX_QUEUE // 2)
+        self.fill(notifier, "INFO", MAX_QUEUE - MAX_QUEUE // 2)
+        notifier.send("trade", StrategyState.VK, "TRADE")
+        self.assertEqual(len(notifier.queue), MAX_QUEUE)
+        self.assertEqual(titles(notifier).count("INFO"), MAX_QUEUE - MAX_QUEUE // 2 - 1)
+        self.assertEqual(notifier.queue[-1].text, "trade")
+
+    def test_info_is_refused_when_only_more_important_messages_are_queued(self):
+        notifier = SlackNotifier()
+        self.fill(notifier, "ERROR", MAX_QUEUE)
+        notifier.send("late info", StrategyState.VK, "INFO")
+        self.assertEqual(set(titles(notifier)), {"ERROR"})
+        self.assertEqual(notifier.dropped, 1)
+
+    def test_trade_is_never_evicted_nor_refused(self):
+        notifier = SlackNotifier()
+        self.fill(notifier, "TRADE", MAX_QUEUE)
+        self.fill(notifier, "TRADE", 5, start=MAX_QUEUE)
+        self.fill(notifier, "ERROR", 3)
+        self.assertEqual(len(notifier.queue), MAX_QUEUE + 5)
+        self.assertEqual(set(titles(notifier)), {"TRADE"})
+        self.assertEqual(notifier.queue[0].text, "TRADE 0")
+        self.assertEqual(notifier.dropped, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+import unittest
+from unittest import mock
+from genofinlib import slave_ws, slave_manager
+from genofinlib.slave_ws import OkxWsTransport, BitmexWsTransport
+from tests.ws_standin import StandInServer
+
+OKX_INST = "BTC-USDT-SWAP"
+BITMEX_SYMBOL = "XBTUSDT"
+
+
+class FixedClock:
+    def now(self):
+        return 1_700_000_000.0
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.01)
+
+
+class OkxVenue:
+    """Answers like OKX's private endpoint: login, positions subscription, op=order"""
+
+    def __init__(self):
+        self.login_code = "0"
+        self.snapshot = [{"instId": OKX_INST, "pos": "3"}]
+        self.order_reply = self.accept
+        self.held = []
+
+    def accept(self, conn, msg):
+        sz = msg["args"][0]["sz"]
+        conn.send({"id": msg["id"], "op": "order", "code": "0", "msg": "",
+                   "data": [{"ordId": f"ord-{sz}", "sCode": "0", "sMsg": ""}]})
+
+    def __call__(self, conn, text):
+        if text == "ping":
+            conn.send("pong")
+            return
+        msg = json.loads(text)
+        if msg["op"] == "login":
+            conn.send({"event": "login", "code": self.login_code, "msg": ""})
+        elif msg["op"] == "subscribe":
+            conn.send({"event": "subscribe", "arg": msg["args"][0]})
+            conn.send({"arg": msg["args"][0], "data": self.snapshot})
+        elif msg["op"] == "order":
+            self.order_reply(conn, msg)
+
+
+class BitmexVenue:
+    """Answers like BitMEX's realtime endpoint: authKeyExpires, then the position table"""
+
+    def __call__(self, conn, text):
+        if text == "ping":
+            conn.send("pong")
+            return
+        msg = json.loads(text)
+        if msg["op"] == "authKeyExpires":
+            conn.send({"success": True, "request": msg})
+        elif msg["op"] == "subscribe":
+            conn.send({"success": True, "subscribe": "position", "request": msg})
+            conn.send({"table": "position", "action": "partial",
+                       "data": [{"symbol": BITMEX_SYMBOL, "currentQty": 100, "avgEntryPrice": 60000}]})
+
+
+class StandInTestCase(unittest.TestCase):
+    def setUp(self):
+        self.saved = slave_ws.RECONNECT_DELAY, slave_ws.HEARTBEAT_INTERVAL
+        slave_ws.RECONNECT_DELAY = 0.05
+        slave_ws.HEARTBEAT_INTERVAL = 0.3
+        self.transports = []
+
+    def tearDown(self):
+        for transport in self.transports:
+            transport.close()
+        self.server.close()
+        slave_ws.RECONNECT_DELAY, slave_ws.HEARTBEAT_INTERVAL = self.saved
+
+    def start(self, transport):
+        transport.url = self.server.url
+        self.transports.append(transport.connect())
+        return transport
+
+
+class OkxWsTransportTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.venue = OkxVenue()
+        self.server = StandInServer(self.venue)
+        self.transport = self.start(OkxWsTransport("key", "secret", "pass", FixedClock(), inst_ids=[OKX_INST]))
+
+    def test_login_is_signed_and_subscribes_positions(self):
+        self.assertTrue(self.transport.ready.wait(5))
+        login = self.server.messages(lambda m: m["op"] == "login")[0]["args"][0]
+        expected = base64.b64encode(hmac.new(b"secret", b"1700000000GET/users/self/verify",
+                                             hashlib.sha256).digest()).decode()
+        self.assertEqual((login["apiKey"], login["passphrase"], login["timestamp"], login["sign"]),
+                         ("key", "pass", "1700000000", expected))
+        self.server.wait_for(lambda received: any('"subscribe"' in m for m in received))
+        subscribe = self.server.messages(lambda m: m["op"] == "subscribe")[0]
+        self.assertEqual(subscribe["args"], [{"channel": "positions", "instType": "SWAP", "instId": OKX_INST}])
+
+    def test_ping_is_answered_by_pong(self):
+        self.assertTrue(self.transport.ready.wait(5))
+        self.server.wait_for(lambda received: "ping" in received)
+        pinged_at = time.monotonic()
+        wait_until(lambda: self.transport.last_recv >= pinged_at)
+
+    def test_order_ack(self):
+        self.assertTrue(self.transport.ready.wait(5))
+        res = self.transport.create_market_order(OKX_INST, "buy", 2, reduceOnly=True)
+        self.assertEqual(res["data"][0]["ordId"], "ord-2")
+        sent = self.server.messages(lambda m: m["op"] == "order")[0]
+        self.assertEqual(sent["args"], [{"instId": OKX_INST, "tdMode": "cross", "side": "buy",
+                                         "ordType": "market", "sz": "2", "reduceOnly": True}])
+
+    def test_replies_are_matched_by_id_not_arrival_order(self):
+        def reply_reversed(conn, msg):
+            self.venue.held.append(msg)
+            if len(self.venue.held) == 2:
+                for held in reversed(self.venue.held):
+                    self.venue.accept(conn, held)
+
+        self.venue.order_reply = reply_reversed
+        self.assertTrue(self.transport.ready.wait(5))
+        results = {}
+        threads = [threading.Thread(target=lambda sz=sz: results.update(
+            {sz: self.transport.create_market_order(OKX_INST, "buy", sz)})) for sz in (1, 7)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertEqual({sz: res["data"][0]["ordId"] for sz, res in results.items()}, {1: "ord-1", 7: "ord-7"})
+
+    def test_request_error_codes_raise(self):
+        self.assertTrue(self.transport.ready.wait(5))
+        self.venue.order_reply = lambda conn, msg: conn.send(
+            {"id": msg["id"], "op": "order", "code": "1", "msg": "All operations failed",
+             "data": [{"sCode": "51008", "sMsg": "Insufficient balance"}]})
+        with self.assertRaisesRegex(Exception, "51008"):
+            self.transport.create_market_order(OKX_INST, "buy", 1)
+
+        self.venue.order_reply = lambda conn, msg: conn.send(
+            {"id": msg["id"], "op": "order", "code": "0", "data": [{"sCode": "51121", "sMsg": "Lot size"}]})
+        with self.assertRaisesRegex(Exception, "51121"):
+            self.transport.create_market_order(OKX_INST, "buy", 1)
+
+    def test_unanswered_request_times_out(self):
+        self.venue.order_reply = lambda conn, msg: None
+        self.assertTrue(self.transport.ready.wait(5))
+        with self.assertRaises(TimeoutError):
+            self.transport.request({"op": "order", "args": [{"sz": "1"}]}, timeout=0.2)
+        self.assertEqual(self.transport.pending, {})
+
+    def test_position_snapshots(self):
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        self.assertEqual(self.transport.get_positions(OKX_INST), [{"instId": OKX_INST, "pos": "3"}])
+        conn = self.server.wait_connections(1)
+        conn.send({"arg": {"channel": "positions", "instType": "SWAP", "instId": OKX_INST},
+                   "data": [{"instId": OKX_INST, "pos": "0"}]})
+        wait_until(lambda: self.transport.get_positions(OKX_INST)[0]["pos"] == "0")
+        self.assertEqual(self.transport.get_positions("ETH-USDT-SWAP"), [])
+
+    def test_disconnect_fails_pending_then_reconnects_and_resyncs(self):
+        self.venue.order_reply = lambda conn, msg: conn.drop()
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        with self.assertRaisesRegex(Exception, "socket closed"):
+            self.transport.create_market_order(OKX_INST, "buy", 1)
+
+        self.venue.order_reply = self.venue.accept
+        self.venue.snapshot = [{"instId": OKX_INST, "pos": "5"}]
+        self.server.wait_connections(2)
+        self.assertTrue(self.transport.ready.wait(5))
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        self.assertEqual(self.transport.get_positions(OKX_INST)[0]["pos"], "5")
+        self.assertEqual(len(self.server.messages(lambda m: m["op"] == "login")), 2)
+        self.assertEqual(self.transport.create_market_order(OKX_INST, "buy", 3)["data"][0]["ordId"], "ord-3")
+
+
+class OkxRejectedLoginTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        venue = OkxVenue()
+        venue.login_code = "60009"
+        self.server = StandInServer(venue)
+        self.transport = self.start(OkxWsTransport("key", "bad", "pass", FixedClock(), inst_ids=[OKX_INST]))
+
+    def test_rejected_login_stays_not_ready(self):
+        self.server.wait_for(lambda received: any('"login"' in m for m in received))
+        self.assertFalse(self.transport.ready.wait(0.3))
+        self.assertEqual(self.server.messages(lambda m: m["op"] == "subscribe"), [])
+        with self.assertRaises(ConnectionError):
+            self.transport.create_market_order(OKX_INST, "buy", 1)
+
+
+class BitmexWsTransportTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = StandInServer(BitmexVenue())
+        self.transport = self.start(BitmexWsTransport("key", "secret", FixedClock()))
+
+    def test_auth_is_signed_and_subscribes_position(self):
+        self.assertTrue(self.transport.ready.wait(5))
+        auth = self.server.messages(lambda m: m["op"] == "authKeyExpires")[0]["args"]
+        expected = hmac.new(b"secret", b"GET/realtime1700000005", hashlib.sha256).hexdigest()
+        self.assertEqual(auth, ["key", 1700000005, expected])
+        self.server.wait_for(lambda received: any('"subscribe"' in m for m in received))
+
+    def test_partial_snapshot_then_updates_merge(self):
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        self.assertEqual(self.transport.get_positions(BITMEX_SYMBOL)[0]["currentQty"], 100)
+        conn = self.server.wait_connections(1)
+        conn.send({"table": "position", "action": "update", "data": [{"symbol": BITMEX_SYMBOL, "currentQty": 0}]})
+        wait_until(lambda: self.transport.get_positions(BITMEX_SYMBOL)[0]["currentQty"] == 0)
+        self.assertEqual(self.transport.get_positions(BITMEX_SYMBOL)[0]["avgEntryPrice"], 60000)
+
+    def test_disconnect_clears_positions_until_the_next_partial(self):
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        self.server.wait_connections(1).drop()
+        wait_until(lambda: not self.transport.positions_synced.is_set() or len(self.server.connections) > 1)
+        self.server.wait_connections(2)
+        self.assertTrue(self.transport.positions_synced.wait(5))
+        self.assertEqual(self.transport.get_positions(BITMEX_SYMBOL)[0]["currentQty"], 100)
+
+
+class OkxClientWsOrderTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = StandInServer(OkxVenue())
+
+    def test_ws_orders_are_counted_by_the_governor(self):
+        calls = []
+        governor = mock.Mock()
+        with mock.patch.object(slave_manager, "get_clock", return_value=FixedClock()), \
+                mock.patch.object(slave_manager, "get_governor", return_value=governor):
+            client = slave_manager.OkxClient("key", "secret", "pass")
+        transport = self.start(OkxWsTransport("key", "secret", "pass", FixedClock(), inst_ids=[OKX_INST]))
+        client.attach_ws(transport)
+        self.assertTrue(transport.ready.wait(5))
+        governor.acquire.side_effect = lambda weight, is_order: calls.append(
+            ("acquire", weight, is_order, len(self.server.messages(lambda m: m["op"] == "order"))))
+
+        client.create_market_order(OKX_INST, "buy", 2)
+        self.assertEqual(calls, [("acquire", 1, True, 0)])  # budget taken before the frame went out
+        self.assertEqual(len(self.server.messages(lambda m: m["op"] == "order")), 1)
+
+    def test_close_reads_rest_while_the_fill_push_is_in_flight(self):
+        with mock.patch.object(slave_manager, "get_clock", return_value=FixedClock()), \
+                mock.patch.object(slave_manager, "get_governor", return_value=mock.Mock()):
+            client = slave_manager.OkxClient("key", "secret", "pass")
+        transport = self.start(OkxWsTransport("key", "secret", "pass", FixedClock(), inst_ids=[OKX_INST]))
+        client.attach_ws(transport)
+        self.assertTrue(transport.positions_synced.wait(5))
+        self.server.wait_connections(1).send({"arg": {"channel": "positions", "instType": "SWAP", "instId": OKX_INST},
+                                              "data": [{"instId": OKX_INST, "pos": "0"}]})
+        wait_until(lambda: transport.get_positions(OKX_INST)[0]["pos"] == "0")  # push of the open not seen yet
+        slave = slave_manager.OkxSlave("okx", client, "BTC")
+        with mock.patch.object(client, "_request", return_value={"data": [{"instId": OKX_INST, "pos": "2"}]}) as rest:
+            self.assertEqual(slave.close_long(), 2.0)
+        rest.assert_called_once_with("GET", f"/api/v5/account/positions?instId={OKX_INST}")
+        sent = self.server.messages(lambda m: m["op"] == "order")[0]["args"][0]
+        self.assertEqual((sent["side"], sent["sz"], sent["reduceOnly"]), ("sell", "2.0", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
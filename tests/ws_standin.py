@@ -0,0 +1,160 @@
+import json
+import time
+import socket
+import base64
+import struct
+import hashlib
+import threading
+
+# ==========================================
+# LOCAL STAND-IN FOR A VENUE'S PRIVATE WEBSOCKET
+# ==========================================
+# Just enough RFC 6455 for websocket-client: handshake, masked client frames, unmasked
+# server text frames, control-frame ping/pong and close. Every text message is recorded
+# and handed to `on_message(conn, text)`, which answers like the venue would.
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class StandInConnection:
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def send(self, payload):
+        if not isinstance(payload, str):
+            payload = json.dumps(payload)
+        self._frame(0x1, payload.encode("utf-8"))
+
+    def _frame(self, opcode, data):
+        header = bytes([0x80 | opcode])
+        if len(data) < 126:
+            header += bytes([len(data)])
+        elif len(data) < 1 << 16:
+            header += bytes([126]) + struct.pack("!H", len(data))
+        else:
+            header += bytes([127]) + struct.pack("!Q", len(data))
+        with self.lock:
+            self.sock.sendall(header + data)
+
+    def _read_exact(self, n):
+        data = b""
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client went away")
+            data += chunk
+        return data
+
+    def read_frame(self):
+        first, second = self._read_exact(2)
+        opcode, length = first & 0x0F, second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._read_exact(8))[0]
+        mask = self._read_exact(4) if second & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._read_exact(length)))
+        return opcode, payload
+
+    def drop(self):
+        """Cuts the TCP connection without a close frame (a network drop)"""
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class StandInServer:
+    def __init__(self, on_message):
+        self.on_message = on_message
+        self.received = []
+        self.connections = []
+        self.cond = threading.Condition()
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.url = f"ws://127.0.0.1:{self.listener.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("no handshake")
+            request += chunk
+        headers = dict(line.split(": ", 1) for line in request.decode().split("\r\n")[1:] if ": " in line)
+        accept = base64.b64encode(hashlib.sha1((headers["Sec-WebSocket-Key"] + GUID).encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+    def _serve(self, sock):
+        conn = StandInConnection(sock)
+        try:
+            self._handshake(sock)
+            with self.cond:
+                self.connections.append(conn)
+                self.cond.notify_all()
+            while True:
+                opcode, payload = conn.read_frame()
+                if opcode == 0x8:
+                    conn._frame(0x8, payload[:2])
+                    return
+                if opcode == 0x9:
+                    conn._frame(0xA, payload)
+                    continue
+                text = payload.decode("utf-8")
+                with self.cond:
+                    self.received.append(text)
+                    self.cond.notify_all()
+                self.on_message(conn, text)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if not conn.closed:
+                conn.drop()
+
+    # --- Test helpers ---
+    def wait_for(self, predicate, timeout=5):
+        """Waits until predicate(received messages) holds and returns its value"""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                value = predicate(self.received)
+                if value:
+                    return value
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AssertionError(f"stand-in server never saw the expected message: {self.received}")
+                self.cond.wait(remaining)
+
+    def wait_connections(self, count, timeout=5):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while len(self.connections) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AssertionError(f"expected {count} connections, got {len(self.connections)}")
+                self.cond.wait(remaining)
+            return self.connections[count - 1]
+
+    def messages(self, predicate=lambda msg: True):
+        """Received JSON messages matching `predicate` (plain-text pings are skipped)"""
+        with self.cond:
+            parsed = [json.loads(m) for m in self.received if m.startswith("{")]
+        return [m for m in parsed if predicate(m)]
+
+    def close(self):
+        self.listener.close()
+        for conn in list(self.connections):
+            if not conn.closed:
+                conn.drop()
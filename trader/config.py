@@ -14,6 +14,14 @@ okx_copy_key = "YOUR_OKX_KEY"
 okx_copy_secret = "YOUR_OKX_SECRET"
 okx_copy_pass = "YOUR_OKX_PASSWORD" 
 
+# MULTI-ACCOUNT COPY (optional). When non-empty this list replaces the single BitMEX / OKX keys above.
+# venue: "bitmex" | "okx"  -  size_multiplier scales percentage_of_capital per account
+# ws: private WebSocket for orders/positions (default True, REST is used whenever the socket is down)
+slave_accounts = [
+    # {"name": "OKX_SUB_1", "venue": "okx", "key": "KEY", "secret": "SECRET", "passphrase": "PASS", "size_multiplier": 1.0},
+    # {"name": "BITMEX_SUB_1", "venue": "bitmex", "key": "KEY", "secret": "SECRET", "size_multiplier": 0.5},
+]
+
 # SLACK NOTIFICATIONS
 slack_token = "YOUR_SLACK_TOKEN"
 slack_channel = "YOUR_SLACK_CHANNEL"
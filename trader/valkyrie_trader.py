@@ -1,62 +1,47 @@
 import sys
-from time import sleep
-import pandas as pd
-import traceback
+import os
+import importlib
 import logging
 import time
 import json
 import threading
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import websocket
 import config
 import config_test
-from genofinlib import ws_manager, order_manager, helpers, slave_manager
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # repo root, for genofinlib
+from genofinlib import runtime, ws_manager, order_manager, helpers, slave_manager, order_registry, reconciler
+from genofinlib.async_logging import setup_async_logging, ChangeLogger
 from genofinlib.slack_bot import StrategyState, trade_message, error_message, info_message
 
+# pandas is only needed once the first bar is evaluated: import it on a side thread while the network warms up
+threading.Thread(target=importlib.import_module, args=("pandas",), daemon=True).start()
+
+# Setup (queue + writer thread: stdout can never stall the loop or an order path)
+setup_async_logging(level=logging.INFO, stream=sys.stdout)
+
 # =========================
 # CONFIG SELECTION
 # =========================
 IS_TESTNET = True  # <--- TOGGLE THIS ONLY
 
+# Network, endpoints and keys are resolved once and handed to the library (starts Slack delivery too)
+cfg = config_test if IS_TESTNET else config
+ctx = runtime.build_context(cfg, IS_TESTNET)
+
+FSTREAM_URL = ctx.fstream_url
+BINANCE_FAPI_URL = ctx.fapi_url
+BINANCE_API_KEY = ctx.api_key
+BINANCE_API_SECRET = ctx.api_secret
+
 if IS_TESTNET:
     logging.info("--- RUNNING IN TESTNET MODE ---")
     info_message("--- RUNNING IN TESTNET MODE ---", StrategyState.VK)
-
-    # 1. Select the Config File
-    cfg = config_test
-
-    # 2. Select URLs
-    WS_API_URL = "wss://testnet.binancefuture.com/ws-fapi/v1"
-    FSTREAM_URL = "wss://stream.binancefuture.com/ws"
-    BINANCE_FAPI_URL = "https://testnet.binancefuture.com"
-
-    # 3. Select API Keys (Directly accessed, no verification needed)
-    BINANCE_API_KEY = cfg.binance_test_key
-    BINANCE_API_SECRET = cfg.binance_test_secret
-
 else:
     logging.info("--- RUNNING IN REAL MONEY MODE ---")
     info_message("--- RUNNING IN REAL MONEY MODE ---", StrategyState.VK)
 
-    # 1. Select the Config File
-    cfg = config
-
-    # 2. Select URLs
-    WS_API_URL = "wss://ws-fapi.binance.com/ws-fapi/v1"
-    FSTREAM_URL = "wss://fstream.binance.com/ws"
-    BINANCE_FAPI_URL = "https://fapi.binance.com"
-
-    # 3. Select API Keys (Directly accessed, no verification needed)
-    BINANCE_API_KEY = cfg.binance_copy_key
-    BINANCE_API_SECRET = cfg.binance_copy_secret
-
-# Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)],
-    force=True
-)
 MAX_BARS = 1500
 ohlcv_buffer = deque(maxlen=MAX_BARS)
 ohlcv_lock = threading.Lock()
@@ -75,8 +60,6 @@ PERCENTAGE_OF_CAPITAL = cfg.percentage_of_capital
 logging.info(f"PERCENTAGE_OF_CAPITAL = {PERCENTAGE_OF_CAPITAL}")
 info_message(f"PERCENTAGE_OF_CAPITAL = {PERCENTAGE_OF_CAPITAL}", StrategyState.VK)
 
-sleep(2) 
-
 # [SANITIZED] Generic params replacing proprietary trend/volatility variables
 GENERIC_FAST_MA = getattr(cfg, 'fast_ma', 10)
 logging.info(f"GENERIC_FAST_MA = {GENERIC_FAST_MA}")
@@ -118,35 +101,22 @@ DRAWDOWN_THRESHOLD = cfg.drawdown_threshold
 logging.info(f"DRAWDOWN_THRESHOLD = {DRAWDOWN_THRESHOLD}")
 info_message(f"DRAWDOWN_THRESHOLD = {DRAWDOWN_THRESHOLD}", StrategyState.ST)
 
-sleep(2)
-
 # =========================
 # INITIALIZATION
 # =========================
-# 1. Start Slaves (CCXT Free)
-slaves = slave_manager.SlaveManager(cfg, IS_TESTNET)
-
-# 2. Start WebSocket Manager
-ws_api = ws_manager.WebSocketApiManager(
-    BINANCE_API_KEY,
-    BINANCE_API_SECRET,
-    WS_API_URL,
-    IS_TESTNET
-)
-ws_api.connect()
-
-# 3. Start OrderManager (Now acts as the unified Binance Client)
-executor = order_manager.OrderManager(
-    ws_api=ws_api,
-    symbol=SYMBOL,
-    api_key=BINANCE_API_KEY,
-    api_secret=BINANCE_API_SECRET,
-    is_testnet=IS_TESTNET
-)
-
-# 4. Alias executor to 'exchange' so your main loop runs without modifications
+# 1. Start WebSocket Manager (connects in the background, waited on before the main loop)
+ws_api = ws_manager.WebSocketApiManager(ctx).connect()
+
+# 2. Start OrderManager (Now acts as the unified Binance Client)
+executor = order_manager.OrderManager(ctx, ws_api=ws_api, symbol=SYMBOL)
+
+# 3. Alias executor to 'exchange' so your main loop runs without modifications
 exchange = executor
-exchange.load_markets()
+
+# 4. Independent network setup runs side by side instead of one after another
+startup = ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup")
+slaves_job = startup.submit(slave_manager.SlaveManager, ctx)  # Slaves (CCXT Free)
+markets_job = startup.submit(exchange.load_markets)
 
 # =========================
 # STATE
@@ -156,8 +126,6 @@ in_long = False
 in_position = False
 active_strategy = None  # Values: "TREND", "SCALP", "HV"
 
-sleep(2)
-
 # Strategy 1 State
 failed_l1 = False
 l2_order = False
@@ -167,16 +135,12 @@ trend_down = False
 leveragenum = cfg.min_leverage
 entry_price_list = [112900, 113752, 113648, 92589, 91192]
 
-sleep(2)
-
 # Strategy 2 State
 scalp_long = False
 adaptabletp = False
 tp_is_boosted = False
 scalp_entry_list = [31]
 
-sleep(2)
-
 # HV State
 bar_time_prev = None
 is_bar_closed = False
@@ -190,42 +154,55 @@ hv_traded_bar = None
 def on_user_message(ws, msg):
     try:
         data = json.loads(msg)
-        if data.get("e") == "ORDER_TRADE_UPDATE":
+        if data.get("e") == "ALGO_UPDATE":
+            executor.registry.on_algo_update(data.get("o", {}))
+
+        elif data.get("e") == "ORDER_TRADE_UPDATE":
             o = data.get("o", {})
+            order = executor.registry.on_order_update(o)
             if o.get("X") != "FILLED": return
             cid = o.get("c", "")
             logging.info(f"[WS] FILL: {cid}")
 
             global failed_l1, take_profit, l2_order, sl_hv_triggered, active_strategy
 
+            # Classify from the registry (exact kind + owning strategy), not from the id text
+            kind = order.kind if order else order_registry.kind_from_cid(cid)
+            strategy = order.strategy if order and order.strategy else active_strategy
+
             # --- STOP LOSS HIT ---
-            if "SL" in cid:
-                trade_message(f"STOP LOSS triggered ({active_strategy})", StrategyState.VK)
+            if kind == order_registry.SL:
+                trade_message(f"STOP LOSS triggered ({strategy})", StrategyState.VK)
 
                 # *** SLAVE ACTION: CLOSE POSITIONS ***
                 logging.info("Master SL Hit -> Closing Slaves")
                 slaves.exit_long()
                 # *************************************
 
+                # Sibling TP is known locally, cancel it directly instead of a cancel-all sweep
+                executor.cancel_strategy_orders(strategy, order_registry.TP)
+
                 # Logic Router
-                if active_strategy == "HV":
+                if strategy == "HV":
                     sl_hv_triggered = True
 
-                elif active_strategy in ["TREND", "SCALP"]:
+                elif strategy in ["TREND", "SCALP"]:
                     failed_l1 = True
                     take_profit = False
                     l2_order = False
 
             # --- TAKE PROFIT HIT ---
-            elif "TP" in cid:
-                trade_message(f"TAKE PROFIT triggered ({active_strategy})", StrategyState.VK)
+            elif kind == order_registry.TP:
+                trade_message(f"TAKE PROFIT triggered ({strategy})", StrategyState.VK)
 
                 # *** SLAVE ACTION: CLOSE POSITIONS ***
                 logging.info("Master TP Hit -> Closing Slaves")
                 slaves.exit_long()
                 # *************************************
 
-                if active_strategy in ["TREND", "SCALP"]:
+                executor.cancel_strategy_orders(strategy, order_registry.SL)
+
+                if strategy in ["TREND", "SCALP"]:
                     failed_l1 = False
                     take_profit = True
                     l2_order = False
@@ -277,16 +254,31 @@ def warmup_ohlcv():
 
 
 # Start Threads
-warmup_ohlcv()
+warmup_job = startup.submit(warmup_ohlcv)
+slaves = slaves_job.result()
+markets_job.result()
+warmup_job.result()
+startup.shutdown()
+
 threading.Thread(target=start_kline_socket, daemon=True).start()
 threading.Thread(target=start_user_socket, daemon=True).start()
 threading.Thread(target=helpers.keep_alive_listen_key, args=(BINANCE_API_KEY, BINANCE_FAPI_URL),
                  daemon=True).start()
 
+# Start Position Reconciler (background master/slave drift checks)
+position_reconciler = reconciler.PositionReconciler(ctx, executor, slaves).start()
+
+# Orders go over the WS API: wait for the socket instead of a fixed sleep
+ws_api.wait_ready()
+
+import pandas as pd  # already loaded by the side thread started at the top
+
 # =========================
 # MAIN LOOP
 # =========================
 logging.info("Multi-Strategy Bot Started (Public Version)...")
+state_log = ChangeLogger("STRATEGY STATE")
+position_log = ChangeLogger("POSITION")
 info_message("Multi-Strategy Bot Started (Public Version)...", StrategyState.VK)
 
 while True:
@@ -361,15 +353,11 @@ while True:
             is_bar_closed = False
         bar_time_prev = bar_time_cur
 
-        logging.info("========== STRATEGY STATE ==========")
-        logging.info("sma_fast: %.2f", df['sma_fast'].iloc[-1])
-        logging.info("sma_slow: %.2f", df['sma_slow'].iloc[-1])
-        logging.info("signal_check (trend): %s", signal_cur)
-        logging.info("scalp_territory: %s", is_scalp_territory)
-        
-        logging.info("failed_l1: %s", failed_l1)
-        logging.info("take_profit: %s", take_profit)
-        logging.info("scalp_long: %s", scalp_long)
+        # Logged only when a decision input flips; the MA levels ride along for context
+        state_log.update(
+            {"signal_check (trend)": signal_cur, "scalp_territory": is_scalp_territory,
+             "failed_l1": failed_l1, "take_profit": take_profit, "scalp_long": scalp_long},
+            {"sma_fast": f"{df['sma_fast'].iloc[-1]:.2f}", "sma_slow": f"{df['sma_slow'].iloc[-1]:.2f}"})
 
         # ==============================================================================
         # STRATEGY LOGIC ROUTER
@@ -397,14 +385,15 @@ while True:
                 logging.info(f"Trend Strategy L1 Triggered")
                 active_strategy = "TREND"
 
-                executor.enter_long(amount=quantity, leverage=leveragenum)
+                sent_at = executor.enter_long(amount=quantity, leverage=leveragenum, strategy=active_strategy)
 
                 # --- SLAVE ENTRY ---
-                slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=int(leveragenum))
+                slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=int(leveragenum),
+                                  master_sent_at=sent_at)
                 # -------------------
 
-                executor.place_sl(amount=quantity, price=entry * SLL1)
-                executor.place_tp(amount=quantity, price=entry * TPL)
+                executor.place_sl(amount=quantity, price=entry * SLL1, strategy=active_strategy)
+                executor.place_tp(amount=quantity, price=entry * TPL, strategy=active_strategy)
 
                 scalp_long, adaptabletp, tp_is_boosted = False, False, False
 
@@ -413,7 +402,7 @@ while True:
                     logging.info("Trend turned Bullish: Upgrading Scalp TP")
                     pos = exchange.fetch_positions([SYMBOL])[0]
                     amt = abs(float(pos["contracts"]))
-                    executor.modify_tp(amount=amt, new_price=entry_price_list[-1] * 1.70)
+                    executor.modify_tp(amount=amt, new_price=entry_price_list[-1] * 1.70, strategy=active_strategy)
                     tp_is_boosted = True
 
         # Trend L2
@@ -427,13 +416,14 @@ while True:
                     quantity = float(exchange.amount_to_precision(SYMBOL, raw_qty))
 
                     active_strategy = "TREND"
-                    executor.enter_long(amount=quantity, leverage=leveragenum)
+                    sent_at = executor.enter_long(amount=quantity, leverage=leveragenum, strategy=active_strategy)
 
                     # --- SLAVE ENTRY L2 ---
-                    slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=int(leveragenum))
+                    slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=int(leveragenum),
+                                      master_sent_at=sent_at)
                     # ----------------------
 
-                    executor.place_sl(amount=quantity, price=entry_price_list[-1] * H2_SL)
+                    executor.place_sl(amount=quantity, price=entry_price_list[-1] * H2_SL, strategy=active_strategy)
                     l2_order = True
 
         # Trend Bear Event
@@ -448,17 +438,17 @@ while True:
                 elif active_strategy == "SCALP" and adaptabletp:
                     safe_tp = scalp_entry_list[-1] * 1.25
                     if current_price > safe_tp:
-                        executor.exit_long()
-                        slaves.exit_long()  # Slave Exit
+                        sent_at = executor.exit_long(strategy=active_strategy)
+                        slaves.exit_long(master_sent_at=sent_at)  # Slave Exit
                     elif tp_is_boosted:
                         pos = exchange.fetch_positions([SYMBOL])[0]
                         amt = abs(float(pos["contracts"]))
-                        executor.modify_tp(amount=amt, new_price=safe_tp)
+                        executor.modify_tp(amount=amt, new_price=safe_tp, strategy=active_strategy)
                         tp_is_boosted = False
 
                 elif active_strategy == "TREND" or (active_strategy == "SCALP" and not adaptabletp):
-                    executor.exit_long()
-                    slaves.exit_long()  # Slave Exit
+                    sent_at = executor.exit_long(strategy=active_strategy)
+                    slaves.exit_long(master_sent_at=sent_at)  # Slave Exit
 
             if len(entry_price_list) >= 2:
                 last, prev = entry_price_list[-1], entry_price_list[-2]
@@ -488,14 +478,15 @@ while True:
             scalp_entry_list.append(low_price)
             entry_price_list.append(low_price)
 
-            executor.enter_long(amount=quantity, leverage=lev)
+            sent_at = executor.enter_long(amount=quantity, leverage=lev, strategy=active_strategy)
 
             # --- SLAVE ENTRY ---
-            slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=lev)
+            slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=lev,
+                              master_sent_at=sent_at)
             # -------------------
 
-            executor.place_sl(quantity, low_price * sl)
-            executor.place_tp(quantity, low_price * tp)
+            executor.place_sl(quantity, low_price * sl, strategy=active_strategy)
+            executor.place_tp(quantity, low_price * tp, strategy=active_strategy)
             tp_is_boosted = False
 
             # ------------------------------------
@@ -517,32 +508,29 @@ while True:
                 active_strategy = "HV"
                 hv_traded_bar = bar_time_cur  # Lock out L1 for the rest of this candle
 
-                executor.enter_long(quantity, 3)
+                sent_at = executor.enter_long(quantity, 3, strategy=active_strategy)
 
                 # --- SLAVE ENTRY ---
-                slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=3)
+                slaves.enter_long(percentage_of_capital=PERCENTAGE_OF_CAPITAL, leverage=3,
+                                  master_sent_at=sent_at)
                 # -------------------
 
-                executor.place_sl(amount=quantity, price=hv_open * 0.95) # Generic fallback SL
-                executor.place_tp(amount=quantity, price=hv_open * 1.10) # Generic fallback TP
+                executor.place_sl(amount=quantity, price=hv_open * 0.95, strategy=active_strategy) # Generic fallback SL
+                executor.place_tp(amount=quantity, price=hv_open * 1.10, strategy=active_strategy) # Generic fallback TP
 
                 sl_hv_triggered = False
 
             if active_strategy == "HV" and in_long and is_bar_closed:
                 logging.info("BAR CLOSED: HV EXIT")
                 executor.cancel_all_orders()
-                executor.exit_long()
-                slaves.exit_long()
+                sent_at = executor.exit_long(strategy=active_strategy)
+                slaves.exit_long(master_sent_at=sent_at)
                 active_strategy = None
 
-        if not in_position:
-            logging.info("Waiting...")
-        elif in_long:
-            logging.info(f"IN LONG | Mode: {active_strategy}")
+        position_log.update({"in_position": in_position, "in_long": in_long, "mode": active_strategy})
 
     except Exception as e:
-        logging.error(f"Loop Error: {e}")
+        logging.error(f"Loop Error: {e}", exc_info=True)
         error_message(f"Loop Error: {e}", StrategyState.VK)
-        traceback.print_exc()
 
     time.sleep(0.5)